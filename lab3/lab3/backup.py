@@ -0,0 +1,172 @@
+"""
+Online backup, snapshot and restore of the school database.
+
+Built on ``sqlite3.Connection.backup``: pages are copied in small steps so
+other connections can keep writing between steps, and the copy is always a
+consistent database file. Backups can optionally be gzip compressed.
+
+Can be run headlessly::
+
+    python backup.py backup school.db school-backup.db.gz --compress
+    python backup.py restore school-backup.db.gz school.db
+"""
+import argparse
+import gzip
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+import urllib.parse
+
+PAGES_PER_STEP = 1024
+GZIP_MAGIC = b'\x1f\x8b'
+
+
+def _open(database):
+    if isinstance(database, sqlite3.Connection):
+        return database, False
+    return sqlite3.connect(database), True
+
+
+def _copy(source, target, pages, progress, sleep):
+    total = [0]
+
+    def report(status, remaining, page_count):
+        total[0] = page_count
+        if progress:
+            progress(page_count - remaining, page_count)
+
+    source.backup(target, pages=pages, progress=report, sleep=sleep)
+    return total[0]
+
+
+def backup_database(source, destination, pages=PAGES_PER_STEP, compress=False, progress=None, sleep=0.25):
+    """
+    Copies a live database into a backup file without blocking writers.
+
+    Args:
+        source (str | sqlite3.Connection): Database path or open connection to back up.
+        destination (str): Path of the backup file. Replaced once the backup is complete.
+        pages (int): Number of pages copied per step. Writers may run between steps.
+        compress (bool): Gzip the backup file.
+        progress (Callable[[int, int], None] | None): Called after each step with
+            ``(pages_copied, total_pages)``.
+        sleep (float): Seconds to wait before retrying a step when the source is busy.
+
+    Returns:
+        int: Total number of pages in the backup.
+    """
+    source_conn, owned = _open(source)
+    directory = os.path.dirname(os.path.abspath(destination))
+    fd, temp_path = tempfile.mkstemp(suffix='.db', dir=directory)
+    os.close(fd)
+    try:
+        target = sqlite3.connect(temp_path)
+        try:
+            total = _copy(source_conn, target, pages, progress, sleep)
+        finally:
+            target.close()
+        if compress:
+            # Compressed under a temporary name, so a failed backup never leaves a truncated file.
+            partial = destination + '.part'
+            try:
+                with open(temp_path, 'rb') as raw, gzip.open(partial, 'wb', compresslevel=6) as packed:
+                    shutil.copyfileobj(raw, packed, 1024 * 1024)
+                os.replace(partial, destination)
+            except BaseException:
+                if os.path.exists(partial):
+                    os.remove(partial)
+                raise
+        else:
+            os.replace(temp_path, destination)
+        return total
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        if owned:
+            source_conn.close()
+
+
+def restore_database(source, destination, pages=PAGES_PER_STEP, progress=None, sleep=0.25):
+    """
+    Restores a backup file into a database.
+
+    The destination may be open by the application; its contents are replaced
+    page by page through the backup API. Gzip compressed backups are detected
+    automatically.
+
+    Args:
+        source (str): Path of the backup file, plain or gzip compressed.
+        destination (str | sqlite3.Connection): Database path or open connection to restore into.
+        pages (int): Number of pages copied per step.
+        progress (Callable[[int, int], None] | None): Called after each step with
+            ``(pages_copied, total_pages)``.
+        sleep (float): Seconds to wait before retrying a step when the destination is busy.
+
+    Returns:
+        int: Total number of pages restored.
+    """
+    with open(source, 'rb') as file:
+        compressed = file.read(2) == GZIP_MAGIC
+    temp_path = None
+    if compressed:
+        fd, temp_path = tempfile.mkstemp(suffix='.db')
+        with os.fdopen(fd, 'wb') as raw, gzip.open(source, 'rb') as packed:
+            shutil.copyfileobj(packed, raw, 1024 * 1024)
+        source = temp_path
+    target, owned = _open(destination)
+    try:
+        # Quoted so '?', '#' and '%' in the path are not read as URI syntax.
+        backup_conn = sqlite3.connect(f'file:{urllib.parse.quote(source)}?mode=ro', uri=True)
+        try:
+            return _copy(backup_conn, target, pages, progress, sleep)
+        finally:
+            backup_conn.close()
+    finally:
+        if owned:
+            target.close()
+        if temp_path:
+            os.remove(temp_path)
+
+
+def main(argv=None):
+    """
+    Command line entry point for headless backup and restore.
+
+    Args:
+        argv (list[str] | None): Arguments, defaults to ``sys.argv[1:]``.
+
+    Returns:
+        int: Process exit status.
+    """
+    parser = argparse.ArgumentParser(description='Online backup and restore for school.db')
+    commands = parser.add_subparsers(dest='command', required=True)
+    backup_parser = commands.add_parser('backup', help='copy a live database into a backup file')
+    backup_parser.add_argument('source')
+    backup_parser.add_argument('destination')
+    backup_parser.add_argument('--compress', action='store_true', help='gzip the backup file')
+    restore_parser = commands.add_parser('restore', help='restore a backup file into a database')
+    restore_parser.add_argument('source')
+    restore_parser.add_argument('destination')
+    for sub in (backup_parser, restore_parser):
+        sub.add_argument('--pages', type=int, default=PAGES_PER_STEP, help='pages copied per step')
+    args = parser.parse_args(argv)
+
+    def progress(copied, total):
+        print(f'\r{copied}/{total} pages', end='', file=sys.stderr, flush=True)
+
+    start = time.perf_counter()
+    if args.command == 'backup':
+        total = backup_database(args.source, args.destination, args.pages, args.compress, progress)
+    else:
+        total = restore_database(args.source, args.destination, args.pages, progress)
+    elapsed = time.perf_counter() - start
+    print(f'\n{args.command}: {total} pages in {elapsed:.2f}s '
+          f'({total / elapsed if elapsed else 0:.0f} pages/s)', file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,594 @@
+"""
+Micro-benchmarks for the school database.
+
+Runs against a throwaway in-memory database, so it never touches school.db::
+
+    python bench.py statements --rows 20000
+    python bench.py memory --rows 1000000
+    python bench.py registrations --processes 8 --students 2000 --capacity 300
+    python bench.py plans --update          # record bench_baseline.json
+    python bench.py plans                   # compare against it, exit 1 on regressions
+                                            # or without a baseline
+    python bench.py startup                 # import time of school.core, exit 1 over budget
+"""
+import argparse
+import difflib
+import gc
+import json
+import multiprocessing
+import os
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import changelog
+import concurrency
+import dedup
+import enrollment
+import listing
+import records
+import schema
+import searchengine
+import statements
+from school import core
+
+
+def populate(conn, rows):
+    """
+    Fills an initialized database with generated students, instructors, courses and registrations.
+
+    Args:
+        conn (sqlite3.Connection): Connection to an initialized database.
+        rows (int): Number of students. Instructors, courses and registrations are scaled from it.
+    """
+    instructors = max(rows // 50, 1)
+    courses = max(rows // 20, 1)
+    conn.executemany(statements.sql('students.insert'),
+                     ((f'Student {i}', 18 + i % 10, f'student{i}@school.edu', f'S{i}',
+                       *dedup.keys(f'Student {i}', f'student{i}@school.edu')) for i in range(rows)))
+    conn.executemany(statements.sql('instructors.insert'),
+                     ((f'Instructor {i}', 30 + i % 30, f'instructor{i}@school.edu', f'I{i}',
+                       *dedup.keys(f'Instructor {i}', f'instructor{i}@school.edu')) for i in range(instructors)))
+    conn.executemany(statements.sql('courses.insert'),
+                     ((f'C{i}', f'Course {i}', f'I{i % instructors}', None) for i in range(courses)))
+    conn.executemany(statements.sql('registrations.insert'),
+                     ((f'S{i}', f'C{(i * 7) % courses}') for i in range(rows)))
+    conn.commit()
+
+
+def new_database(rows, cached_statements=statements.CACHE_SIZE):
+    """
+    Creates a populated in-memory database.
+
+    Args:
+        rows (int): Number of students to generate.
+        cached_statements (int): Size of the connection's statement cache.
+
+    Returns:
+        sqlite3.Connection: Connection to the new database.
+    """
+    conn = sqlite3.connect(':memory:', cached_statements=cached_statements)
+    schema.initialize(conn)
+    populate(conn, rows)
+    return conn
+
+
+def _rate(count, elapsed):
+    return count / elapsed if elapsed else float('inf')
+
+
+def bench_statements(rows):
+    """
+    Measures statements per second on the rename and delete paths of the View All table.
+
+    Runs the code the handlers run (``concurrency.update_name`` and ``school.core.delete``,
+    i.e. the versioned compare-and-swap statements) once on a connection with the registry's
+    statement cache and once on a connection without one, where every call parses its SQL
+    again.
+
+    Args:
+        rows (int): Number of rows renamed and deleted per measurement.
+
+    Returns:
+        dict[str, float]: Statements per second keyed by ``<path>.<variant>``.
+    """
+    results = {}
+    for variant, cache_size in (('registry', statements.CACHE_SIZE), ('uncached', 0)):
+        conn = new_database(rows, cache_size)
+        shown = [records.ListingRow(f'S{i}', f'Student {i}', 'Student', i + 1, 1) for i in range(rows)]
+
+        start = time.perf_counter()
+        renamed = [concurrency.update_name(conn, row, f'Renamed {i}') for i, row in enumerate(shown)]
+        conn.commit()
+        results[f'rename.{variant}'] = _rate(rows, time.perf_counter() - start)
+
+        start = time.perf_counter()
+        for row in renamed:
+            core.delete(conn, row)
+        conn.commit()
+        results[f'delete.{variant}'] = _rate(rows, time.perf_counter() - start)
+        conn.close()
+    return results
+
+
+def _measure(build):
+    gc.collect()
+    tracemalloc.start()
+    try:
+        data = build()
+        size = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del data
+    return size
+
+
+def bench_memory(rows):
+    """
+    Measures bytes per row of the students table held in memory in different shapes.
+
+    Each shape is built from the same cursor rows while tracemalloc traces allocations,
+    so the numbers include the row containers and every value object.
+
+    Args:
+        rows (int): Number of students.
+
+    Returns:
+        dict[str, float]: Bytes per row keyed by ``dict``, ``tuple``, ``record`` and ``columns``.
+    """
+    conn = sqlite3.connect(':memory:')
+    schema.initialize(conn)
+    conn.executemany(statements.sql('students.insert'),
+                     ((f'Student {i}', 18 + i % 10, f'student{i}@school.edu', f'S{i}', None, None)
+                      for i in range(rows)))
+    sql = records.select_sql('students')
+    fields = records.Student._fields
+    shapes = {
+        'dict': lambda: [dict(zip(fields, row)) for row in conn.execute(sql)],
+        'tuple': lambda: conn.execute(sql).fetchall(),
+        'record': lambda: list(map(records.Student._make, conn.execute(sql))),
+        'columns': lambda: records.ColumnStore.from_cursor(records.Student, conn.execute(sql)),
+    }
+    results = {name: _measure(build) / rows for name, build in shapes.items()}
+    conn.close()
+    return results
+
+
+def _register_students(database, student_ids, course_id, start_at):
+    conn = sqlite3.connect(database, timeout=30)
+    outcomes = {'registered': 0, 'duplicate': 0, 'full': 0, 'prerequisite': 0, 'locked': 0}
+    latencies = []
+    time.sleep(max(start_at - time.time(), 0))
+    # Every student tries twice, the second attempt must be refused as a duplicate.
+    for student_id in student_ids + student_ids:
+        start = time.perf_counter()
+        try:
+            enrollment.register(conn, student_id, course_id)
+            outcomes['registered'] += 1
+        except enrollment.AlreadyRegistered:
+            outcomes['duplicate'] += 1
+        except enrollment.CourseFull:
+            outcomes['full'] += 1
+        except enrollment.MissingPrerequisites:
+            outcomes['prerequisite'] += 1
+        except sqlite3.OperationalError as e:
+            if 'locked' not in str(e):
+                raise
+            outcomes['locked'] += 1
+        latencies.append(time.perf_counter() - start)
+    conn.close()
+    return outcomes, latencies
+
+
+def bench_registrations(processes, students, capacity):
+    """
+    Stress-tests the registration rules with concurrent processes on one WAL database.
+
+    Every student tries to register twice for one course with the given capacity, all
+    processes starting at the same moment. Only even-numbered students have taken the
+    course's prerequisite. Afterwards the database must hold exactly ``capacity`` (or
+    every eligible student's) registrations, matching the enrollment counter, with no
+    duplicates and no registration lacking the prerequisite.
+
+    Args:
+        processes (int): Number of concurrent processes.
+        students (int): Number of students.
+        capacity (int): Seats in the course.
+
+    Returns:
+        dict: Outcome counts, ``attempts_per_s``, latency percentiles in ms and ``consistent``.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        database = os.path.join(directory, 'stress.db')
+        conn = sqlite3.connect(database)
+        conn.execute('PRAGMA journal_mode=WAL')
+        schema.initialize(conn)
+        conn.executemany(statements.sql('students.insert'),
+                         ((f'Student {i}', 20, f'student{i}@school.edu', f'S{i}', None, None) for i in range(students)))
+        conn.execute(statements.sql('courses.insert'), ('C0', 'Basics', 'I0', None))
+        conn.execute(statements.sql('courses.insert'), ('C1', 'Popular', 'I0', capacity))
+        enrollment.add_prerequisites(conn, 'C1', ['C0'])
+        conn.executemany(statements.sql('registrations.insert'), ((f'S{i}', 'C0') for i in range(0, students, 2)))
+        enrollment.recount(conn)
+        conn.commit()
+
+        slices = [[f'S{i}' for i in range(worker, students, processes)] for worker in range(processes)]
+        start_at = time.time() + 1
+        with multiprocessing.Pool(processes) as pool:
+            results = pool.starmap(_register_students, [(database, ids, 'C1', start_at) for ids in slices])
+        elapsed = time.time() - start_at
+
+        outcomes = {}
+        latencies = []
+        for counts, times in results:
+            for name, value in counts.items():
+                outcomes[name] = outcomes.get(name, 0) + value
+            latencies += times
+        latencies.sort()
+        registered = conn.execute("SELECT count(*) FROM registrations WHERE course_id = 'C1'").fetchone()[0]
+        counter = conn.execute("SELECT enrolled FROM course_enrollment WHERE course_id = 'C1'").fetchone()[0]
+        orphans = conn.execute("""
+            SELECT count(*) FROM registrations AS r WHERE r.course_id = 'C1' AND NOT EXISTS (
+                SELECT 1 FROM registrations AS p WHERE p.student_id = r.student_id AND p.course_id = 'C0')
+        """).fetchone()[0]
+        conn.close()
+    expected = min(capacity, (students + 1) // 2)
+    outcomes.update(
+        attempts_per_s=_rate(len(latencies), elapsed),
+        p50_ms=latencies[len(latencies) // 2] * 1000,
+        p99_ms=latencies[int(len(latencies) * 0.99)] * 1000,
+        max_ms=latencies[-1] * 1000,
+        consistent=registered == counter == outcomes['registered'] == expected and not orphans,
+    )
+    return outcomes
+
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'bench_baseline.json')
+# Slowdowns smaller than this are timing jitter, however large the factor.
+NOISE_MS = 2.0
+
+
+def plan_operations(rows):
+    """
+    Returns the fixed set of statements whose plans and timings are tracked.
+
+    Args:
+        rows (int): Number of students in the generated dataset; keys are picked from it.
+
+    Returns:
+        list[tuple]: ``(name, sql, parameters)`` in a stable order.
+    """
+    middle = rows // 2
+    operations = []
+    for sort in listing.COLUMNS:
+        operations.append((f'listing.first_page.{sort.lower()}', *listing.query(sort, limit=listing.PAGE_SIZE + 1)))
+    deep_row = (f'S{middle}', f'Student {middle}', 'Student', middle + 1)
+    for sort in listing.COLUMNS:
+        after = listing.sort_key(deep_row, sort)
+        operations.append((f'listing.deep_page.{sort.lower()}',
+                           *listing.query(sort, True, after=after, limit=listing.PAGE_SIZE + 1)))
+    operations.append(('listing.filtered_page',
+                       *listing.query('Name', filters={'Name': f'student {middle}'}, limit=listing.PAGE_SIZE + 1)))
+    # The queries of the search tiers, for a term matching students only.
+    for entity in statements.ENTITIES.values():
+        for tier, tier_name in zip(searchengine.TIERS, ('exact', 'prefix', 'substring')):
+            operations.append((f'search.{entity.table}.{tier_name}',
+                               *searchengine.tier_query(entity, tier, f'student {middle}', searchengine.LIMIT)))
+    operations += [
+        ('students.id_by_name', statements.sql('students.id_by_name'), (f'Student {middle}',)),
+        ('courses.id_by_name', statements.sql('courses.id_by_name'), ('Course 1',)),
+        ('students.update_name_versioned', statements.sql('students.update_name_versioned'),
+         ('Renamed', middle + 1, 1)),
+        ('students.delete', statements.sql('students.delete'), (middle + 1, 1)),
+        ('dedup.email_key', 'SELECT id, name, email FROM students WHERE email_key = ? LIMIT 1',
+         (f'student{middle}@school.edu',)),
+        ('dedup.name_key', 'SELECT id, name, email FROM students WHERE name_key = ? ORDER BY id DESC LIMIT ?',
+         (dedup.name_key(f'Student {middle}'), dedup.BLOCK_LIMIT)),
+        ('enrollment.capacity', 'SELECT min(capacity) FROM main.courses '
+                                'WHERE course_id = ? AND capacity IS NOT NULL AND deleted_at IS NULL', ('C1',)),
+        ('enrollment.duplicate', 'SELECT 1 FROM registrations WHERE student_id = ? AND course_id = ?',
+         (f'S{middle}', 'C1')),
+        ('changelog.table_version', 'SELECT coalesce(max(seq), 0) FROM change_log WHERE table_name = ?',
+         ('students',)),
+    ]
+    return operations
+
+
+def explain(conn, sql, parameters):
+    """
+    Returns the query plan of a statement as indented lines.
+
+    Args:
+        conn (sqlite3.Connection): Connection to the database.
+        sql (str): The statement.
+        parameters (Sequence): Its parameters.
+
+    Returns:
+        list[str]: One line per plan step, indented two spaces per level.
+    """
+    depth = {0: -1}
+    lines = []
+    for node, parent, _, detail in conn.execute('EXPLAIN QUERY PLAN ' + sql, parameters):
+        depth[node] = depth.get(parent, -1) + 1
+        lines.append('  ' * depth[node] + detail)
+    return lines
+
+
+def bench_plans(rows, repeat):
+    """
+    Records the plan and median time of every statement of :func:`plan_operations`.
+
+    Each statement runs ``repeat`` times on a generated in-memory database; writes are
+    rolled back after every run so all runs see the same data.
+
+    Args:
+        rows (int): Number of students to generate.
+        repeat (int): Runs per statement.
+
+    Returns:
+        dict: ``{"rows": rows, "operations": {name: {"plan": [...], "median_ms": float}}}``.
+    """
+    conn = new_database(rows)
+    results = {}
+    for name, sql, parameters in plan_operations(rows):
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            conn.execute(sql, parameters).fetchall()
+            times.append(time.perf_counter() - start)
+            conn.rollback()
+        results[name] = {'plan': explain(conn, sql, parameters), 'median_ms': statistics.median(times) * 1000}
+    conn.close()
+    return {'rows': rows, 'operations': results}
+
+
+def _access(step):
+    """
+    Parses a plan step that reads a table.
+
+    ``SEARCH students USING INDEX idx (name=?)`` -> ``('students', 'SEARCH', 'idx')``;
+    ``SCAN students`` -> ``('students', 'SCAN', None)``; None for other steps.
+    """
+    words = step.split()
+    if len(words) < 2 or words[0] not in ('SCAN', 'SEARCH'):
+        return None
+    if 'INDEX' in words[2:-1]:
+        index = words[words.index('INDEX') + 1]
+    elif 'PRIMARY' in words:
+        index = 'PRIMARY KEY'
+    else:
+        index = None
+    return words[1], words[0], index
+
+
+def _cost(kind, index):
+    # Index seeks beat index scans, which beat full table scans.
+    return 0 if kind == 'SEARCH' else 1 if index else 2
+
+
+def _plan_regressions(recorded, current):
+    """
+    Lists the table accesses of a plan that are worse than the baseline's.
+
+    An access regresses when the baseline did not read the table at all and now it is
+    scanned, when it is slower in kind than every baseline access of the table (SEARCH,
+    then SCAN using an index, then full SCAN), or when it is as fast in kind but uses a
+    different index.
+
+    Args:
+        recorded (list[str]): Baseline plan lines.
+        current (list[str]): Plan lines of this run.
+
+    Returns:
+        list[str]: One description per regressed access.
+    """
+    before = {}
+    for step in recorded:
+        access = _access(step)
+        if access:
+            before.setdefault(access[0], set()).add(access[1:])
+    problems = []
+    for step in current:
+        access = _access(step)
+        if access is None:
+            continue
+        table, kind, index = access
+        if (kind, index) in before.get(table, ()):
+            continue
+        if table not in before:
+            if kind == 'SCAN':
+                problems.append(f'now scans {table}: {step.strip()}')
+            continue
+        best = min(_cost(*known) for known in before[table])
+        if _cost(kind, index) > best:
+            problems.append(f'{table} degraded to {step.strip()}')
+        elif _cost(kind, index) == best:
+            indexes = ', '.join(sorted(str(known[1]) for known in before[table] if _cost(*known) == best))
+            problems.append(f'{table} uses {index} instead of {indexes}: {step.strip()}')
+    return problems
+
+
+def compare_plans(baseline, current, threshold=1.5, noise_ms=NOISE_MS):
+    """
+    Compares a run with the baseline.
+
+    A statement regresses when a table access in its plan is worse than the baseline's
+    (see :func:`_plan_regressions`; after renaming an index record a new baseline), or
+    when its median time exceeds the baseline's by more than ``threshold`` times and
+    by more than ``noise_ms``. Other plan changes are reported without failing.
+
+    Args:
+        baseline (dict): Recorded results of :func:`bench_plans`.
+        current (dict): Results of this run.
+        threshold (float): Allowed slowdown factor.
+        noise_ms (float): Slowdowns below this many milliseconds are ignored; sub-millisecond
+            statements vary by more than ``threshold`` from run to run.
+
+    Returns:
+        tuple[list[str], bool]: Report lines, and whether anything regressed.
+    """
+    lines = []
+    failed = False
+    if baseline.get('rows') != current['rows']:
+        lines.append(f"note: baseline was recorded with {baseline.get('rows')} rows, this run used {current['rows']}")
+    for name, result in current['operations'].items():
+        recorded = baseline['operations'].get(name)
+        if recorded is None:
+            lines.append(f'new   {name:32} {result["median_ms"]:9.3f} ms (not in baseline)')
+            continue
+        problems = []
+        problems += _plan_regressions(recorded['plan'], result['plan'])
+        ratio = result['median_ms'] / recorded['median_ms'] if recorded['median_ms'] else 1.0
+        if ratio > threshold and result['median_ms'] - recorded['median_ms'] > noise_ms:
+            problems.append(f'{ratio:.1f}x slower')
+        status = 'FAIL' if problems else 'ok'
+        failed = failed or bool(problems)
+        lines.append(f'{status:5} {name:32} {result["median_ms"]:9.3f} ms (baseline {recorded["median_ms"]:.3f} ms)'
+                     + (' - ' + ', '.join(problems) if problems else ''))
+        if result['plan'] != recorded['plan']:
+            lines += ['      ' + line for line in difflib.unified_diff(
+                recorded['plan'], result['plan'], 'baseline', 'current', lineterm='', n=1)]
+    for name in baseline['operations']:
+        if name not in current['operations']:
+            lines.append(f'gone  {name}')
+    return lines, failed
+
+
+STARTUP_MODULE = 'school.core'
+STARTUP_BUDGET_MS = 25.0
+# Modules the data core must not import; they belong to the GUI and its handlers.
+STARTUP_FORBIDDEN = ('tkinter', '_tkinter', 'csv')
+
+
+def import_times(module):
+    """
+    Imports a module in a fresh interpreter under ``python -X importtime``.
+
+    Modules the interpreter loads at startup (``site``, ``os``, ...) are not counted.
+
+    Args:
+        module (str): Dotted name of the module.
+
+    Returns:
+        tuple[float, dict[str, float]]: Milliseconds the import took in total, and the
+        milliseconds spent in each module imported along with it, excluding its own imports.
+    """
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                            cwd=os.path.dirname(os.path.abspath(__file__)), capture_output=True, text=True, check=True)
+    total = 0.0
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        # Top level imports are indented by one space, what they import by more; ``site``
+        # is the last import of interpreter startup.
+        if name == ' site':
+            total, times = 0.0, {}
+            continue
+        if not name.startswith('  '):
+            total += int(cumulative_us) / 1000
+        times[name.strip()] = int(self_us) / 1000
+    return total, times
+
+
+def bench_startup(module=STARTUP_MODULE, runs=5):
+    """
+    Measures the import time of a module, keeping the fastest of several runs to reduce noise.
+
+    Args:
+        module (str): Dotted name of the module.
+        runs (int): Number of fresh interpreters to import it in.
+
+    Returns:
+        tuple[float, dict[str, float]]: See :func:`import_times`.
+    """
+    return min((import_times(module) for _ in range(runs)), key=lambda result: result[0])
+
+
+def main(argv=None):
+    """
+    Command line entry point.
+
+    Args:
+        argv (list[str] | None): Arguments, defaults to ``sys.argv[1:]``.
+
+    Returns:
+        int: Process exit status.
+    """
+    parser = argparse.ArgumentParser(description='School database micro-benchmarks')
+    commands = parser.add_subparsers(dest='command', required=True)
+    statements_parser = commands.add_parser('statements', help='statements/s on the rename and delete paths')
+    statements_parser.add_argument('--rows', type=int, default=5000)
+    memory_parser = commands.add_parser('memory', help='bytes per row of in-memory students')
+    memory_parser.add_argument('--rows', type=int, default=1000000)
+    registrations_parser = commands.add_parser('registrations', help='concurrent registrations against one course')
+    registrations_parser.add_argument('--processes', type=int, default=8)
+    registrations_parser.add_argument('--students', type=int, default=2000)
+    registrations_parser.add_argument('--capacity', type=int, default=300)
+    plans_parser = commands.add_parser('plans', help='compare query plans and timings with a baseline')
+    plans_parser.add_argument('--baseline', default=BASELINE)
+    plans_parser.add_argument('--update', action='store_true', help='record a new baseline instead of comparing')
+    plans_parser.add_argument('--rows', type=int, default=20000)
+    plans_parser.add_argument('--repeat', type=int, default=25)
+    plans_parser.add_argument('--threshold', type=float, default=1.5, help='allowed slowdown factor')
+    plans_parser.add_argument('--noise-ms', type=float, default=NOISE_MS,
+                              help=f'slowdowns below this many milliseconds are ignored (default {NOISE_MS:g})')
+    startup_parser = commands.add_parser('startup', help='import time of the application core (python -X importtime)')
+    startup_parser.add_argument('--module', default=STARTUP_MODULE)
+    startup_parser.add_argument('--budget', type=float, default=STARTUP_BUDGET_MS, help='allowed milliseconds')
+    startup_parser.add_argument('--runs', type=int, default=5)
+    startup_parser.add_argument('--top', type=int, default=10, help='slowest modules listed')
+    args = parser.parse_args(argv)
+
+    if args.command == 'statements':
+        for name, rate in bench_statements(args.rows).items():
+            print(f'{name:20} {rate:12,.0f} statements/s')
+    elif args.command == 'memory':
+        for name, size in bench_memory(args.rows).items():
+            print(f'{name:20} {size:12,.1f} bytes/row')
+    elif args.command == 'registrations':
+        results = bench_registrations(args.processes, args.students, args.capacity)
+        for name, value in results.items():
+            print(f'{name:20} {value:12,.2f}' if isinstance(value, float) else f'{name:20} {value!s:>12}')
+        if not results['consistent']:
+            return 1
+    elif args.command == 'plans':
+        current = bench_plans(args.rows, args.repeat)
+        if args.update:
+            with open(args.baseline, 'w') as file:
+                json.dump(current, file, indent=2)
+                file.write('\n')
+            print(f'baseline written to {args.baseline}')
+            return 0
+        if not os.path.exists(args.baseline):
+            print(f'no baseline at {args.baseline}; record one with --update', file=sys.stderr)
+            return 1
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+        lines, failed = compare_plans(baseline, current, args.threshold, args.noise_ms)
+        print('\n'.join(lines))
+        if failed:
+            print('query plan or timing regressions found', file=sys.stderr)
+            return 1
+    elif args.command == 'startup':
+        total, times = bench_startup(args.module, args.runs)
+        print(f'import {args.module}: {total:.1f} ms (budget {args.budget:.1f} ms), {len(times)} modules')
+        for name, ms in sorted(times.items(), key=lambda item: -item[1])[:args.top]:
+            print(f'  {ms:8.2f} ms  {name}')
+        forbidden = [name for name in STARTUP_FORBIDDEN if name in times and args.module == STARTUP_MODULE]
+        if forbidden:
+            print(f'{args.module} imports {", ".join(forbidden)}', file=sys.stderr)
+        if total > args.budget:
+            print(f'{args.module} imports in {total:.1f} ms, over the {args.budget:.1f} ms budget', file=sys.stderr)
+        if forbidden or total > args.budget:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,237 @@
+"""
+Change data capture and incremental sync between copies of the school database.
+
+Triggers on every table append each insert, update and delete to the
+``change_log`` table under a monotonically increasing ``seq``. Every database
+has a random ``node_id``; each change records the node it originated on, so
+changes received through a sync are not shipped back to where they came from.
+
+Syncing copies only the changes after the last sequence the target has
+acknowledged for that source::
+
+    python changelog.py sync campus-a/school.db campus-b/school.db
+    python changelog.py status school.db
+
+Row ids are replicated as they are, so copies that insert into the same table
+concurrently must not hand out overlapping ids.
+"""
+import argparse
+import json
+import sqlite3
+import sys
+import uuid
+
+import enrollment
+
+BATCH_SIZE = 5000
+OPERATIONS = {'I': 'INSERT', 'U': 'UPDATE', 'D': 'DELETE'}
+
+
+def install(conn, tables, schema='main'):
+    """
+    Creates the change log, the sync bookkeeping tables and the capture triggers.
+
+    Safe to call repeatedly; the triggers are recreated so their payloads include
+    columns added since the last call. Does not commit.
+
+    Args:
+        conn (sqlite3.Connection): Connection to the database.
+        tables (Iterable[str]): Tables to capture changes for. Each must have an ``id`` primary key.
+        schema (str): Name of the (possibly attached) database to install into.
+    """
+    conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS {schema}.change_log (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            table_name TEXT NOT NULL,
+            op TEXT NOT NULL CHECK (op IN ('I', 'U', 'D')),
+            row_id INTEGER NOT NULL,
+            payload TEXT,
+            origin TEXT NOT NULL,
+            changed_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    conn.execute(f'CREATE INDEX IF NOT EXISTS {schema}.idx_change_log_table ON change_log(table_name, seq)')
+    conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS {schema}.cdc_state (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            node_id TEXT NOT NULL,
+            apply_origin TEXT
+        )
+    """)
+    conn.execute(f"INSERT OR IGNORE INTO {schema}.cdc_state (id, node_id) VALUES (1, ?)", (uuid.uuid4().hex,))
+    conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS {schema}.sync_state (
+            source TEXT PRIMARY KEY,
+            last_seq INTEGER NOT NULL
+        )
+    """)
+    origin = '(SELECT coalesce(apply_origin, node_id) FROM cdc_state WHERE id = 1)'
+    for table in tables:
+        columns = [row[1] for row in conn.execute(f'PRAGMA {schema}.table_info({table})')]
+        for op, event in OPERATIONS.items():
+            ref = 'OLD' if op == 'D' else 'NEW'
+            if op == 'D':
+                payload = 'NULL'
+            else:
+                payload = 'json_object(' + ', '.join(f"'{column}', NEW.{column}" for column in columns) + ')'
+            conn.execute(f'DROP TRIGGER IF EXISTS {schema}.{table}_cdc_{event.lower()}')
+            conn.execute(f"""
+                CREATE TRIGGER {schema}.{table}_cdc_{event.lower()}
+                AFTER {event} ON {table}
+                BEGIN
+                    INSERT INTO change_log (table_name, op, row_id, payload, origin)
+                    VALUES ('{table}', '{op}', {ref}.id, {payload}, {origin});
+                END
+            """)
+
+
+def node_id(conn):
+    """
+    Returns the identifier of a database in the sync topology.
+
+    Args:
+        conn (sqlite3.Connection): Connection to a database with change capture installed.
+
+    Returns:
+        str: The node id.
+    """
+    return conn.execute('SELECT node_id FROM cdc_state WHERE id = 1').fetchone()[0]
+
+
+def last_sequence(conn):
+    """
+    Returns the sequence number of the latest captured change.
+
+    Args:
+        conn (sqlite3.Connection): Connection to a database with change capture installed.
+
+    Returns:
+        int: The latest ``seq``, or 0 if nothing has been captured.
+    """
+    return conn.execute('SELECT coalesce(max(seq), 0) FROM change_log').fetchone()[0]
+
+
+def table_version(conn, table):
+    """
+    Returns the sequence number of the latest captured change to one table.
+
+    The value changes whenever the table changes, through any connection, so it can
+    tag data derived from the table. Served by ``idx_change_log_table``.
+
+    Args:
+        conn (sqlite3.Connection): Connection to a database with change capture installed.
+        table (str): Table name.
+
+    Returns:
+        int: The latest ``seq`` of the table, or 0 if nothing has been captured.
+    """
+    return conn.execute('SELECT coalesce(max(seq), 0) FROM change_log WHERE table_name = ?', (table,)).fetchone()[0]
+
+
+def sync(source, target, batch_size=BATCH_SIZE, progress=None):
+    """
+    Ships the changes a target has not yet acknowledged from a source database.
+
+    Each batch is applied in one transaction together with the new acknowledged
+    sequence, so an interrupted sync resumes where it stopped. When a batch changes
+    registrations, the target's enrollment counters are recomputed in the same
+    transaction (see enrollment.py).
+
+    Args:
+        source (sqlite3.Connection): Database to read changes from.
+        target (sqlite3.Connection): Database to apply changes to.
+        batch_size (int): Number of changes applied per transaction.
+        progress (Callable[[int], None] | None): Called after each batch with the number of changes applied so far.
+
+    Returns:
+        int: Number of changes applied.
+    """
+    source_node = node_id(source)
+    target_node = node_id(target)
+    if source_node == target_node:
+        raise ValueError('Source and target are the same database')
+    row = target.execute('SELECT last_seq FROM sync_state WHERE source = ?', (source_node,)).fetchone()
+    acknowledged = row[0] if row else 0
+    columns = {}
+    applied = 0
+    applying = None
+    counted = target.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'course_enrollment'").fetchone() is not None
+    while True:
+        changes = source.execute(
+            'SELECT seq, table_name, op, row_id, payload, origin FROM change_log WHERE seq > ? ORDER BY seq LIMIT ?',
+            (acknowledged, batch_size)).fetchall()
+        if not changes:
+            return applied
+        with target:
+            for seq, table, op, row_id, payload, origin in changes:
+                if origin == target_node:
+                    continue
+                if origin != applying:
+                    target.execute('UPDATE cdc_state SET apply_origin = ? WHERE id = 1', (origin,))
+                    applying = origin
+                names = _columns(target, table, columns)
+                if op == 'D':
+                    target.execute(f'DELETE FROM {table} WHERE id = ?', (row_id,))
+                else:
+                    values = json.loads(payload)
+                    names = [name for name in names if name in values]
+                    target.execute(
+                        f"INSERT OR REPLACE INTO {table} ({', '.join(names)}) VALUES ({', '.join('?' for _ in names)})",
+                        [values[name] for name in names])
+                applied += 1
+            acknowledged = changes[-1][0]
+            target.execute('UPDATE cdc_state SET apply_origin = NULL WHERE id = 1')
+            applying = None
+            if counted and any(change[1] == 'registrations' and change[5] != target_node for change in changes):
+                enrollment.recount(target)
+            target.execute('INSERT OR REPLACE INTO sync_state (source, last_seq) VALUES (?, ?)',
+                           (source_node, acknowledged))
+        if progress:
+            progress(applied)
+
+
+def _columns(conn, table, cache):
+    # Also validates the table name before it is used in SQL.
+    if table not in cache:
+        cache[table] = [row[1] for row in conn.execute('SELECT * FROM pragma_table_info(?)', (table,))]
+        if not cache[table]:
+            raise ValueError(f"Change log refers to unknown table '{table}'")
+    return cache[table]
+
+
+def main(argv=None):
+    """
+    Command line entry point for syncing database copies.
+
+    Args:
+        argv (list[str] | None): Arguments, defaults to ``sys.argv[1:]``.
+
+    Returns:
+        int: Process exit status.
+    """
+    parser = argparse.ArgumentParser(description='Incremental sync between school.db copies')
+    commands = parser.add_subparsers(dest='command', required=True)
+    sync_parser = commands.add_parser('sync', help='apply new changes from SOURCE to TARGET')
+    sync_parser.add_argument('source')
+    sync_parser.add_argument('target')
+    sync_parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+    status_parser = commands.add_parser('status', help='show the node id, latest change and acknowledged sources')
+    status_parser.add_argument('database')
+    args = parser.parse_args(argv)
+
+    if args.command == 'sync':
+        source = sqlite3.connect(f'file:{args.source}?mode=ro', uri=True)
+        target = sqlite3.connect(args.target)
+        applied = sync(source, target, args.batch_size)
+        print(f'applied {applied} changes from {node_id(source)} to {node_id(target)}')
+    else:
+        conn = sqlite3.connect(f'file:{args.database}?mode=ro', uri=True)
+        print(f'node {node_id(conn)}, latest change {last_sequence(conn)}')
+        for source, seq in conn.execute('SELECT source, last_seq FROM sync_state ORDER BY source'):
+            print(f'  acknowledged {source} up to {seq}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,340 @@
+"""
+Columnar snapshot export and import for the school database.
+
+Each table is written to its own file inside a snapshot directory. When
+pyarrow is installed the files are Parquet (``<table>.parquet``); otherwise a
+small stdlib format (``<table>.scol``) is used that stores typed, zlib
+compressed column batches. Both formats are read and written in batches so
+memory use stays flat regardless of table size.
+
+Registrations partitioned by term (see partitions.py) are written next to the
+tables, one ``registrations_<term>`` file per term file; :func:`import_tables`
+loads those of the given terms into the terms' attached files.
+"""
+import json
+import os
+import struct
+import sys
+import zlib
+from array import array
+
+import partitions
+import schema
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - depends on the environment
+    pa = None
+    pq = None
+
+HAVE_PYARROW = pa is not None
+
+TABLES = schema.TABLES
+BATCH_SIZE = 50000
+
+MAGIC = b'SCOL1\n'
+PARQUET_SUFFIX = '.parquet'
+SCOL_SUFFIX = '.scol'
+
+_U32 = struct.Struct('<I')
+
+
+def column_types(conn, table):
+    """
+    Returns the columns of a table together with their snapshot type.
+
+    The type is derived from the declared column type using SQLite's
+    affinity rules and is one of ``int64``, ``float64`` or ``utf8``.
+
+    Args:
+        conn (sqlite3.Connection): Connection to read the schema from.
+        table (str): Name of the table.
+
+    Returns:
+        list[tuple[str, str]]: ``(column_name, type)`` pairs in table order.
+    """
+    columns = []
+    for _, name, declared, _, _, _ in conn.execute(f'PRAGMA table_info({table})'):
+        declared = (declared or '').upper()
+        if 'INT' in declared:
+            kind = 'int64'
+        elif any(word in declared for word in ('REAL', 'FLOA', 'DOUB')):
+            kind = 'float64'
+        else:
+            kind = 'utf8'
+        columns.append((name, kind))
+    if not columns:
+        raise ValueError(f"Unknown table '{table}'")
+    return columns
+
+
+def _batches(cursor, batch_size):
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            return
+        yield rows
+
+
+def export_tables(conn, directory, tables=TABLES, batch_size=BATCH_SIZE, use_parquet=None, terms_dir=None):
+    """
+    Writes a columnar snapshot of the given tables into a directory.
+
+    Args:
+        conn (sqlite3.Connection): Source database connection.
+        directory (str): Directory to write the snapshot files into. It is created if missing.
+        tables (Iterable[str]): Tables to export.
+        batch_size (int): Number of rows fetched and written per batch.
+        use_parquet (bool | None): Force or disable Parquet. Defaults to Parquet when pyarrow is installed.
+        terms_dir (str | None): Terms directory; when given and ``registrations`` is exported,
+            the registrations of every term, open or archived, are written to ``registrations_<term>``.
+
+    Returns:
+        dict[str, int]: Number of rows written per table and per term file.
+    """
+    if use_parquet is None:
+        use_parquet = HAVE_PYARROW
+    if use_parquet and not HAVE_PYARROW:
+        raise RuntimeError('Parquet export requires pyarrow')
+    os.makedirs(directory, exist_ok=True)
+    tables = list(tables)
+    counts = {}
+    for table in tables:
+        counts[table] = _export_table(conn, table, os.path.join(directory, table), batch_size, use_parquet)
+    if terms_dir and 'registrations' in tables:
+        for term, path in partitions.term_files(terms_dir):
+            name = f'registrations_{term}'
+            term_conn = partitions.connect_term(path)
+            try:
+                counts[name] = _export_table(term_conn, 'registrations', os.path.join(directory, name),
+                                             batch_size, use_parquet)
+            finally:
+                term_conn.close()
+    return counts
+
+
+def _export_table(conn, table, base, batch_size, use_parquet):
+    columns = column_types(conn, table)
+    names = ', '.join(name for name, _ in columns)
+    cursor = conn.execute(f'SELECT {names} FROM {table} ORDER BY rowid')
+    if use_parquet:
+        return _write_parquet(base + PARQUET_SUFFIX, columns, _batches(cursor, batch_size))
+    return _write_scol(base + SCOL_SUFFIX, table, columns, _batches(cursor, batch_size))
+
+
+def import_tables(conn, directory, tables=TABLES, batch_size=BATCH_SIZE, terms=()):
+    """
+    Loads a columnar snapshot into the database.
+
+    Rows are inserted with ``INSERT OR REPLACE`` so primary keys from the
+    snapshot are kept and re-importing the same snapshot is idempotent. Tables
+    without a snapshot file in the directory are skipped.
+
+    Args:
+        conn (sqlite3.Connection): Target database connection.
+        directory (str): Directory containing the snapshot files.
+        tables (Iterable[str]): Tables to import.
+        batch_size (int): Number of rows inserted per batch.
+        terms (Iterable[str]): Open terms attached to the connection (see
+            partitions.py) whose ``registrations_<term>`` files are imported into the term's
+            ``registrations`` table.
+
+    Returns:
+        dict[str, int]: Number of rows read per table and per term file.
+
+    Raises:
+        RuntimeError: If a Parquet snapshot is found but pyarrow is not installed.
+    """
+    sources = [(table, table) for table in tables]
+    sources += [(f'registrations_{term}', f'{partitions.TermPartitions.alias(term)}.registrations') for term in terms]
+    counts = {}
+    for name, table in sources:
+        parquet_path = os.path.join(directory, name + PARQUET_SUFFIX)
+        scol_path = os.path.join(directory, name + SCOL_SUFFIX)
+        if os.path.exists(scol_path):
+            names, batches = _read_scol(scol_path)
+        elif os.path.exists(parquet_path):
+            if not HAVE_PYARROW:
+                raise RuntimeError('Reading Parquet snapshots requires pyarrow')
+            names, batches = _read_parquet(parquet_path, batch_size)
+        else:
+            continue
+        placeholders = ', '.join('?' for _ in names)
+        sql = f"INSERT OR REPLACE INTO {table} ({', '.join(names)}) VALUES ({placeholders})"
+        count = 0
+        with conn:
+            for rows in batches:
+                conn.executemany(sql, rows)
+                count += len(rows)
+        counts[name] = count
+    return counts
+
+
+def _write_parquet(path, columns, batches):
+    types = {'int64': pa.int64(), 'float64': pa.float64(), 'utf8': pa.string()}
+    arrow_schema = pa.schema([(name, types[kind]) for name, kind in columns])
+    count = 0
+    with pq.ParquetWriter(path, arrow_schema, compression='zstd') as writer:
+        for rows in batches:
+            arrays = [pa.array(list(values), type=field.type)
+                      for values, field in zip(zip(*rows), arrow_schema)]
+            writer.write_batch(pa.record_batch(arrays, schema=arrow_schema))
+            count += len(rows)
+    return count
+
+
+def _read_parquet(path, batch_size):
+    parquet_file = pq.ParquetFile(path)
+    names = parquet_file.schema_arrow.names
+
+    def batches():
+        for batch in parquet_file.iter_batches(batch_size=batch_size):
+            yield list(zip(*(column.to_pylist() for column in batch.columns)))
+
+    return names, batches()
+
+
+def _encode_column(values, kind):
+    """Encodes one column of a batch as ``null mask + typed payload``."""
+    nulls = bytes(1 if value is None else 0 for value in values)
+    if kind == 'utf8':
+        offsets = [0]
+        chunks = []
+        total = 0
+        for value in values:
+            if value is not None:
+                encoded = str(value).encode('utf-8')
+                chunks.append(encoded)
+                total += len(encoded)
+            offsets.append(total)
+        payload = struct.pack(f'<{len(offsets)}I', *offsets) + b''.join(chunks)
+    else:
+        typecode = 'q' if kind == 'int64' else 'd'
+        default = 0 if kind == 'int64' else 0.0
+        try:
+            payload = _little_endian(array(typecode, (default if value is None else value for value in values)))
+        except TypeError as exc:
+            raise ValueError(f'Value does not match column type {kind}: {exc}') from None
+    return nulls + payload
+
+
+def _decode_column(buffer, offset, count, kind):
+    nulls = buffer[offset:offset + count]
+    offset += count
+    if kind == 'utf8':
+        offsets = struct.unpack_from(f'<{count + 1}I', buffer, offset)
+        offset += 4 * (count + 1)
+        data = buffer[offset:offset + offsets[-1]]
+        offset += offsets[-1]
+        values = [None if nulls[i] else data[offsets[i]:offsets[i + 1]].decode('utf-8')
+                  for i in range(count)]
+    else:
+        typecode = 'q' if kind == 'int64' else 'd'
+        values = _from_little_endian(typecode, buffer[offset:offset + 8 * count]).tolist()
+        offset += 8 * count
+        for i in range(count):
+            if nulls[i]:
+                values[i] = None
+    return values, offset
+
+
+class ScolWriter:
+    """
+    Writes the stdlib columnar format to an open binary file, one batch at a time.
+
+    Attributes
+    ----------
+    count : int
+        Number of rows written so far.
+    """
+    def __init__(self, file, table, columns):
+        """
+        Writes the file header.
+
+        Args:
+            file (BinaryIO): File opened for binary writing.
+            table (str): Table name recorded in the header.
+            columns (list[tuple[str, str]]): ``(column_name, type)`` pairs, see :func:`column_types`.
+        """
+        self.file = file
+        self.columns = columns
+        self.count = 0
+        header = json.dumps({'table': table, 'columns': [[name, kind] for name, kind in columns]}).encode('utf-8')
+        file.write(MAGIC)
+        file.write(_U32.pack(len(header)))
+        file.write(header)
+
+    def write(self, rows):
+        """
+        Writes one batch of rows as a compressed block.
+
+        Args:
+            rows (list[tuple]): Rows with values in column order.
+        """
+        if not rows:
+            return
+        payload = b''.join(_encode_column(values, kind)
+                           for values, (_, kind) in zip(zip(*rows), self.columns))
+        compressed = zlib.compress(payload, 6)
+        self.file.write(_U32.pack(len(rows)))
+        self.file.write(_U32.pack(len(compressed)))
+        self.file.write(compressed)
+        self.count += len(rows)
+
+    def close(self):
+        """
+        Writes the end marker. Does not close the file.
+        """
+        self.file.write(_U32.pack(0))
+
+
+def _write_scol(path, table, columns, batches):
+    with open(path, 'wb') as file:
+        writer = ScolWriter(file, table, columns)
+        for rows in batches:
+            writer.write(rows)
+        writer.close()
+    return writer.count
+
+
+def _read_scol(path):
+    with open(path, 'rb') as file:
+        if file.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f'{path} is not a columnar snapshot file')
+        header = json.loads(file.read(_U32.unpack(file.read(4))[0]))
+        start = file.tell()
+    columns = header['columns']
+
+    def batches():
+        with open(path, 'rb') as file:
+            file.seek(start)
+            while True:
+                (count,) = _U32.unpack(file.read(4))
+                if count == 0:
+                    return
+                (size,) = _U32.unpack(file.read(4))
+                buffer = zlib.decompress(file.read(size))
+                offset = 0
+                decoded = []
+                for _, kind in columns:
+                    values, offset = _decode_column(buffer, offset, count, kind)
+                    decoded.append(values)
+                yield list(zip(*decoded))
+
+    return [name for name, _ in columns], batches()
+
+
+def _little_endian(values):
+    if sys.byteorder == 'big':
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _from_little_endian(typecode, data):
+    values = array(typecode)
+    values.frombytes(data)
+    if sys.byteorder == 'big':
+        values.byteswap()
+    return values
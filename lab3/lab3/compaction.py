@@ -0,0 +1,240 @@
+"""
+Soft deletes, tombstone purging and file compaction.
+
+Deleting a student, instructor or course only sets its ``deleted_at`` (Unix
+time). Deleted rows are tombstones: the listing, search and lookup queries
+all filter on ``deleted_at IS NULL``, and the listing indexes are partial
+indexes over live rows only, so tombstones cost the hot queries nothing.
+A tombstone is an ordinary update, so it reaches other clerks' grids
+through the change poll and other copies through the sync.
+
+:func:`compact` purges tombstones older than a retention period in small
+batches, each its own transaction, so clerks are never blocked for long, then
+returns the freed pages to the file system with ``PRAGMA incremental_vacuum``.
+New databases are created with ``auto_vacuum = INCREMENTAL``; older ones are
+converted once with ``--enable-incremental``, which rewrites the file with
+``VACUUM`` and needs exclusive access. ``--vacuum-into`` writes a compacted,
+defragmented copy without locking out writers, e.g. for a scheduled job that
+swaps it in during maintenance::
+
+    python compaction.py school.db                        # purge and vacuum
+    python compaction.py school.db --status
+    python compaction.py school.db --enable-incremental
+    python compaction.py school.db --vacuum-into compacted.db
+
+The application runs :func:`compact` as a background job every
+``COMPACTION_INTERVAL`` seconds.
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import time
+
+import statements
+
+RETENTION = 24 * 3600
+BATCH_SIZE = 1000
+VACUUM_PAGES = 256
+COMPACTION_INTERVAL = 3600
+AUTO_VACUUM_MODES = {0: 'none', 1: 'full', 2: 'incremental'}
+
+
+def install(conn):
+    """
+    Adds the ``deleted_at`` column and a partial index over tombstones to the student,
+    instructor and course tables. Does not commit.
+
+    Args:
+        conn (sqlite3.Connection): Connection to the database.
+    """
+    for entity in statements.ENTITIES.values():
+        columns = {row[1] for row in conn.execute(f'PRAGMA table_info({entity.table})')}
+        if 'deleted_at' not in columns:
+            conn.execute(f'ALTER TABLE {entity.table} ADD COLUMN deleted_at INTEGER')
+        conn.execute(f'CREATE INDEX IF NOT EXISTS idx_{entity.table}_tombstones '
+                     f'ON {entity.table}(deleted_at) WHERE deleted_at IS NOT NULL')
+
+
+def status(conn):
+    """
+    Describes how much of the database is tombstones and free pages.
+
+    Args:
+        conn (sqlite3.Connection): Connection to the database.
+
+    Returns:
+        dict: ``tombstones`` per table, ``page_count``, ``freelist_count``, ``page_size``
+        and the ``auto_vacuum`` mode.
+    """
+    return {
+        'tombstones': {entity.table: conn.execute(
+            f'SELECT count(*) FROM {entity.table} WHERE deleted_at IS NOT NULL').fetchone()[0]
+            for entity in statements.ENTITIES.values()},
+        'page_count': conn.execute('PRAGMA page_count').fetchone()[0],
+        'freelist_count': conn.execute('PRAGMA freelist_count').fetchone()[0],
+        'page_size': conn.execute('PRAGMA page_size').fetchone()[0],
+        'auto_vacuum': AUTO_VACUUM_MODES[conn.execute('PRAGMA auto_vacuum').fetchone()[0]],
+    }
+
+
+def purge(conn, retention=RETENTION, batch_size=BATCH_SIZE, progress=None):
+    """
+    Deletes tombstones older than the retention period, one committed batch at a time.
+
+    Args:
+        conn (sqlite3.Connection): Connection to the database, with no transaction open.
+        retention (float): Seconds a tombstone is kept.
+        batch_size (int): Rows deleted per transaction.
+        progress (Callable[[int], None] | None): Called after each batch with the number
+            of rows purged so far; may raise to stop between batches.
+
+    Returns:
+        int: Number of rows purged.
+    """
+    cutoff = int(time.time() - retention)
+    purged = 0
+    for entity in statements.ENTITIES.values():
+        while True:
+            with conn:
+                deleted = conn.execute(
+                    f'DELETE FROM {entity.table} WHERE id IN (SELECT id FROM {entity.table} '
+                    f'WHERE deleted_at IS NOT NULL AND deleted_at <= ? LIMIT ?)', (cutoff, batch_size)).rowcount
+            purged += deleted
+            if progress:
+                progress(purged)
+            if deleted < batch_size:
+                break
+    return purged
+
+
+def incremental_vacuum(conn, pages=VACUUM_PAGES, progress=None):
+    """
+    Returns free pages to the file system, a few at a time.
+
+    Does nothing unless the database uses ``auto_vacuum = INCREMENTAL``.
+
+    Args:
+        conn (sqlite3.Connection): Connection to the database, with no transaction open.
+        pages (int): Pages released per step.
+        progress (Callable[[int], None] | None): Called after each step with the number
+            of pages released so far; may raise to stop between steps.
+
+    Returns:
+        int: Number of pages released.
+    """
+    if conn.execute('PRAGMA auto_vacuum').fetchone()[0] != 2:
+        return 0
+    released = 0
+    while True:
+        free = conn.execute('PRAGMA freelist_count').fetchone()[0]
+        if not free:
+            return released
+        conn.execute(f'PRAGMA incremental_vacuum({min(free, pages)})').fetchall()
+        released += min(free, pages)
+        if progress:
+            progress(released)
+
+
+def compact(conn, retention=RETENTION, batch_size=BATCH_SIZE, progress=None):
+    """
+    Purges old tombstones, then releases the freed pages.
+
+    Args:
+        conn (sqlite3.Connection): Connection to the database, with no transaction open.
+        retention (float): Seconds a tombstone is kept.
+        batch_size (int): Rows deleted per transaction.
+        progress (Callable[[int], None] | None): Called with the number of rows purged,
+            then of pages released, so far; may raise to stop.
+
+    Returns:
+        tuple[int, int]: Rows purged and pages released.
+    """
+    purged = purge(conn, retention, batch_size, progress)
+    return purged, incremental_vacuum(conn, progress=progress)
+
+
+def enable_incremental(conn):
+    """
+    Switches a database to ``auto_vacuum = INCREMENTAL``.
+
+    Rewrites the whole file with ``VACUUM``, which needs exclusive access; run it
+    while the application is closed.
+
+    Args:
+        conn (sqlite3.Connection): Connection to the database, with no transaction open.
+    """
+    conn.execute('PRAGMA auto_vacuum = INCREMENTAL')
+    conn.execute('VACUUM')
+
+
+def vacuum_into(conn, path):
+    """
+    Writes a compacted, defragmented copy of the database.
+
+    Readers and writers of the database are not blocked. The copy is written next to
+    ``path`` and renamed over it once complete.
+
+    Args:
+        conn (sqlite3.Connection): Connection to the database, with no transaction open.
+        path (str): File to write the copy to. Replaced if it exists.
+    """
+    temp_path = f'{path}.tmp-{os.getpid()}'
+    if os.path.exists(temp_path):
+        os.remove(temp_path)
+    try:
+        conn.execute('VACUUM INTO ?', (temp_path,))
+        os.replace(temp_path, path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+def _describe(info):
+    size = info['page_count'] * info['page_size']
+    free = info['freelist_count'] * info['page_size']
+    tombstones = ', '.join(f'{table} {count}' for table, count in info['tombstones'].items())
+    return (f"{size / 1024 ** 2:,.1f} MiB, {free / 1024 ** 2:,.1f} MiB free, auto_vacuum {info['auto_vacuum']}; "
+            f'tombstones: {tombstones}')
+
+
+def main(argv=None):
+    """
+    Command line entry point.
+
+    Args:
+        argv (list[str] | None): Arguments, defaults to ``sys.argv[1:]``.
+
+    Returns:
+        int: Process exit status.
+    """
+    parser = argparse.ArgumentParser(description='Purge deleted rows and compact the school database')
+    parser.add_argument('database')
+    parser.add_argument('--retention', type=float, default=RETENTION, help='seconds deleted rows are kept')
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+    parser.add_argument('--status', action='store_true', help='only show tombstones and free space')
+    parser.add_argument('--enable-incremental', action='store_true',
+                        help='switch to incremental auto-vacuum (rewrites the file; needs exclusive access)')
+    parser.add_argument('--vacuum-into', metavar='FILE', help='also write a compacted copy to FILE')
+    args = parser.parse_args(argv)
+
+    conn = sqlite3.connect(args.database)
+    try:
+        print('before:', _describe(status(conn)))
+        if args.status:
+            return 0
+        if args.enable_incremental:
+            enable_incremental(conn)
+        purged, released = compact(conn, args.retention, args.batch_size)
+        print(f'purged {purged} rows, released {released} pages')
+        if args.vacuum_into:
+            vacuum_into(conn, args.vacuum_into)
+            print(f'compacted copy written to {args.vacuum_into}')
+        print('after: ', _describe(status(conn)))
+    finally:
+        conn.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
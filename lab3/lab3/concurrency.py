@@ -0,0 +1,166 @@
+"""
+Optimistic concurrency for edits made in the View All table.
+
+Every student, instructor and course row carries a ``version`` that each edit
+increments. The grid remembers the version of every row it shows, and an edit
+is a compare-and-swap::
+
+    UPDATE students SET name = ?, version = version + 1 WHERE id = ? AND version = ?
+
+If another clerk changed or deleted the row in the meantime, no row matches
+and :func:`update_name` raises :class:`EditConflict` with the row as it is
+now, instead of silently overwriting the other change. Deletes
+(:func:`delete`) are checked the same way. No locks are held while a clerk
+is typing.
+
+:class:`ChangePoller` keeps an open grid current without full refreshes: it
+reads the change log entries recorded since its last poll (a range seek on
+``change_log.seq``) and returns only the rows shown in the grid that were
+changed or deleted since.
+"""
+import dedup
+import records
+import statements
+
+
+class EditConflict(Exception):
+    """
+    The row was changed or deleted by someone else since it was read.
+
+    Attributes
+    ----------
+    current : records.ListingRow | None
+        The row as it is now, or None if it was deleted.
+    """
+    def __init__(self, message, current):
+        super().__init__(message)
+        self.current = current
+
+
+def install(conn):
+    """
+    Adds the ``version`` column to the student, instructor and course tables. Does not commit.
+
+    Args:
+        conn (sqlite3.Connection): Connection to the database.
+    """
+    for entity in statements.ENTITIES.values():
+        columns = {row[1] for row in conn.execute(f'PRAGMA table_info({entity.table})')}
+        if 'version' not in columns:
+            conn.execute(f'ALTER TABLE {entity.table} ADD COLUMN version INTEGER NOT NULL DEFAULT 1')
+
+
+def current_row(conn, entity, row_id):
+    """
+    Reads one row as the grid shows it.
+
+    Args:
+        conn (sqlite3.Connection): Connection to the database.
+        entity (statements.Entity): The row's entity.
+        row_id (int): Row id in the entity's table.
+
+    Returns:
+        records.ListingRow | None: The row, or None if it does not exist.
+    """
+    row = conn.execute(statements.sql(f'{entity.table}.current'), (row_id,)).fetchone()
+    return records.ListingRow._make(row) if row else None
+
+
+def update_name(conn, row, new_value):
+    """
+    Renames a row if it still has the version it was read with. Does not commit.
+
+    Args:
+        conn (sqlite3.Connection): Connection to the database.
+        row (records.ListingRow): The row as it was read, including its ``version``.
+        new_value (str): The new name or course name.
+
+    Returns:
+        records.ListingRow: The updated row with its new version.
+
+    Raises:
+        EditConflict: If the row was changed or deleted since it was read.
+    """
+    entity = row.entity
+    cursor = conn.execute(statements.sql(f'{entity.table}.update_name_versioned'), (new_value, row.row_id, row.version))
+    if not cursor.rowcount:
+        raise _conflict(conn, row)
+    if entity.table in dedup.TABLES:
+        dedup.update_name_key(conn, entity.table, row.row_id, new_value)
+    return row._replace(name=new_value, version=row.version + 1)
+
+
+def delete(conn, row):
+    """
+    Marks a row deleted if it still has the version it was read with. Does not commit.
+
+    The row stays as a tombstone until the compaction job purges it (see compaction.py).
+
+    Args:
+        conn (sqlite3.Connection): Connection to the database.
+        row (records.ListingRow): The row as it was read, including its ``version``.
+
+    Raises:
+        EditConflict: If the row was changed or deleted since it was read.
+    """
+    cursor = conn.execute(statements.sql(f'{row.entity.table}.delete'), (row.row_id, row.version))
+    if not cursor.rowcount:
+        raise _conflict(conn, row)
+
+
+def _conflict(conn, row):
+    current = current_row(conn, row.entity, row.row_id)
+    if current is None:
+        return EditConflict(f"This {row.type} was deleted by another user.", None)
+    return EditConflict(f"This {row.type} was changed by another user; it is now '{current.name}'.", current)
+
+
+class ChangePoller:
+    """
+    Finds the rows of an open grid that changed since the last poll.
+
+    Attributes
+    ----------
+    seq : int
+        Change log sequence number up to which changes have been seen.
+    """
+    def __init__(self, conn):
+        """
+        Starts watching at the latest change.
+
+        Args:
+            conn (sqlite3.Connection): Connection to a database with change capture installed.
+        """
+        self.seq = conn.execute('SELECT coalesce(max(seq), 0) FROM change_log').fetchone()[0]
+
+    def poll(self, conn, shown):
+        """
+        Reads the changes since the last poll.
+
+        Args:
+            conn (sqlite3.Connection): Connection to the database.
+            shown (Container[str]): Treeview item ids of the rows in the grid.
+
+        Returns:
+            tuple[dict, int]: Maps the item id of every shown row that changed to its
+            current :class:`records.ListingRow`, or None if it was deleted; and the number
+            of rows inserted, which the grid does not show until it is refreshed.
+        """
+        changes = conn.execute(statements.sql('change_log.since'), (self.seq,)).fetchall()
+        if not changes:
+            return {}, 0
+        self.seq = changes[-1][0]
+        tables = {entity.table: entity for entity in statements.ENTITIES.values()}
+        changed = {}
+        inserted = 0
+        for _, table, op, row_id in changes:
+            entity = tables.get(table)
+            if entity is None:
+                continue
+            if op == 'I':
+                inserted += 1
+                continue
+            iid = f'{entity.type}:{row_id}'
+            if iid in shown:
+                changed[iid] = entity
+        return {iid: current_row(conn, entity, int(iid.rsplit(':', 1)[1])) for iid, entity in changed.items()}, inserted
@@ -0,0 +1,238 @@
+"""
+Database location and connection mode for the school database.
+
+Settings are read, in increasing order of precedence, from built-in defaults,
+an INI config file, environment variables and command line flags:
+
+===============  ========================  ====================  ===============
+Setting          Config file ([database])  Environment           Flag
+===============  ========================  ====================  ===============
+database / URI   ``uri``                   ``SCHOOL_DB``         ``--db``
+mode             ``mode``                  ``SCHOOL_DB_MODE``    ``--mode``
+read only        ``read_only``             ``SCHOOL_DB_RO``      ``--read-only``
+current term     ``term``                  ``SCHOOL_TERM``       ``--term``
+terms directory  ``terms_dir``             ``SCHOOL_TERMS_DIR``  ``--terms-dir``
+replica refresh  ``refresh_interval``      ``SCHOOL_REFRESH``    ``--refresh-interval``
+config file                                ``SCHOOL_CONFIG``     ``--config``
+===============  ========================  ====================  ===============
+
+Modes:
+
+``file``
+    Open the database file (or ``file:`` URI such as ``file:replica.db?mode=ro``) directly.
+``memory``
+    A named, shared-cache in-memory database; fast and disposable, for tests and benchmarks.
+``preload``
+    Copy the database file into a shared-cache in-memory database at startup.
+    Reads never touch the disk again; writes are not persisted.
+``replica``
+    Read-only reporting mode: read a snapshot of the database file, made with the
+    backup API and refreshed every ``refresh_interval`` seconds, without taking locks
+    on the database itself (see replica.py).
+
+Setting a current term stores registrations in per-term files in the terms
+directory (see partitions.py).
+"""
+import argparse
+import configparser
+import os
+import sqlite3
+import urllib.parse
+
+import replica
+import statements
+
+DEFAULT_DATABASE = 'school.db'
+DEFAULT_CONFIG_FILE = 'school.ini'
+DEFAULT_TERMS_DIR = 'terms'
+MODES = ('file', 'memory', 'preload', 'replica')
+
+_TRUE = ('1', 'true', 'yes', 'on')
+
+
+class DatabaseConfig:
+    """
+    Where the school database lives and how to open it.
+
+    Attributes
+    ----------
+    database : str
+        File path or ``file:`` URI of the database. In ``memory`` mode this is the name
+        of the shared in-memory database.
+    mode : str
+        One of ``file``, ``memory``, ``preload`` or ``replica``.
+    read_only : bool
+        Open the database read-only.
+    term : str or None
+        Current term. When set, registrations are partitioned into per-term files.
+    terms_dir : str
+        Directory holding the per-term registration files.
+    refresh_interval : float
+        Seconds between snapshot refreshes in ``replica`` mode.
+    """
+    def __init__(self, database=DEFAULT_DATABASE, mode='file', read_only=False, term=None, terms_dir=DEFAULT_TERMS_DIR,
+                 refresh_interval=replica.DEFAULT_REFRESH_INTERVAL):
+        if mode not in MODES:
+            raise ValueError(f"Unknown database mode '{mode}', expected one of {', '.join(MODES)}")
+        self.database = database
+        self.mode = mode
+        self.read_only = read_only
+        self.term = term
+        self.terms_dir = terms_dir
+        self.refresh_interval = refresh_interval
+
+    def __repr__(self):
+        return (f'DatabaseConfig(database={self.database!r}, mode={self.mode!r}, read_only={self.read_only!r}, '
+                f'term={self.term!r}, terms_dir={self.terms_dir!r}, refresh_interval={self.refresh_interval!r})')
+
+    @property
+    def is_read_only(self):
+        """bool: Whether connections cannot write: by flag, through a ``mode=ro`` URI, or as a replica."""
+        return self.read_only or self.mode == 'replica' or (self.mode == 'file' and 'mode=ro' in self.database)
+
+    @property
+    def replica_path(self):
+        """str: Snapshot file read in ``replica`` mode."""
+        return replica.replica_path(self.database)
+
+    def uri(self):
+        """
+        Builds the SQLite URI the application connects to.
+
+        File paths are escaped, and ``read_only`` sets ``mode=ro`` on ``file:`` URIs given as
+        the database as well.
+
+        Returns
+        -------
+        str
+            A ``file:`` URI.
+        """
+        if self.mode == 'memory':
+            return f'file:{self.database}?mode=memory&cache=shared'
+        if self.mode == 'preload':
+            return f'file:{os.path.basename(self.database)}-preload?mode=memory&cache=shared'
+        if self.mode == 'replica':
+            return replica.uri(self.replica_path)
+        uri = self.database if self.database.startswith('file:') else 'file:' + urllib.parse.quote(self.database)
+        if self.read_only:
+            path, _, query = uri.partition('?')
+            parameters = [parameter for parameter in query.split('&') if parameter and not parameter.startswith('mode=')]
+            uri = path + '?' + '&'.join(parameters + ['mode=ro'])
+        return uri
+
+    def connect(self):
+        """
+        Opens a new connection according to the configured mode.
+
+        In ``preload`` mode the first connection copies the database file into memory;
+        later connections share that in-memory copy for as long as one stays open.
+        In ``replica`` mode the snapshot is refreshed first if it is missing or older
+        than the refresh interval.
+
+        Returns
+        -------
+        sqlite3.Connection
+            The connection object to the SQLite database.
+        """
+        if self.mode == 'replica' and replica.is_stale(self.replica_path, self.refresh_interval):
+            replica.refresh(self.database, self.replica_path)
+        conn = sqlite3.connect(self.uri(), uri=True, cached_statements=statements.CACHE_SIZE)
+        if self.mode == 'preload' and not conn.execute('SELECT count(*) FROM sqlite_master').fetchone()[0]:
+            source = sqlite3.connect(f'file:{urllib.parse.quote(self.database)}?mode=ro', uri=True)
+            try:
+                source.backup(conn)
+            finally:
+                source.close()
+        return conn
+
+
+def add_arguments(parser):
+    """
+    Adds the database flags to an argument parser.
+
+    Args:
+        parser (argparse.ArgumentParser): Parser to extend.
+    """
+    parser.add_argument('--db', help='database file path or file: URI')
+    parser.add_argument('--mode', choices=MODES, help='connection mode')
+    parser.add_argument('--read-only', action='store_true', default=None, help='open the database read-only')
+    parser.add_argument('--term', help='current term; enables per-term registration files')
+    parser.add_argument('--terms-dir', help=f'directory of per-term registration files (default {DEFAULT_TERMS_DIR})')
+    parser.add_argument('--refresh-interval', type=float, metavar='SECONDS',
+                        help=f'snapshot refresh interval in replica mode (default {replica.DEFAULT_REFRESH_INTERVAL:g})')
+    parser.add_argument('--config', help=f'INI config file (default {DEFAULT_CONFIG_FILE})')
+
+
+def from_args(args, environ=None):
+    """
+    Resolves the configuration from parsed flags, the environment and the config file.
+
+    Args:
+        args (argparse.Namespace): Parsed flags from a parser set up with :func:`add_arguments`.
+        environ (Mapping[str, str] | None): Environment, defaults to ``os.environ``.
+
+    Returns:
+        DatabaseConfig: The resolved configuration.
+    """
+    environ = os.environ if environ is None else environ
+    settings = {'database': DEFAULT_DATABASE, 'mode': 'file', 'read_only': False,
+                'term': None, 'terms_dir': DEFAULT_TERMS_DIR, 'refresh_interval': replica.DEFAULT_REFRESH_INTERVAL}
+
+    config_file = args.config or environ.get('SCHOOL_CONFIG') or DEFAULT_CONFIG_FILE
+    parser = configparser.ConfigParser()
+    if parser.read(config_file) and parser.has_section('database'):
+        section = parser['database']
+        settings['database'] = section.get('uri', settings['database'])
+        settings['mode'] = section.get('mode', settings['mode'])
+        settings['read_only'] = section.getboolean('read_only', settings['read_only'])
+        settings['term'] = section.get('term', settings['term'])
+        settings['terms_dir'] = section.get('terms_dir', settings['terms_dir'])
+        settings['refresh_interval'] = section.getfloat('refresh_interval', settings['refresh_interval'])
+    elif args.config:
+        raise FileNotFoundError(f"Config file '{args.config}' not found or has no [database] section")
+
+    if 'SCHOOL_DB' in environ:
+        settings['database'] = environ['SCHOOL_DB']
+    if 'SCHOOL_DB_MODE' in environ:
+        settings['mode'] = environ['SCHOOL_DB_MODE']
+    if 'SCHOOL_DB_RO' in environ:
+        settings['read_only'] = environ['SCHOOL_DB_RO'].lower() in _TRUE
+    if 'SCHOOL_TERM' in environ:
+        settings['term'] = environ['SCHOOL_TERM']
+    if 'SCHOOL_TERMS_DIR' in environ:
+        settings['terms_dir'] = environ['SCHOOL_TERMS_DIR']
+    if 'SCHOOL_REFRESH' in environ:
+        settings['refresh_interval'] = float(environ['SCHOOL_REFRESH'])
+
+    if args.db:
+        settings['database'] = args.db
+    if args.mode:
+        settings['mode'] = args.mode
+    if args.read_only:
+        settings['read_only'] = True
+    if args.term:
+        settings['term'] = args.term
+    if args.terms_dir:
+        settings['terms_dir'] = args.terms_dir
+    if args.refresh_interval:
+        settings['refresh_interval'] = args.refresh_interval
+    return DatabaseConfig(**settings)
+
+
+def load(argv=None, environ=None):
+    """
+    Parses database flags from a command line and resolves the configuration.
+
+    Unknown arguments are ignored so the caller can define its own flags.
+
+    Args:
+        argv (list[str] | None): Command line arguments, defaults to ``sys.argv[1:]``.
+        environ (Mapping[str, str] | None): Environment, defaults to ``os.environ``.
+
+    Returns:
+        DatabaseConfig: The resolved configuration.
+    """
+    parser = argparse.ArgumentParser(add_help=False)
+    add_arguments(parser)
+    args, _ = parser.parse_known_args(argv)
+    return from_args(args, environ)
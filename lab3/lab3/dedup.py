@@ -0,0 +1,304 @@
+"""
+Duplicate detection for students and instructors.
+
+Every row carries two derived keys:
+
+``email_key``
+    The normalized email. Exact duplicates share it and are found with one
+    index lookup. The index is not UNIQUE: imports and sync may bring in
+    duplicates that already exist elsewhere, and the batch job must still be
+    able to key and report them. New entries are rejected in the application.
+``name_key``
+    A phonetic blocking key (sorted Soundex codes of the name's words). Fuzzy
+    near-duplicates are only ever compared within a block or a small sorted
+    window, never all pairs.
+
+Batch detection over a whole table::
+
+    python dedup.py find school.db --table students
+"""
+import sqlite3
+import sys
+import unicodedata
+from collections import deque
+
+TABLES = ('students', 'instructors')
+BATCH_SIZE = 10000
+SIMILARITY = 0.8
+WINDOW = 10
+BLOCK_LIMIT = 500
+
+_SOUNDEX = {letter: str(code) for code, letters in enumerate(
+    ('aeiouyhw', 'bfpv', 'cgjkqsxz', 'dt', 'l', 'mn', 'r')) for letter in letters}
+
+
+def normalize_email(email):
+    """
+    Normalizes an email address for exact duplicate checks.
+
+    Args:
+        email (str): Email as entered.
+
+    Returns:
+        str: The trimmed, lower-cased email.
+    """
+    return (email or '').strip().lower()
+
+
+def normalize_name(name):
+    """
+    Normalizes a person's name for comparisons.
+
+    Accents and punctuation are removed, case is folded and whitespace collapsed.
+
+    Args:
+        name (str): Name as entered.
+
+    Returns:
+        str: The normalized name.
+    """
+    decomposed = unicodedata.normalize('NFKD', name or '')
+    letters = ''.join(char if char.isalnum() else ' ' for char in decomposed if not unicodedata.combining(char))
+    return ' '.join(letters.casefold().split())
+
+
+def soundex(word):
+    """
+    Returns the American Soundex code of a word.
+
+    Args:
+        word (str): A normalized word.
+
+    Returns:
+        str: Four character code, or an empty string for words without letters.
+    """
+    letters = [char for char in word if char in _SOUNDEX]
+    if not letters:
+        return ''
+    code = letters[0].upper()
+    previous = _SOUNDEX[letters[0]]
+    for char in letters[1:]:
+        digit = _SOUNDEX[char]
+        if digit != '0' and digit != previous:
+            code += digit
+        if char not in 'hw':
+            previous = digit
+    return (code + '000')[:4]
+
+
+def name_key(name):
+    """
+    Returns the phonetic blocking key of a name.
+
+    Word order does not matter, so "Smith John" and "Jon Smyth" share a key. Words
+    without letters (e.g. numerals) are kept as they are.
+
+    Args:
+        name (str): Name as entered.
+
+    Returns:
+        str: The blocking key.
+    """
+    return ' '.join(sorted(soundex(word) or word for word in normalize_name(name).split()))
+
+
+def keys(name, email):
+    """
+    Returns the derived keys stored with a row.
+
+    Args:
+        name (str): Name as entered.
+        email (str): Email as entered.
+
+    Returns:
+        tuple[str, str]: ``(email_key, name_key)``.
+    """
+    return normalize_email(email), name_key(name)
+
+
+def similarity(name_a, name_b):
+    """
+    Scores how alike two names are.
+
+    Args:
+        name_a (str): First name.
+        name_b (str): Second name.
+
+    Returns:
+        float: Ratio between 0 and 1.
+    """
+    a = ' '.join(sorted(normalize_name(name_a).split()))
+    b = ' '.join(sorted(normalize_name(name_b).split()))
+    # Imported on first use: difflib pulls in re, which would double the import time
+    # of school.core (see ``python bench.py startup``).
+    import difflib
+    return difflib.SequenceMatcher(None, a, b).ratio()
+
+
+def install(conn, tables=TABLES, refresh=True):
+    """
+    Adds the key columns and indexes, and fills in keys for existing rows. Does not commit.
+
+    Args:
+        conn (sqlite3.Connection): Connection to the database.
+        tables (Iterable[str]): Tables to install duplicate detection on.
+        refresh (bool): Fill in the keys of existing rows; False leaves that to a
+            batched backfill (see ``schema.MIGRATIONS``).
+    """
+    for table in tables:
+        columns = {row[1] for row in conn.execute(f'PRAGMA table_info({table})')}
+        for column in ('email_key', 'name_key'):
+            if column not in columns:
+                conn.execute(f'ALTER TABLE {table} ADD COLUMN {column} TEXT')
+        if refresh:
+            refresh_keys(conn, table)
+        conn.execute(f'CREATE INDEX IF NOT EXISTS idx_{table}_email_key ON {table}(email_key)')
+        conn.execute(f'CREATE INDEX IF NOT EXISTS idx_{table}_name_key ON {table}(name_key, id)')
+
+
+def refresh_keys(conn, table, batch_size=BATCH_SIZE):
+    """
+    Computes keys for rows that do not have them yet, e.g. rows written by imports or sync.
+
+    Args:
+        conn (sqlite3.Connection): Connection to the database.
+        table (str): One of ``TABLES``.
+        batch_size (int): Number of rows updated per statement batch.
+
+    Returns:
+        int: Number of rows updated.
+    """
+    updated = 0
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            f'SELECT id, name, email FROM {table} WHERE id > ? AND (email_key IS NULL OR name_key IS NULL) '
+            'ORDER BY id LIMIT ?', (last_id, batch_size)).fetchall()
+        if not rows:
+            return updated
+        conn.executemany(f'UPDATE {table} SET email_key = ?, name_key = ? WHERE id = ?',
+                         [(*keys(name, email), row_id) for row_id, name, email in rows])
+        updated += len(rows)
+        last_id = rows[-1][0]
+
+
+def update_name_key(conn, table, row_id, name):
+    """
+    Updates the name key after a row's name was edited. Does not commit.
+
+    Args:
+        conn (sqlite3.Connection): Connection to the database.
+        table (str): One of ``TABLES``.
+        row_id (int): Row id of the edited row; other rows with the same business id are left alone.
+        name (str): The new name.
+    """
+    conn.execute(f'UPDATE {table} SET name_key = ? WHERE id = ?', (name_key(name), row_id))
+
+
+def check(conn, table, name, email, threshold=SIMILARITY):
+    """
+    Looks for existing rows that a new entry would duplicate.
+
+    Args:
+        conn (sqlite3.Connection): Connection to the database.
+        table (str): One of ``TABLES``.
+        name (str): Name being entered.
+        email (str): Email being entered.
+        threshold (float): Minimum name similarity for a near-duplicate.
+
+    Returns:
+        tuple: ``(exact, similar)`` where ``exact`` is the ``(id, name, email)`` row with the
+        same normalized email or None, and ``similar`` lists ``(id, name, email)`` rows in the
+        same phonetic block whose names are at least ``threshold`` alike. At most
+        ``BLOCK_LIMIT`` rows of a block are compared.
+    """
+    email_key, key = keys(name, email)
+    exact = conn.execute(f'SELECT id, name, email FROM {table} WHERE email_key = ? AND deleted_at IS NULL LIMIT 1',
+                         (email_key,)).fetchone()
+    block = conn.execute(f'SELECT id, name, email FROM {table} WHERE name_key = ? AND deleted_at IS NULL '
+                         'ORDER BY id DESC LIMIT ?', (key, BLOCK_LIMIT))
+    similar = [row for row in block if row != exact and similarity(name, row[1]) >= threshold]
+    return exact, similar
+
+
+def find_duplicates(conn, table, window=WINDOW, threshold=SIMILARITY, batch_size=BATCH_SIZE):
+    """
+    Finds likely duplicate pairs in a whole table with the sorted-neighborhood method.
+
+    Rows are streamed in ``(name_key, email_key)`` order and each row is compared with
+    the previous ``window`` rows only, so the cost grows linearly with the table. A
+    second pass in ``email_key`` order reports exact email duplicates whose names
+    landed in different blocks.
+
+    Args:
+        conn (sqlite3.Connection): Connection to the database.
+        table (str): One of ``TABLES``.
+        window (int): Number of preceding rows each row is compared with.
+        threshold (float): Minimum name similarity for a near-duplicate.
+        batch_size (int): Number of rows fetched at a time.
+
+    Yields:
+        tuple: ``(id_a, id_b, reason, score)`` with reason ``"email"`` or ``"name"``.
+    """
+    refresh_keys(conn, table)
+    reported = set()
+    cursor = conn.execute(f'SELECT id, name, email_key, name_key FROM {table} WHERE deleted_at IS NULL '
+                          'ORDER BY name_key, id')
+    recent = deque(maxlen=window)
+    for rows in iter(lambda: cursor.fetchmany(batch_size), []):
+        for row in rows:
+            row_id, name, email_key, key = row
+            for other_id, other_name, other_email, other_key in recent:
+                if other_key != key:
+                    continue
+                if other_email == email_key:
+                    reason, score = 'email', 1.0
+                else:
+                    reason, score = 'name', similarity(name, other_name)
+                    if score < threshold:
+                        continue
+                reported.add((other_id, row_id))
+                yield other_id, row_id, reason, score
+            recent.append(row)
+
+    cursor = conn.execute(f'SELECT id, email_key FROM {table} WHERE deleted_at IS NULL ORDER BY email_key, id')
+    first_id, first_email = None, None
+    for rows in iter(lambda: cursor.fetchmany(batch_size), []):
+        for row_id, email_key in rows:
+            if email_key and email_key == first_email:
+                if (first_id, row_id) not in reported:
+                    yield first_id, row_id, 'email', 1.0
+            else:
+                first_id, first_email = row_id, email_key
+
+
+def main(argv=None):
+    """
+    Command line entry point for the batch duplicate search.
+
+    Args:
+        argv (list[str] | None): Arguments, defaults to ``sys.argv[1:]``.
+
+    Returns:
+        int: Process exit status.
+    """
+    import argparse
+    parser = argparse.ArgumentParser(description='Find duplicate students and instructors')
+    commands = parser.add_subparsers(dest='command', required=True)
+    find_parser = commands.add_parser('find', help='report likely duplicate pairs')
+    find_parser.add_argument('database')
+    find_parser.add_argument('--table', choices=TABLES, action='append')
+    find_parser.add_argument('--window', type=int, default=WINDOW)
+    find_parser.add_argument('--threshold', type=float, default=SIMILARITY)
+    args = parser.parse_args(argv)
+
+    conn = sqlite3.connect(args.database)
+    for table in args.table or TABLES:
+        for id_a, id_b, reason, score in find_duplicates(conn, table, args.window, args.threshold):
+            print(f'{table}\t{id_a}\t{id_b}\t{reason}\t{score:.2f}')
+        conn.commit()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,209 @@
+"""
+Course registration rules enforced by the database.
+
+A registration is accepted only if
+
+* the student is not already registered for the course: a UNIQUE index on
+  ``registrations(student_id, course_id)``;
+* the course has a free seat: each registrations database keeps a
+  ``course_enrollment`` counter per course that is incremented with a single
+  conditional ``UPDATE ... WHERE enrolled < capacity``. Capacities live in
+  ``courses.capacity`` (NULL means unlimited) and are read through a partial
+  index that only holds capped courses; deleted courses (and their old
+  capacities) are ignored;
+* the student is registered for every prerequisite of the course, listed in
+  the ``prerequisites`` table.
+
+:func:`register` runs the checks and the insert in one ``BEGIN IMMEDIATE``
+transaction, so concurrent registrations for the same course are serialized
+by SQLite's write lock and the counter can never pass the capacity, however
+many processes register at once. With per-term registration files the
+counter lives in the term's file next to its registrations, so capacity is
+per term.
+
+``python bench.py registrations`` stress-tests the rules from several
+processes against one WAL database.
+"""
+import sqlite3
+
+UNLIMITED = 2 ** 63 - 1
+
+
+class RegistrationError(ValueError):
+    """Base class of the reasons a registration is refused."""
+
+
+class AlreadyRegistered(RegistrationError):
+    """The student is already registered for the course."""
+
+
+class CourseFull(RegistrationError):
+    """The course has no free seat."""
+
+
+class MissingPrerequisites(RegistrationError):
+    """
+    The student is not registered for some prerequisites of the course.
+
+    Attributes
+    ----------
+    missing : list of str
+        Course IDs of the missing prerequisites.
+    """
+    def __init__(self, missing):
+        super().__init__('Missing prerequisites: ' + ', '.join(missing))
+        self.missing = missing
+
+
+def install(conn):
+    """
+    Adds course capacities, the prerequisites table and the registration rules of the
+    main database. Does not commit.
+
+    Args:
+        conn (sqlite3.Connection): Connection to the database.
+    """
+    columns = {row[1] for row in conn.execute('PRAGMA table_info(courses)')}
+    if 'capacity' not in columns:
+        conn.execute('ALTER TABLE courses ADD COLUMN capacity INTEGER CHECK (capacity >= 0)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_courses_course_id ON courses(course_id)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_courses_capacity ON courses(course_id, capacity) '
+                 'WHERE capacity IS NOT NULL')
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS prerequisites (
+            course_id TEXT NOT NULL,
+            prerequisite_id TEXT NOT NULL,
+            PRIMARY KEY (course_id, prerequisite_id)
+        ) WITHOUT ROWID
+    """)
+    install_registrations(conn)
+
+
+def install_registrations(conn, schema='main'):
+    """
+    Adds the duplicate check and the enrollment counters to a registrations table. Does not commit.
+
+    Duplicate registrations left from before the check existed are removed, keeping the
+    oldest, and the counters are computed from the remaining rows. Databases that already
+    have the check are left untouched.
+
+    Args:
+        conn (sqlite3.Connection): Connection to the database.
+        schema (str): Name of the (possibly attached) database holding the registrations.
+    """
+    if conn.execute(f"SELECT 1 FROM {schema}.sqlite_master WHERE type = 'index' AND name = 'idx_registrations_unique'"
+                    ).fetchone():
+        return
+    conn.execute(f"""
+        DELETE FROM {schema}.registrations WHERE id NOT IN (
+            SELECT min(id) FROM {schema}.registrations GROUP BY student_id, course_id)
+    """)
+    conn.execute(f'CREATE UNIQUE INDEX {schema}.idx_registrations_unique ON registrations(student_id, course_id)')
+    conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS {schema}.course_enrollment (
+            course_id TEXT PRIMARY KEY,
+            enrolled INTEGER NOT NULL CHECK (enrolled >= 0)
+        ) WITHOUT ROWID
+    """)
+    recount(conn, schema)
+
+
+def recount(conn, schema='main'):
+    """
+    Recomputes the enrollment counters from the registrations, e.g. after registrations
+    arrived through a sync or an import. Does not commit.
+
+    Args:
+        conn (sqlite3.Connection): Connection to the database.
+        schema (str): Name of the (possibly attached) database holding the registrations.
+    """
+    conn.execute(f'DELETE FROM {schema}.course_enrollment')
+    conn.execute(f'INSERT INTO {schema}.course_enrollment (course_id, enrolled) '
+                 f'SELECT course_id, count(*) FROM {schema}.registrations GROUP BY course_id')
+
+
+def missing_prerequisites(conn, student_id, course_id, history='registrations'):
+    """
+    Lists the prerequisites of a course the student is not registered for.
+
+    Args:
+        conn (sqlite3.Connection): Connection to the database.
+        student_id (str): The student.
+        course_id (str): The course.
+        history (str): Table or view holding every registration, e.g. ``all_registrations``
+            when registrations are partitioned by term.
+
+    Returns:
+        list[str]: Course IDs of the missing prerequisites.
+    """
+    rows = conn.execute(f"""
+        SELECT p.prerequisite_id FROM main.prerequisites AS p
+        WHERE p.course_id = ? AND NOT EXISTS (
+            SELECT 1 FROM {history} AS r WHERE r.student_id = ? AND r.course_id = p.prerequisite_id)
+        ORDER BY p.prerequisite_id
+    """, (course_id, student_id))
+    return [row[0] for row in rows]
+
+
+def register(conn, student_id, course_id, schema='main', history='registrations'):
+    """
+    Registers a student for a course if the rules allow it, and commits.
+
+    Args:
+        conn (sqlite3.Connection): Connection to the database, with no transaction open.
+        student_id (str): The student.
+        course_id (str): The course.
+        schema (str): Name of the (possibly attached) database the registration is written to.
+        history (str): Table or view holding every registration, used for prerequisites.
+
+    Raises:
+        AlreadyRegistered: If the student is already registered for the course.
+        CourseFull: If the course has no free seat.
+        MissingPrerequisites: If prerequisites are missing.
+    """
+    conn.execute('BEGIN IMMEDIATE')
+    try:
+        missing = missing_prerequisites(conn, student_id, course_id, history)
+        if missing:
+            raise MissingPrerequisites(missing)
+        try:
+            conn.execute(f'INSERT INTO {schema}.registrations (student_id, course_id) VALUES (?, ?)',
+                         (student_id, course_id))
+        except sqlite3.IntegrityError:
+            raise AlreadyRegistered(f"Student '{student_id}' is already registered for '{course_id}'") from None
+        conn.execute(f'INSERT OR IGNORE INTO {schema}.course_enrollment (course_id, enrolled) VALUES (?, 0)',
+                     (course_id,))
+        seat = conn.execute(f"""
+            UPDATE {schema}.course_enrollment SET enrolled = enrolled + 1
+            WHERE course_id = ? AND enrolled < coalesce(
+                (SELECT min(capacity) FROM main.courses
+                 WHERE course_id = ? AND capacity IS NOT NULL AND deleted_at IS NULL), {UNLIMITED})
+        """, (course_id, course_id))
+        if not seat.rowcount:
+            raise CourseFull(f"Course '{course_id}' is full")
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+
+
+def add_prerequisites(conn, course_id, prerequisite_ids):
+    """
+    Records prerequisites of a course. Does not commit.
+
+    Args:
+        conn (sqlite3.Connection): Connection to the database.
+        course_id (str): The course.
+        prerequisite_ids (Iterable[str]): Course IDs that must be taken first.
+
+    Raises:
+        ValueError: If a prerequisite is not a known course, has been deleted, or is the course itself.
+    """
+    for prerequisite_id in prerequisite_ids:
+        if prerequisite_id == course_id:
+            raise ValueError('A course cannot be its own prerequisite')
+        if not conn.execute('SELECT 1 FROM courses WHERE course_id = ? AND deleted_at IS NULL',
+                            (prerequisite_id,)).fetchone():
+            raise ValueError(f"Unknown prerequisite course '{prerequisite_id}'")
+        conn.execute('INSERT OR IGNORE INTO prerequisites (course_id, prerequisite_id) VALUES (?, ?)',
+                     (course_id, prerequisite_id))
@@ -0,0 +1,520 @@
+"""
+Streaming export of tables and query results in pluggable formats.
+
+A writer turns batches of rows into one output format. The built-in writers
+are registered under their format name:
+
+==========  ===========  ==================================================
+Format      Suffix       Output
+==========  ===========  ==================================================
+``csv``     ``.csv``     Header row and one line per row
+``jsonl``   ``.jsonl``   One JSON object per line (JSON Lines)
+``sql``     ``.sql``     One transaction of multi-row ``INSERT`` statements
+``scol``    ``.scol``    The columnar snapshot format of columnar.py
+==========  ===========  ==================================================
+
+More formats are added by subclassing :class:`Writer` and decorating the
+class with :func:`register`.
+
+Rows are read from a cursor ``BATCH_SIZE`` at a time and written batch by
+batch, so memory use does not depend on the size of the export. A table
+export can be limited to some columns (a projection) and to rows matching
+simple filters such as ``age >= 21``; deleted rows are left out unless asked
+for. Several tables are exported in parallel, each on its own thread and
+connection, and every export reports the bytes written per second. Given the
+terms directory (see partitions.py), the registrations of every term, open or
+archived, are exported too, one ``registrations_<term>`` file per term::
+
+    python exporter.py school.db extracts --format jsonl
+    python exporter.py school.db extracts --format csv --tables students \\
+        --columns name,email --filter 'age>=21' --filter 'name~A'
+    python exporter.py school.db extracts --terms-dir terms
+"""
+import argparse
+import csv
+import functools
+import io
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+import columnar
+import partitions
+import schema
+
+BATCH_SIZE = 5000
+WORKERS = 4
+# Filter operators; '~' is a case-insensitive prefix match.
+OPERATORS = ('>=', '<=', '!=', '=', '<', '>', '~')
+
+WRITERS = {}
+
+
+def register(writer_class):
+    """
+    Class decorator that makes a writer available under its ``format`` name.
+
+    Args:
+        writer_class (type): A :class:`Writer` subclass.
+
+    Returns:
+        type: The class, unchanged.
+    """
+    WRITERS[writer_class.format] = writer_class
+    return writer_class
+
+
+def writer_for(path):
+    """
+    Returns the writer whose suffix matches a file name.
+
+    Args:
+        path (str): Output file name.
+
+    Returns:
+        type: The :class:`Writer` subclass.
+
+    Raises:
+        ValueError: If no writer handles the suffix.
+    """
+    suffix = os.path.splitext(path)[1].lower()
+    for writer_class in WRITERS.values():
+        if writer_class.suffix == suffix:
+            return writer_class
+    raise ValueError(f"No export format for '{suffix}' files, expected one of "
+                     f"{', '.join(writer.suffix for writer in WRITERS.values())}")
+
+
+class Writer:
+    """
+    Base class of export formats.
+
+    Subclasses set ``format`` and ``suffix`` and implement :meth:`write`; :meth:`begin`
+    and :meth:`end` write what comes before the first and after the last batch.
+
+    Attributes
+    ----------
+    file : BinaryIO
+        File opened for binary writing. Writers never close it.
+    table : str
+        Name of the exported table or result.
+    columns : list[tuple[str, str]]
+        ``(column_name, type)`` pairs, types as in :func:`columnar.column_types`.
+    """
+    format = None
+    suffix = None
+
+    def __init__(self, file, table, columns):
+        self.file = file
+        self.table = table
+        self.columns = columns
+
+    @property
+    def names(self):
+        """list[str]: Column names."""
+        return [name for name, _ in self.columns]
+
+    def begin(self):
+        """Writes what precedes the rows."""
+
+    def write(self, rows):
+        """
+        Writes one batch of rows.
+
+        Args:
+            rows (list[tuple]): Rows with values in column order.
+        """
+        raise NotImplementedError
+
+    def end(self):
+        """Writes what follows the rows."""
+
+    def flush(self):
+        """Pushes buffered output to the file."""
+        self.file.flush()
+
+
+class TextWriter(Writer):
+    """
+    Base class of text formats; ``self.text`` is a UTF-8 text stream over the file.
+    """
+    def __init__(self, file, table, columns):
+        super().__init__(file, table, columns)
+        self.text = io.TextIOWrapper(file, encoding='utf-8', newline='')
+
+    def flush(self):
+        self.text.flush()
+
+    def end(self):
+        self.text.flush()
+        # Leaves the binary file open for the caller.
+        self.text.detach()
+
+
+@register
+class CsvWriter(TextWriter):
+    """CSV with a header row."""
+    format = 'csv'
+    suffix = '.csv'
+
+    def begin(self):
+        self.writer = csv.writer(self.text)
+        self.writer.writerow(self.names)
+
+    def write(self, rows):
+        self.writer.writerows(rows)
+
+
+@register
+class JsonLinesWriter(TextWriter):
+    """One JSON object per row, keyed by column name."""
+    format = 'jsonl'
+    suffix = '.jsonl'
+
+    def write(self, rows):
+        names = self.names
+        self.text.writelines(json.dumps(dict(zip(names, row)), ensure_ascii=False) + '\n' for row in rows)
+
+
+def sql_literal(value):
+    """
+    Formats a value as an SQLite literal.
+
+    Args:
+        value (None | int | float | str | bytes): The value.
+
+    Returns:
+        str: The literal.
+    """
+    if value is None:
+        return 'NULL'
+    if isinstance(value, (int, float)):
+        return repr(value)
+    if isinstance(value, bytes):
+        return f"X'{value.hex()}'"
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+@register
+class SqlWriter(TextWriter):
+    """A transaction of multi-row ``INSERT`` statements, one per batch."""
+    format = 'sql'
+    suffix = '.sql'
+
+    def begin(self):
+        self.text.write('BEGIN TRANSACTION;\n')
+
+    def write(self, rows):
+        if not rows:
+            return
+        self.text.write(f"INSERT INTO {self.table} ({', '.join(self.names)}) VALUES\n")
+        self.text.write(',\n'.join('(' + ', '.join(map(sql_literal, row)) + ')' for row in rows))
+        self.text.write(';\n')
+
+    def end(self):
+        self.text.write('COMMIT;\n')
+        super().end()
+
+
+@register
+class ColumnarWriter(Writer):
+    """The stdlib columnar snapshot format, readable by ``columnar.import_tables``."""
+    format = 'scol'
+    suffix = columnar.SCOL_SUFFIX
+
+    def begin(self):
+        self.writer = columnar.ScolWriter(self.file, self.table, self.columns)
+
+    def write(self, rows):
+        self.writer.write(rows)
+
+    def end(self):
+        self.writer.close()
+
+
+class ExportResult(namedtuple('ExportResult', 'table path rows bytes seconds')):
+    """
+    Outcome of one export.
+
+    Attributes
+    ----------
+    table : str
+        Exported table or result name.
+    path : str
+        Written file.
+    rows : int
+        Rows written.
+    bytes : int
+        Size of the file.
+    seconds : float
+        Time taken.
+    """
+    __slots__ = ()
+
+    @property
+    def rate(self):
+        """float: Bytes written per second."""
+        return self.bytes / self.seconds if self.seconds else 0.0
+
+    def describe(self):
+        """str: One-line summary, e.g. ``"students: 20,000 rows, 1.2 MiB, 35.0 MiB/s"``."""
+        return (f'{self.table}: {self.rows:,} rows, {self.bytes / 1024 ** 2:,.1f} MiB, '
+                f'{self.rate / 1024 ** 2:,.1f} MiB/s')
+
+
+def write(writer_class, path, table, columns, batches, progress=None):
+    """
+    Streams batches of rows into a file through a writer.
+
+    The file is written under a temporary name and renamed once complete, so a failed
+    or cancelled export leaves nothing behind.
+
+    Args:
+        writer_class (type): A :class:`Writer` subclass.
+        path (str): Output file.
+        table (str): Name of the exported table or result.
+        columns (list[tuple[str, str]]): ``(column_name, type)`` pairs.
+        batches (Iterable[list[tuple]]): Batches of rows.
+        progress (Callable[[int, int], None] | None): Called after each batch with the rows
+            and bytes written so far; may raise to stop the export.
+
+    Returns:
+        ExportResult: What was written.
+    """
+    start = time.perf_counter()
+    partial = path + '.part'
+    rows = 0
+    try:
+        with open(partial, 'wb') as file:
+            writer = writer_class(file, table, columns)
+            writer.begin()
+            for batch in batches:
+                writer.write(batch)
+                writer.flush()
+                rows += len(batch)
+                if progress:
+                    progress(rows, file.tell())
+            writer.end()
+            size = file.tell()
+        os.replace(partial, path)
+    except BaseException:
+        if os.path.exists(partial):
+            os.remove(partial)
+        raise
+    return ExportResult(table, path, rows, size, time.perf_counter() - start)
+
+
+def select(conn, table, columns=None, filters=(), include_deleted=False):
+    """
+    Builds the query of a table export.
+
+    Args:
+        conn (sqlite3.Connection): Connection to the database.
+        table (str): Table to export.
+        columns (Sequence[str] | None): Columns to export, in order; all columns if None.
+        filters (Iterable[tuple[str, str, object]]): ``(column, operator, value)`` conditions,
+            all of which must hold; operators are listed in ``OPERATORS``.
+        include_deleted (bool): Also export soft-deleted rows.
+
+    Returns:
+        tuple: ``(columns, sql, parameters)`` with ``(column_name, type)`` pairs.
+
+    Raises:
+        ValueError: If a column or operator is unknown.
+    """
+    available = dict(columnar.column_types(conn, table))
+    names = list(columns or available)
+    for name in names + [column for column, _, _ in filters]:
+        if name not in available:
+            raise ValueError(f"Table '{table}' has no column '{name}'")
+    where = []
+    params = []
+    for column, operator, value in filters:
+        if operator not in OPERATORS:
+            raise ValueError(f"Unknown filter operator '{operator}'")
+        if operator == '~':
+            where.append(f"{column} LIKE ? ESCAPE '\\'")
+            params.append(str(value).replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%')
+        else:
+            where.append(f'{column} {operator} ?')
+            params.append(value)
+    if 'deleted_at' in available and not include_deleted:
+        where.append('deleted_at IS NULL')
+    sql = f"SELECT {', '.join(names)} FROM {table}"
+    if where:
+        sql += ' WHERE ' + ' AND '.join(where)
+    return [(name, available[name]) for name in names], sql + ' ORDER BY rowid', params
+
+
+def batches(cursor, batch_size=BATCH_SIZE):
+    """
+    Reads a cursor in batches.
+
+    Args:
+        cursor (sqlite3.Cursor): The cursor.
+        batch_size (int): Rows per batch.
+
+    Yields:
+        list[tuple]: The next batch.
+    """
+    return iter(lambda: cursor.fetchmany(batch_size), [])
+
+
+def export_table(conn, table, path, format='csv', columns=None, filters=(), include_deleted=False,
+                 batch_size=BATCH_SIZE, progress=None):
+    """
+    Exports one table to a file.
+
+    Args:
+        conn (sqlite3.Connection): Connection to the database.
+        table (str): Table to export.
+        path (str): Output file.
+        format (str): One of ``WRITERS``.
+        columns (Sequence[str] | None): Columns to export; all if None.
+        filters (Iterable[tuple[str, str, object]]): Conditions, see :func:`select`.
+        include_deleted (bool): Also export soft-deleted rows.
+        batch_size (int): Rows read and written per batch.
+        progress (Callable[[int, int], None] | None): See :func:`write`.
+
+    Returns:
+        ExportResult: What was written.
+    """
+    selected, sql, params = select(conn, table, columns, filters, include_deleted)
+    return write(WRITERS[format], path, table, selected, batches(conn.execute(sql, params), batch_size), progress)
+
+
+def export_tables(connect, directory, tables=schema.TABLES, format='csv', columns=None, filters=(),
+                  include_deleted=False, workers=WORKERS, batch_size=BATCH_SIZE, progress=None, terms_dir=None):
+    """
+    Exports several tables in parallel, one file per table.
+
+    Each table is exported on its own thread with its own connection. SQLite serves
+    the readers concurrently (fully so in WAL mode) while the writers format and
+    compress outside the database.
+
+    Args:
+        connect (Callable[[], sqlite3.Connection]): Opens a new connection to the database.
+        directory (str): Directory the ``<table><suffix>`` files are written to; created if missing.
+        tables (Iterable[str]): Tables to export.
+        format (str): One of ``WRITERS``.
+        columns (Sequence[str] | None): Columns to export from every table; all if None.
+        filters (Iterable[tuple[str, str, object]]): Conditions applied to every table.
+        include_deleted (bool): Also export soft-deleted rows.
+        workers (int): Number of tables exported at the same time.
+        batch_size (int): Rows read and written per batch.
+        progress (Callable[[int], None] | None): Called with the total bytes written so
+            far over all tables; may raise to stop every export.
+        terms_dir (str | None): Terms directory; when given and ``registrations`` is
+            exported, each term's registrations are exported to ``registrations_<term>``.
+
+    Returns:
+        list[ExportResult]: One result per table, in the order given, followed by one
+        per term.
+    """
+    os.makedirs(directory, exist_ok=True)
+    writer_class = WRITERS[format]
+    lock = threading.Lock()
+    written = {}
+    sources = [(table, table, connect) for table in tables]
+    if terms_dir and any(table == 'registrations' for table, _, _ in sources):
+        sources += [('registrations', f'registrations_{term}', functools.partial(partitions.connect_term, path))
+                    for term, path in partitions.term_files(terms_dir)]
+
+    def run(source):
+        table, name, open_source = source
+
+        def report(rows, size):
+            with lock:
+                written[name] = size
+                total = sum(written.values())
+            if progress:
+                progress(total)
+
+        conn = open_source()
+        try:
+            result = export_table(conn, table, os.path.join(directory, name + writer_class.suffix), format,
+                                  columns, filters, include_deleted, batch_size, report)
+        finally:
+            conn.close()
+        return result._replace(table=name)
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='export') as pool:
+        return list(pool.map(run, sources))
+
+
+def parse_filter(text):
+    """
+    Parses a filter such as ``age>=21`` or ``name~Ann``.
+
+    The operator is the one that appears first in the text, the longest one if several
+    start there, so ``name=a<b`` compares ``name`` with ``a<b``.
+
+    Args:
+        text (str): ``<column><operator><value>``; numeric values are compared as numbers.
+
+    Returns:
+        tuple[str, str, object]: ``(column, operator, value)``.
+
+    Raises:
+        ValueError: If the text contains no operator after a column name.
+    """
+    found = [(text.find(operator), -len(operator), operator) for operator in OPERATORS if operator in text]
+    if found:
+        position, _, operator = min(found)
+        column, value = text[:position].strip(), text[position + len(operator):].strip()
+        if column:
+            try:
+                value = int(value)
+            except ValueError:
+                try:
+                    value = float(value)
+                except ValueError:
+                    pass
+            return column, operator, value
+    raise ValueError(f"Cannot parse filter '{text}', expected e.g. 'age>=21'")
+
+
+def main(argv=None):
+    """
+    Command line entry point.
+
+    Args:
+        argv (list[str] | None): Arguments, defaults to ``sys.argv[1:]``.
+
+    Returns:
+        int: Process exit status.
+    """
+    parser = argparse.ArgumentParser(description='Export tables of the school database')
+    parser.add_argument('database')
+    parser.add_argument('directory', help='directory the files are written to')
+    parser.add_argument('--format', choices=sorted(WRITERS), default='csv')
+    parser.add_argument('--tables', nargs='+', default=list(schema.TABLES))
+    parser.add_argument('--columns', help='comma separated columns to export from every table')
+    parser.add_argument('--filter', action='append', default=[], type=parse_filter, metavar='EXPR',
+                        help="condition such as 'age>=21' or 'name~Ann' (prefix); repeatable")
+    parser.add_argument('--include-deleted', action='store_true', help='also export soft-deleted rows')
+    parser.add_argument('--workers', type=int, default=WORKERS)
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+    parser.add_argument('--terms-dir', help='also export the registrations of every term in this directory')
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    results = export_tables(lambda: sqlite3.connect(f'file:{args.database}?mode=ro', uri=True), args.directory,
+                            args.tables, args.format, args.columns.split(',') if args.columns else None,
+                            args.filter, args.include_deleted, args.workers, args.batch_size,
+                            terms_dir=args.terms_dir)
+    elapsed = time.perf_counter() - start
+    for result in results:
+        print(result.describe())
+    total = sum(result.bytes for result in results)
+    print(f'total: {total / 1024 ** 2:,.1f} MiB in {elapsed:.2f} s, {total / elapsed / 1024 ** 2:,.1f} MiB/s')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
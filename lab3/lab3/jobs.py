@@ -0,0 +1,290 @@
+"""
+Background jobs with progress, rate, ETA and cancellation.
+
+Long operations (CSV export and load, backup, restore) run as jobs on worker
+threads so the window stays responsive. A job's function receives the
+:class:`Job` and reports through it::
+
+    def export(job):
+        for done, row in enumerate(rows, 1):
+            ...
+            job.progress(done)      # raises Cancelled once cancel() was called
+        return done
+
+    queue.submit('Export CSV', export, total=count, on_done=show_result)
+
+Jobs never touch widgets. Callbacks (``on_done``, ``on_error``, and anything
+passed to :meth:`Job.post`) are queued and run by :meth:`JobQueue.dispatch` on
+the thread that calls it, which the application does from a Tk ``after``
+loop. Progress is plain attribute updates that the loop reads, so reporting
+it costs next to nothing in the worker.
+
+Jobs are started in submission order; with the default single worker they run
+one after another and later submissions wait in the queue.
+"""
+import collections
+import queue
+import threading
+import time
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+
+
+class Cancelled(Exception):
+    """Raised inside a job when it has been cancelled."""
+
+
+class Job:
+    """
+    One unit of background work and its progress.
+
+    Attributes
+    ----------
+    name : str
+        Name shown to the user.
+    state : str
+        One of ``QUEUED``, ``RUNNING``, ``DONE``, ``FAILED`` or ``CANCELLED``.
+    done : int
+        Units of work completed so far.
+    total : int | None
+        Total units of work, or None if unknown.
+    unit : str
+        Name of a unit of work, e.g. ``"rows"``.
+    result
+        Return value of the job's function once done.
+    error : BaseException | None
+        Exception the job failed with.
+    """
+    def __init__(self, jobs, name, run, total=None, unit='rows', on_done=None, on_error=None):
+        """
+        Creates a queued job. Use :meth:`JobQueue.submit` instead of calling this directly.
+        """
+        self.jobs = jobs
+        self.name = name
+        self.run = run
+        self.total = total
+        self.unit = unit
+        self.on_done = on_done
+        self.on_error = on_error
+        self.state = QUEUED
+        self.done = 0
+        self.result = None
+        self.error = None
+        self.started_at = None
+        self.finished_at = None
+        self._cancel = threading.Event()
+
+    @property
+    def cancelled(self):
+        """bool: Whether cancellation has been requested."""
+        return self._cancel.is_set()
+
+    def cancel(self):
+        """
+        Requests cancellation. A queued job never starts; a running job stops at its
+        next call to :meth:`progress` or :meth:`check`.
+        """
+        self._cancel.set()
+
+    def check(self):
+        """
+        Raises :class:`Cancelled` if cancellation has been requested. Called by the job.
+        """
+        if self._cancel.is_set():
+            raise Cancelled(self.name)
+
+    def progress(self, done, total=None):
+        """
+        Reports progress. Called by the job.
+
+        Args:
+            done (int): Units of work completed so far.
+            total (int, optional): Updated total, when it becomes known.
+
+        Raises:
+            Cancelled: If cancellation has been requested.
+        """
+        if total is not None:
+            self.total = total
+        self.done = done
+        self.check()
+
+    def post(self, callback, *args):
+        """
+        Runs a callback on the dispatching (UI) thread, e.g. to show a batch of rows.
+
+        Args:
+            callback (Callable): Function to call.
+            *args: Arguments for the callback.
+        """
+        self.jobs.events.put((callback, args))
+
+    @property
+    def elapsed(self):
+        """float: Seconds the job has been running."""
+        if self.started_at is None:
+            return 0.0
+        return (self.finished_at or time.perf_counter()) - self.started_at
+
+    @property
+    def rate(self):
+        """float | None: Units per second so far, or None before any progress."""
+        elapsed = self.elapsed
+        return self.done / elapsed if self.done and elapsed else None
+
+    @property
+    def eta(self):
+        """float | None: Estimated seconds remaining, or None if unknown."""
+        rate = self.rate
+        if not rate or not self.total:
+            return None
+        return max(self.total - self.done, 0) / rate
+
+    @property
+    def fraction(self):
+        """float | None: Completed fraction between 0 and 1, or None if the total is unknown."""
+        if not self.total:
+            return None
+        return min(self.done / self.total, 1.0)
+
+    def describe(self):
+        """
+        Returns a one-line status, e.g. ``"Export CSV: 12,000/50,000 rows, 8,000 rows/s, 5 s left"``.
+
+        Returns:
+            str: The status text.
+        """
+        if self.state == QUEUED:
+            return f'{self.name}: queued'
+        if self.state == CANCELLED:
+            return f'{self.name}: cancelled'
+        if self.state == FAILED:
+            return f'{self.name}: failed ({self.error})'
+        text = f'{self.name}: {self.done:,}'
+        if self.total:
+            text += f'/{self.total:,}'
+        text += f' {self.unit}'
+        if self.state == DONE:
+            return text + f' in {self.elapsed:.1f} s'
+        if self.rate:
+            text += f', {self.rate:,.0f} {self.unit}/s'
+        if self.eta is not None:
+            text += f', {self.eta:.0f} s left'
+        return text
+
+
+class JobQueue:
+    """
+    Runs submitted jobs on worker threads in submission order.
+
+    Attributes
+    ----------
+    jobs : collections.deque
+        Jobs that are queued or running, oldest first.
+    events : queue.Queue
+        Callbacks waiting to be run by :meth:`dispatch`.
+    last_finished : Job | None
+        The most recently finished job, whatever its outcome.
+    """
+    def __init__(self, workers=1):
+        """
+        Args:
+            workers (int): Number of jobs that may run at the same time.
+        """
+        self.jobs = collections.deque()
+        self.events = queue.Queue()
+        self.last_finished = None
+        self._pending = queue.Queue()
+        self._workers = workers
+        self._threads = []
+        self._lock = threading.Lock()
+
+    def submit(self, name, run, total=None, unit='rows', on_done=None, on_error=None):
+        """
+        Queues a job.
+
+        Args:
+            name (str): Name shown to the user.
+            run (Callable[[Job], object]): Function run on a worker thread.
+            total (int, optional): Total units of work, if known up front.
+            unit (str): Name of a unit of work.
+            on_done (Callable[[Job], None], optional): Called on the dispatching thread when the job succeeds.
+            on_error (Callable[[Job], None], optional): Called on the dispatching thread when the job
+                fails or is cancelled; ``job.state`` tells which.
+
+        Returns:
+            Job: The queued job.
+        """
+        job = Job(self, name, run, total, unit, on_done, on_error)
+        with self._lock:
+            self.jobs.append(job)
+            if len(self._threads) < self._workers:
+                thread = threading.Thread(target=self._work, name=f'job-worker-{len(self._threads)}', daemon=True)
+                self._threads.append(thread)
+                thread.start()
+        self._pending.put(job)
+        return job
+
+    def _work(self):
+        while True:
+            job = self._pending.get()
+            if job.cancelled:
+                job.state = CANCELLED
+            else:
+                job.state = RUNNING
+                job.started_at = time.perf_counter()
+                try:
+                    job.result = job.run(job)
+                    job.state = DONE
+                except Cancelled:
+                    job.state = CANCELLED
+                except Exception as e:
+                    job.error = e
+                    job.state = FAILED
+                job.finished_at = time.perf_counter()
+            self.events.put((self._finish, (job,)))
+
+    def _finish(self, job):
+        with self._lock:
+            self.jobs.remove(job)
+        self.last_finished = job
+        callback = job.on_done if job.state == DONE else job.on_error
+        if callback:
+            callback(job)
+
+    @property
+    def running(self):
+        """list[Job]: Jobs currently running."""
+        return [job for job in list(self.jobs) if job.state == RUNNING]
+
+    @property
+    def queued(self):
+        """list[Job]: Jobs waiting to start."""
+        return [job for job in list(self.jobs) if job.state == QUEUED]
+
+    def cancel_all(self):
+        """
+        Cancels every queued and running job.
+        """
+        for job in list(self.jobs):
+            job.cancel()
+
+    def dispatch(self):
+        """
+        Runs the callbacks posted by jobs. Call it from the UI thread only.
+
+        Returns:
+            int: Number of callbacks run.
+        """
+        count = 0
+        while True:
+            try:
+                callback, args = self.events.get_nowait()
+            except queue.Empty:
+                return count
+            callback(*args)
+            count += 1
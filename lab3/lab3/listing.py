@@ -0,0 +1,218 @@
+"""
+Sorted, filtered and paged listing of students, instructors and courses.
+
+Sorting and filtering are pushed down into SQL: one ``UNION ALL`` query reads
+each entity table in index order with its own ``WHERE`` and SQLite merges the
+sorted arms, so a page costs a few index seeks no matter how many rows exist.
+Paging is keyset based: the next page starts after the sort key of the last
+row shown, which stays fast on deep pages. Ties are broken by type and row
+id, so every row has a unique position.
+
+Deleted rows are skipped, and the listing indexes are partial indexes over
+live rows only (see compaction.py).
+
+Text comparisons use SQLite's ``NOCASE`` collation; ``nocase`` reproduces it
+in Python so page boundaries agree with the database's order.
+
+The ``entities`` view (see :func:`install`) exposes the same rows for ad hoc
+queries. Listing pages do not go through it because SQLite sorts an
+``ORDER BY`` over a view instead of merging its arms.
+"""
+import records
+import statements
+
+COLUMNS = ('ID', 'Name', 'Type')
+TABLES = tuple(entity.table for entity in statements.ENTITIES.values())
+PAGE_SIZE = 100
+
+_NOCASE = str.maketrans('ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz')
+# Larger than any character, for prefix range upper bounds.
+_MAX_CHAR = '\U0010ffff'
+
+
+def nocase(value):
+    """
+    Folds a value the way SQLite's ``NOCASE`` collation does (ASCII letters only).
+
+    Args:
+        value: Column value.
+
+    Returns:
+        str: The folded text.
+    """
+    return str(value).translate(_NOCASE)
+
+
+def install(conn):
+    """
+    Creates the ``entities`` view and the indexes that serve the listing's sort orders
+    and prefix filters. Does not commit.
+
+    Args:
+        conn (sqlite3.Connection): Connection to the database.
+    """
+    conn.execute('DROP VIEW IF EXISTS entities')
+    conn.execute('CREATE VIEW entities AS ' + ' UNION ALL '.join(
+        f"SELECT '{entity.type}' AS type, id AS row_id, {entity.id_field} AS entity_id, "
+        f"{entity.name_field} AS name, version FROM {entity.table} WHERE deleted_at IS NULL"
+        for entity in statements.ENTITIES.values()))
+    for entity in statements.ENTITIES.values():
+        # Replaced by the partial indexes below, which leave out deleted rows.
+        conn.execute(f'DROP INDEX IF EXISTS idx_{entity.table}_listing_id')
+        conn.execute(f'DROP INDEX IF EXISTS idx_{entity.table}_listing_name')
+        conn.execute(f'CREATE INDEX IF NOT EXISTS idx_{entity.table}_live_id '
+                     f'ON {entity.table}({entity.id_field} COLLATE NOCASE) WHERE deleted_at IS NULL')
+        conn.execute(f'CREATE INDEX IF NOT EXISTS idx_{entity.table}_live_name '
+                     f'ON {entity.table}({entity.name_field} COLLATE NOCASE) WHERE deleted_at IS NULL')
+
+
+def sort_key(row, sort):
+    """
+    Returns the key a listing row is ordered by.
+
+    Args:
+        row (tuple): ``(id, name, type, rowid)`` row.
+        sort (str): Sort column, one of ``COLUMNS``.
+
+    Returns:
+        tuple: ``(sort value folded like NOCASE, type, rowid)``.
+    """
+    return nocase(row[COLUMNS.index(sort)]), row[2], row[3]
+
+
+def _arm(entity, sort, descending, filters, after):
+    """Builds one entity's arm of the compound query, or returns None if none of its rows can follow ``after``."""
+    if sort == 'ID':
+        sort_col = f'{entity.id_field} COLLATE NOCASE'
+    elif sort == 'Name':
+        sort_col = f'{entity.name_field} COLLATE NOCASE'
+    else:
+        sort_col = f"'{entity.type}' COLLATE NOCASE"
+    where = ['deleted_at IS NULL']
+    params = []
+    for column, field in (('ID', entity.id_field), ('Name', entity.name_field)):
+        prefix = filters.get(column)
+        if prefix:
+            where.append(f'{field} COLLATE NOCASE >= ? AND {field} COLLATE NOCASE < ?')
+            params += [prefix, prefix + _MAX_CHAR]
+    if after is not None:
+        value, after_type, after_rowid = after
+        greater = '<' if descending else '>'
+        if sort == 'Type':
+            # The sort value is constant within a table.
+            mine = nocase(entity.type)
+            if mine == value:
+                where.append(f'id {greater} ?')
+                params.append(after_rowid)
+            elif (mine > value) == descending:
+                return None
+        elif entity.type == after_type:
+            # Same as ({sort_col}, id) > (?, ?), written so the index serves the range.
+            where.append(f'{sort_col} {greater}= ? AND ({sort_col} {greater} ? OR id {greater} ?)')
+            params += [value, value, after_rowid]
+        elif (entity.type > after_type) != descending:
+            where.append(f'{sort_col} {greater}= ?')
+            params.append(value)
+        else:
+            where.append(f'{sort_col} {greater} ?')
+            params.append(value)
+    sql = (f"SELECT {entity.id_field} AS entity_id, {entity.name_field} AS name, '{entity.type}' AS type, "
+           f"id AS row_id, version, {sort_col} AS sort_value FROM {entity.table} WHERE " + ' AND '.join(where))
+    return sql, params
+
+
+def query(sort='Name', descending=False, filters=None, after=None, limit=PAGE_SIZE):
+    """
+    Builds the single ``UNION ALL`` query behind :func:`rows`.
+
+    Each arm reads one entity table and carries its type as a discriminator column.
+    SQLite evaluates the ``ORDER BY`` of the compound as a merge of the arms, each
+    read in index order, so no intermediate result is sorted or materialized. When
+    sorting by type the arms are simply concatenated in type order.
+
+    Args:
+        sort (str): Column to sort by, one of ``COLUMNS``.
+        descending (bool): Sort in descending order.
+        filters (dict[str, str] | None): Case-insensitive prefix per column.
+        after (tuple | None): :func:`sort_key` of the last row of the previous page.
+        limit (int | None): Maximum number of rows, or None for all rows.
+
+    Returns:
+        tuple[str, list] | None: SQL and parameters, or None if no row can match.
+    """
+    if sort not in COLUMNS:
+        raise ValueError(f"Unknown sort column '{sort}'")
+    filters = filters or {}
+    type_prefix = nocase(filters.get('Type') or '')
+    direction = 'DESC' if descending else 'ASC'
+    entities = [entity for entity in statements.ENTITIES.values() if nocase(entity.type).startswith(type_prefix)]
+    if sort == 'Type':
+        # Each arm is one block of the result, so the arms are concatenated in type
+        # order instead of merged; a LIMIT of -1 keeps SQLite from dropping the inner ORDER BY.
+        entities.sort(key=lambda entity: nocase(entity.type), reverse=descending)
+    arms = []
+    params = []
+    for entity in entities:
+        arm = _arm(entity, sort, descending, filters, after)
+        if arm is None:
+            continue
+        if sort == 'Type':
+            arms.append(f'SELECT * FROM ({arm[0]} ORDER BY row_id {direction} LIMIT ?)')
+            params += arm[1] + [-1 if limit is None else limit]
+        else:
+            arms.append(arm[0])
+            params += arm[1]
+    if not arms:
+        return None
+    sql = ' UNION ALL '.join(arms)
+    if sort != 'Type':
+        sql += f' ORDER BY sort_value {direction}, type {direction}, row_id {direction}'
+    if limit is not None:
+        sql += ' LIMIT ?'
+        params.append(limit)
+    return sql, params
+
+
+def count(conn, filters=None):
+    """
+    Counts the rows the listing shows with the given filters.
+
+    Args:
+        conn (sqlite3.Connection): Connection to the database.
+        filters (dict[str, str] | None): Case-insensitive prefix per column.
+
+    Returns:
+        int: Number of rows.
+    """
+    filters = filters or {}
+    type_prefix = nocase(filters.get('Type') or '')
+    arms = [_arm(entity, 'Name', False, filters, None) for entity in statements.ENTITIES.values()
+            if nocase(entity.type).startswith(type_prefix)]
+    if not arms:
+        return 0
+    sql = 'SELECT count(*) FROM (' + ' UNION ALL '.join(arm[0] for arm in arms) + ')'
+    return conn.execute(sql, [param for arm in arms for param in arm[1]]).fetchone()[0]
+
+
+def rows(conn, sort='Name', descending=False, filters=None, after=None, limit=PAGE_SIZE, cache=None):
+    """
+    Lists students, instructors and courses in one globally sorted stream.
+
+    Args:
+        conn (sqlite3.Connection): Connection to the database.
+        sort (str): Column to sort by, one of ``COLUMNS``.
+        descending (bool): Sort in descending order.
+        filters (dict[str, str] | None): Case-insensitive prefix per column. The ``Type``
+            filter selects which entity tables are read, the others are applied in SQL.
+        after (tuple | None): :func:`sort_key` of the last row of the previous page.
+        limit (int | None): Maximum number of rows, or None for all rows.
+        cache (querycache.QueryCache | None): Cache to answer repeated queries from.
+
+    Returns:
+        Iterator[records.ListingRow]: ``(id, name, type, rowid, version)`` rows.
+    """
+    built = query(sort, descending, filters, after, limit)
+    if built is None:
+        return iter(())
+    result = cache.execute(*built, tables=TABLES) if cache is not None else conn.execute(*built)
+    return (records.ListingRow._make(row[:5]) for row in result)
@@ -0,0 +1,341 @@
+"""
+Headless load generator for the School Management System.
+
+Simulated clerks run in parallel processes against one shared database. Each
+clerk is a real :class:`DatabaseApp` whose widgets and dialogs are replaced
+by stubs, so the actual handlers (``add_student``, ``register_course``,
+``search``, ``update_record`` and ``delete``) run with scripted inputs and no
+display, X server or Tk event loop is needed::
+
+    python loadtest.py --clerks 16 --duration 30
+    python loadtest.py --db school.db --clerks 8 --operations 500 --wal
+
+Without ``--db`` a generated database in a temporary directory is used.
+The report lists throughput and latency percentiles per handler, a latency
+histogram, and the rate of ``database is locked`` errors, which the handlers
+show as error dialogs and the stubs record.
+"""
+import argparse
+import bisect
+import multiprocessing
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+import bench
+import dbconfig
+import schema
+
+OPERATIONS = {'add_student': 3, 'register_course': 5, 'search': 6, 'update_record': 2, 'delete': 1}
+BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+
+def load_app_module():
+    """
+    Imports the application's GUI module without opening a window.
+
+    Returns:
+        module: ``school.gui``.
+    """
+    from school import gui
+    return gui
+
+
+class StubEntry:
+    """Stands in for an Entry or Combobox: holds a value and accepts options."""
+    def __init__(self, value=''):
+        self.value = value
+        self.options = {}
+
+    def get(self):
+        return self.value
+
+    def set(self, value):
+        self.value = value
+
+    def insert(self, index, value):
+        self.value = value
+
+    def delete(self, first, last=None):
+        self.value = ''
+
+    def __setitem__(self, key, value):
+        self.options[key] = value
+
+
+class StubTreeview:
+    """Stands in for the View All Treeview."""
+    def __init__(self):
+        self.items = {}
+        self.selected = ()
+        self._next_iid = 0
+
+    def insert(self, parent, index, iid=None, values=()):
+        if iid is None:
+            self._next_iid += 1
+            iid = f'I{self._next_iid:03X}'
+        self.items[iid] = tuple(values)
+        return iid
+
+    def delete(self, *iids):
+        for iid in iids:
+            self.items.pop(iid, None)
+
+    def get_children(self):
+        return tuple(self.items)
+
+    def item(self, iid, option=None, **options):
+        if 'values' in options:
+            self.items[iid] = tuple(options['values'])
+        if option == 'values':
+            return self.items[iid]
+        return {'values': self.items[iid]}
+
+    def selection(self):
+        return self.selected
+
+    def selection_set(self, iid):
+        self.selected = (iid,)
+
+
+class StubDialogs:
+    """
+    Stands in for ``tkinter.messagebox``: records errors and answers every question with yes.
+
+    Attributes
+    ----------
+    errors : list of str
+        Messages of the error and warning dialogs shown since the last :meth:`take`.
+    """
+    def __init__(self):
+        self.errors = []
+
+    def _record(self, title, message=''):
+        self.errors.append(f'{title}: {message}')
+
+    showerror = showwarning = showinfo = _record
+
+    def askyesno(self, title, message=''):
+        return True
+
+    def take(self):
+        errors, self.errors = self.errors, []
+        return errors
+
+
+class StubStatusBar:
+    """Stands in for the status bar."""
+    def notify(self, text, level='info'):
+        pass
+
+
+def headless_app(module, config):
+    """
+    Creates a :class:`DatabaseApp` with stub widgets instead of a Tk window.
+
+    ``Tk.__init__`` is not called; the attributes the handlers use are set directly
+    and dialogs go to a :class:`StubDialogs` instance.
+
+    Args:
+        module (module): The application module, from :func:`load_app_module`.
+        config (dbconfig.DatabaseConfig): The database to use.
+
+    Returns:
+        tuple: ``(app, dialogs)``.
+    """
+    dialogs = StubDialogs()
+    module.messagebox = dialogs
+    app = module.DatabaseApp.__new__(module.DatabaseApp)
+    # Tk.__getattr__ delegates to self.tk; without a Tk instance lookups must fail cleanly.
+    app.tk = None
+    app.db_config = config
+    app.db_connection = None
+    app.cursor = None
+    app.query_cache = None
+    app.search_engine = None
+    app.partitions = None
+    app.memory_profiler = None
+    app.change_poller = None
+    app.status_bar = StubStatusBar()
+    app.register_course_tab = 'register_course_tab'
+    app.view_all_tab = 'view_all_tab'
+    app.built_tabs = {app.register_course_tab, app.view_all_tab}
+    for name in ('student_name', 'student_age', 'student_email', 'student_id', 'student_dropdown',
+                 'course_dropdown', 'search_entry'):
+        setattr(app, name, StubEntry())
+    app.view_all_table = StubTreeview()
+    app.listing_active = False
+    app.row_versions = {}
+    app.get_db_connection()
+    return app, dialogs
+
+
+def _pick_search_row(app, rng, term):
+    app.search_entry.set(term)
+    app.search()
+    children = app.view_all_table.get_children()
+    return rng.choice(children) if children else None
+
+
+def _clerk(clerk, database, operations, duration, seed):
+    module = load_app_module()
+    app, dialogs = headless_app(module, dbconfig.DatabaseConfig(database))
+    rng = random.Random(seed + clerk)
+    names, weights = zip(*OPERATIONS.items())
+    students = [row[0] for row in app.db_connection.execute('SELECT name FROM students LIMIT 5000')]
+    courses = [row[0] for row in app.db_connection.execute('SELECT course_name FROM courses LIMIT 5000')]
+    added = []
+    samples = []
+    deadline = time.perf_counter() + duration if duration else None
+    done = 0
+    while (deadline is None and done < operations) or (deadline is not None and time.perf_counter() < deadline):
+        operation = rng.choices(names, weights)[0]
+        done += 1
+        # Inputs are prepared before the clock starts; only the handler is timed.
+        if operation == 'add_student':
+            number = f'{clerk}-{done}-{rng.randrange(10 ** 9)}'
+            app.student_name.set(f'Clerk Student {number}')
+            app.student_age.set(str(rng.randint(17, 40)))
+            app.student_email.set(f'clerk{number}@school.edu')
+            app.student_id.set(f'K{number}')
+            call = app.add_student
+            added.append(f'Clerk Student {number}')
+        elif operation == 'register_course':
+            app.student_dropdown.set(rng.choice(added or students))
+            app.course_dropdown.set(rng.choice(courses))
+            call = app.register_course
+        elif operation == 'search':
+            app.search_entry.set(rng.choice(students + added)[:rng.randint(3, 12)])
+            call = app.search
+        elif operation == 'update_record':
+            item = _pick_search_row(app, rng, rng.choice(added or students))
+            dialogs.take()
+            if item is None:
+                continue
+            new_name = f'Renamed {clerk}-{done}'
+            call = lambda: app.update_record(item, 1, new_name)
+            # Later calls pick names from these lists, so they follow the rename.
+            old_name = app.view_all_table.item(item, 'values')[1]
+            for known in (added, students, courses):
+                if old_name in known:
+                    known[known.index(old_name)] = new_name
+        else:
+            if not added:
+                continue
+            item = _pick_search_row(app, rng, added.pop(rng.randrange(len(added))))
+            dialogs.take()
+            if item is None:
+                continue
+            app.view_all_table.selection_set(item)
+            call = app.delete
+        start = time.perf_counter()
+        call()
+        elapsed = time.perf_counter() - start
+        errors = dialogs.take()
+        locked = any('locked' in error for error in errors)
+        samples.append((operation, elapsed, locked, bool(errors) and not locked))
+    app.db_connection.close()
+    return samples
+
+
+def run(database, clerks, operations=200, duration=None, seed=0):
+    """
+    Runs simulated clerks in parallel processes against one database.
+
+    Args:
+        database (str): Path of the shared database.
+        clerks (int): Number of parallel clerk processes.
+        operations (int): Handler calls per clerk, when no duration is given.
+        duration (float | None): Seconds each clerk keeps working, instead of a call count.
+        seed (int): Seed of the scripted inputs.
+
+    Returns:
+        tuple: ``(samples, elapsed)`` where samples are ``(operation, seconds, locked, failed)``.
+    """
+    start = time.perf_counter()
+    with multiprocessing.Pool(clerks) as pool:
+        results = pool.starmap(_clerk, [(clerk, database, operations, duration, seed) for clerk in range(clerks)])
+    return [sample for samples in results for sample in samples], time.perf_counter() - start
+
+
+def _percentile(values, fraction):
+    return values[min(int(len(values) * fraction), len(values) - 1)]
+
+
+def report(samples, elapsed, out=sys.stdout):
+    """
+    Prints throughput, latency percentiles, the histogram and error rates.
+
+    Args:
+        samples (list[tuple]): Samples from :func:`run`.
+        elapsed (float): Wall clock seconds of the run.
+        out (file): Stream to print to.
+    """
+    print(f'{len(samples)} calls in {elapsed:.1f} s, {len(samples) / elapsed:,.1f} calls/s', file=out)
+    print(f'{"handler":16} {"calls":>7} {"calls/s":>9} {"p50 ms":>8} {"p95 ms":>8} {"p99 ms":>8} '
+          f'{"max ms":>8} {"locked":>7} {"failed":>7}', file=out)
+    for operation in OPERATIONS:
+        rows = [sample for sample in samples if sample[0] == operation]
+        if not rows:
+            continue
+        times = sorted(sample[1] * 1000 for sample in rows)
+        locked = sum(sample[2] for sample in rows) / len(rows)
+        failed = sum(sample[3] for sample in rows) / len(rows)
+        print(f'{operation:16} {len(rows):7} {len(rows) / elapsed:9.1f} {_percentile(times, 0.5):8.2f} '
+              f'{_percentile(times, 0.95):8.2f} {_percentile(times, 0.99):8.2f} {times[-1]:8.2f} '
+              f'{locked:7.1%} {failed:7.1%}', file=out)
+    counts = [0] * (len(BUCKETS_MS) + 1)
+    for sample in samples:
+        counts[bisect.bisect_left(BUCKETS_MS, sample[1] * 1000)] += 1
+    print('latency histogram', file=out)
+    widest = max(counts) or 1
+    for index, count in enumerate(counts):
+        label = f'<= {BUCKETS_MS[index]} ms' if index < len(BUCKETS_MS) else f'>  {BUCKETS_MS[-1]} ms'
+        print(f'  {label:>11} {count:7} {"#" * round(40 * count / widest)}', file=out)
+    locked = sum(sample[2] for sample in samples)
+    print(f'database is locked: {locked} of {len(samples)} calls ({locked / max(len(samples), 1):.2%})', file=out)
+
+
+def main(argv=None):
+    """
+    Command line entry point.
+
+    Args:
+        argv (list[str] | None): Arguments, defaults to ``sys.argv[1:]``.
+
+    Returns:
+        int: Process exit status.
+    """
+    parser = argparse.ArgumentParser(description='Drive the application handlers from parallel simulated clerks')
+    parser.add_argument('--db', help='shared database; a generated one is used if omitted')
+    parser.add_argument('--rows', type=int, default=20000, help='students in the generated database')
+    parser.add_argument('--clerks', type=int, default=8)
+    parser.add_argument('--operations', type=int, default=200, help='handler calls per clerk')
+    parser.add_argument('--duration', type=float, help='seconds per clerk, instead of --operations')
+    parser.add_argument('--wal', action='store_true', help='switch the database to WAL journaling first')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directory:
+        database = args.db
+        if database is None:
+            database = os.path.join(directory, 'school.db')
+            conn = sqlite3.connect(database)
+            schema.initialize(conn)
+            bench.populate(conn, args.rows)
+            conn.close()
+        conn = sqlite3.connect(database)
+        schema.initialize(conn)
+        if args.wal:
+            conn.execute('PRAGMA journal_mode=WAL')
+        conn.close()
+        samples, elapsed = run(database, args.clerks, args.operations, args.duration, args.seed)
+    report(samples, elapsed)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,311 @@
+"""
+Opt-in memory instrumentation of the application's handlers.
+
+Started with ``python -m school --memory-profile profile.jsonl``. Every call
+of a profiled handler (``refresh_view_all``, ``load``, ``search``, ...) is
+wrapped in two ``tracemalloc`` snapshots, and one JSON line is appended to
+the file per call with
+
+* ``allocated``: bytes allocated by Python during the call and still held
+  when it returned, with the top allocation sites responsible;
+* ``retained``: growth of the traced Python heap since the previous record,
+  which also catches what background jobs (e.g. a CSV load) kept;
+* ``rss``: resident set size of the process, so memory held outside Python,
+  such as Tcl strings behind Treeview items, shows up as the gap between
+  ``rss`` and ``traced``;
+* ``widgets``: live Tk widgets by class, including ``Toplevel`` windows that
+  were never destroyed, and ``tree_items``, the items in all Treeviews.
+
+Profiles are compared offline::
+
+    python memprofile.py profile.jsonl                  # summary per handler
+    python memprofile.py before.jsonl after.jsonl       # differences between two runs
+
+Tracing slows every allocation and snapshots take time proportional to the
+heap, so the mode is meant for diagnosis only.
+"""
+import argparse
+import collections
+import functools
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+HANDLERS = (
+    'refresh_view_all', 'show_page', 'search', 'load', 'export_view', 'export_tables', 'report_job',
+    'add_student', 'add_instructor', 'add_course', 'register_course', 'update_record', 'delete',
+    'load_snapshot', 'export_snapshot', 'restore_database',
+)
+TOP_SITES = 10
+FRAMES = 5
+
+
+def resident_bytes():
+    """
+    Returns the resident set size of this process.
+
+    Returns:
+        int | None: Bytes in memory, or None where ``/proc`` is not available.
+    """
+    try:
+        with open('/proc/self/statm') as file:
+            return int(file.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        return None
+
+
+def count_widgets(root):
+    """
+    Counts the live widgets below a Tk widget and the items of its Treeviews.
+
+    Args:
+        root (tkinter.Misc): Widget to start from, usually the main window.
+
+    Returns:
+        tuple[collections.Counter, int]: Widgets by class name, and the number of Treeview items.
+    """
+    widgets = collections.Counter()
+    items = 0
+    pending = [root]
+    while pending:
+        widget = pending.pop()
+        widgets[type(widget).__name__] += 1
+        if type(widget).__name__ == 'Treeview':
+            parents = ['']
+            while parents:
+                children = widget.get_children(parents.pop())
+                items += len(children)
+                parents.extend(children)
+        pending.extend(widget.winfo_children())
+    return widgets, items
+
+
+class MemoryProfiler:
+    """
+    Records allocation deltas, widget counts and top allocation sites around handler calls.
+
+    Attributes
+    ----------
+    path : str
+        File the JSON lines are appended to.
+    top : int
+        Number of allocation sites kept per record.
+    records : int
+        Number of records written so far.
+    """
+    def __init__(self, path, top=TOP_SITES, frames=FRAMES):
+        """
+        Starts tracing. Allocations made before this are not attributed to any handler.
+
+        Args:
+            path (str): File the JSON lines are appended to.
+            top (int): Number of allocation sites kept per record.
+            frames (int): Stack frames stored per allocation by ``tracemalloc``.
+        """
+        self.path = path
+        self.top = top
+        self.records = 0
+        self._depth = 0
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+        self._last_traced = tracemalloc.get_traced_memory()[0]
+        self._file = open(path, 'a', encoding='utf-8')
+        self._write({'event': 'start', 'time': time.time(), 'pid': os.getpid(), 'python': sys.version.split()[0]})
+
+    def _write(self, record):
+        self._file.write(json.dumps(record) + '\n')
+        self._file.flush()
+
+    def _snapshot(self):
+        return tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+        ))
+
+    def instrument(self, app, handlers=HANDLERS):
+        """
+        Replaces the handlers of an application with profiled versions.
+
+        Must be called before the widgets are created, so buttons and bindings pick up
+        the profiled versions.
+
+        Args:
+            app (DatabaseApp): The application.
+            handlers (Iterable[str]): Names of the methods to profile.
+        """
+        for name in handlers:
+            handler = getattr(app, name, None)
+            if handler is not None:
+                setattr(app, name, self.wrap(name, handler, app))
+
+    def wrap(self, name, handler, root):
+        """
+        Returns a version of a handler that writes one record per call.
+
+        Args:
+            name (str): Name recorded for the handler.
+            handler (Callable): The handler.
+            root (tkinter.Misc): Widget whose descendants are counted after the call.
+
+        Returns:
+            Callable: The profiled handler.
+        """
+        @functools.wraps(handler)
+        def profiled(*args, **kwargs):
+            # Handlers called from other handlers are part of the outer record.
+            if self._depth:
+                return handler(*args, **kwargs)
+            self._depth += 1
+            before = self._snapshot()
+            start = time.perf_counter()
+            try:
+                return handler(*args, **kwargs)
+            finally:
+                seconds = time.perf_counter() - start
+                self._depth -= 1
+                self.measure(name, before, seconds, root)
+        return profiled
+
+    def measure(self, name, before, seconds, root=None):
+        """
+        Writes the record of one handler call.
+
+        Args:
+            name (str): Name of the handler.
+            before (tracemalloc.Snapshot): Snapshot taken before the call.
+            seconds (float): Duration of the call.
+            root (tkinter.Misc, optional): Widget whose descendants are counted.
+        """
+        after = self._snapshot()
+        traced, peak = tracemalloc.get_traced_memory()
+        stats = after.compare_to(before, 'lineno')
+        record = {
+            'event': 'call',
+            'handler': name,
+            'seconds': seconds,
+            'allocated': sum(stat.size_diff for stat in stats),
+            'retained': traced - self._last_traced,
+            'traced': traced,
+            'peak': peak,
+            'rss': resident_bytes(),
+            'sites': [[str(stat.traceback[0]), stat.size_diff, stat.count_diff]
+                      for stat in stats[:self.top] if stat.size_diff],
+        }
+        if root is not None:
+            widgets, items = count_widgets(root)
+            record['widgets'] = dict(widgets)
+            record['tree_items'] = items
+        self._last_traced = traced
+        tracemalloc.reset_peak()
+        self._write(record)
+        self.records += 1
+
+    def close(self):
+        """
+        Stops tracing and closes the file.
+        """
+        self._write({'event': 'stop', 'time': time.time(), 'records': self.records})
+        self._file.close()
+        tracemalloc.stop()
+
+
+def read(path):
+    """
+    Reads the handler calls of a profile.
+
+    Args:
+        path (str): A file written by :class:`MemoryProfiler`.
+
+    Returns:
+        list[dict]: The call records in order.
+    """
+    with open(path, encoding='utf-8') as file:
+        return [record for record in map(json.loads, file) if record.get('event') == 'call']
+
+
+def summarize(calls):
+    """
+    Aggregates call records per handler.
+
+    Args:
+        calls (list[dict]): Records from :func:`read`.
+
+    Returns:
+        dict: Per handler ``calls``, mean ``allocated``, total ``retained``, maximum
+        ``toplevels`` and ``tree_items``, and the ``sites`` allocating most over all calls.
+    """
+    summary = {}
+    for call in calls:
+        entry = summary.setdefault(call['handler'], {
+            'calls': 0, 'allocated': 0, 'retained': 0, 'toplevels': 0, 'tree_items': 0,
+            'sites': collections.Counter()})
+        entry['calls'] += 1
+        entry['allocated'] += call['allocated']
+        entry['retained'] += call['retained']
+        entry['toplevels'] = max(entry['toplevels'], call.get('widgets', {}).get('Toplevel', 0))
+        entry['tree_items'] = max(entry['tree_items'], call.get('tree_items', 0))
+        for site, size, _ in call['sites']:
+            entry['sites'][site] += size
+    for entry in summary.values():
+        entry['allocated'] //= entry['calls']
+    return summary
+
+
+def _kib(size):
+    return f'{size / 1024:+,.1f} KiB'
+
+
+def report(path, other=None, top=5, out=sys.stdout):
+    """
+    Prints the per-handler summary of a profile, or the differences between two.
+
+    Args:
+        path (str): The profile, or the earlier one when comparing.
+        other (str, optional): The later profile to compare with.
+        top (int): Number of allocation sites listed per handler.
+        out (file): Stream to print to.
+    """
+    first = summarize(read(path))
+    if other is None:
+        print(f'{"handler":18} {"calls":>6} {"mean allocated":>16} {"retained":>16} {"toplevels":>9} {"items":>8}',
+              file=out)
+        for name, entry in first.items():
+            print(f'{name:18} {entry["calls"]:6} {_kib(entry["allocated"]):>16} {_kib(entry["retained"]):>16} '
+                  f'{entry["toplevels"]:9} {entry["tree_items"]:8}', file=out)
+            for site, size in entry['sites'].most_common(top):
+                print(f'    {_kib(size):>14}  {site}', file=out)
+        return
+    second = summarize(read(other))
+    print(f'{"handler":18} {"mean allocated":>30} {"retained":>30}', file=out)
+    for name in list(first) + [name for name in second if name not in first]:
+        a, b = first.get(name), second.get(name)
+        if a is None or b is None:
+            print(f'{name:18} only in {path if b is None else other}', file=out)
+            continue
+        print(f'{name:18} {_kib(a["allocated"]):>14} -> {_kib(b["allocated"]):>13} '
+              f'{_kib(a["retained"]):>14} -> {_kib(b["retained"]):>13}', file=out)
+
+
+def main(argv=None):
+    """
+    Command line entry point.
+
+    Args:
+        argv (list[str] | None): Arguments, defaults to ``sys.argv[1:]``.
+
+    Returns:
+        int: Process exit status.
+    """
+    parser = argparse.ArgumentParser(description='Summarize or compare memory profiles')
+    parser.add_argument('profile')
+    parser.add_argument('other', nargs='?', help='a later profile to compare with')
+    parser.add_argument('--top', type=int, default=5, help='allocation sites listed per handler')
+    args = parser.parse_args(argv)
+    report(args.profile, args.other, args.top)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,415 @@
+"""
+Versioned schema migrations with batched, resumable backfills.
+
+The schema version of a database is its ``PRAGMA user_version``. Every
+:class:`Migration` brings a database to its own version from the one before,
+and :func:`migrate` applies those a database has not seen yet, in order. A
+migration is a list of steps:
+
+:class:`Run`
+    Calls a function, e.g. one adding a column, in one transaction.
+:class:`Backfill`
+    Fills in columns of existing rows, a bounded batch of rows per transaction.
+:class:`CreateIndex`
+    Builds an index in a transaction of its own.
+
+Each step records its progress in ``migration_progress`` in the same
+transaction as its work: a backfill the last row id it finished, every step
+whether it is done. A migration that is interrupted (the application closed,
+a cancelled job, a crash) resumes where it stopped instead of starting over,
+and ``user_version`` is only bumped once all of its steps are done.
+
+Writers are locked out for one batch at a time, never for a whole backfill.
+SQLite cannot build an index incrementally: :class:`CreateIndex` holds the
+write lock for the whole build, and writers block until it is done. To keep
+that short the table is read once beforehand without any lock, so the build
+reads from the file system cache, and the sort runs on worker threads with a
+larger page cache. The build is also given a lock budget (``LOCK_BUDGET``),
+shorter than the 5 second busy timeout of a default connection: a build that
+takes longer is rolled back so the waiting writers go ahead, and retried after
+a back-off. An index whose build never fits the budget raises
+:class:`LockBudgetExceeded`; build it in a maintenance window, when nothing
+else writes, with ``python schema.py school.db --maintenance``.
+
+Migrations marked ``online`` only speed up queries; the application applies
+them in a background job once its window is up. All others have to be
+applied before the database is used::
+
+    applied = migrations.migrate(conn, schema.MIGRATIONS, progress=job.progress)
+
+``python schema.py school.db --status`` lists the migrations of a database.
+"""
+import collections
+import contextlib
+import sqlite3
+import time
+
+BATCH_SIZE = 5000
+SORT_THREADS = 4
+# Page cache of an index build, in KiB.
+SORT_CACHE = 64 * 1024
+# Longest an index build may hold the write lock, in seconds, and how it is retried.
+LOCK_BUDGET = 2.0
+BUILD_ATTEMPTS = 4
+BACKOFF = 1.0
+# Virtual machine instructions between two checks of the lock budget.
+_CHECK_INTERVAL = 10000
+
+Migration = collections.namedtuple('Migration', 'version description steps online', defaults=(False,))
+Migration.__doc__ = """
+One version of the schema.
+
+Attributes
+----------
+version : int
+    The ``user_version`` of a database once the migration is applied.
+description : str
+    What the migration changes.
+steps : tuple
+    :class:`Run`, :class:`Backfill` and :class:`CreateIndex` steps, applied in order.
+online : bool
+    Whether the database can be used before the migration is applied.
+"""
+
+
+class LockBudgetExceeded(RuntimeError):
+    """
+    Raised when an index build needs the write lock for longer than its lock budget.
+    """
+
+
+@contextlib.contextmanager
+def _transaction(conn):
+    # Takes the write lock at once, so the progress read inside is still current when written.
+    conn.execute('BEGIN IMMEDIATE')
+    try:
+        yield
+    except BaseException:
+        conn.rollback()
+        raise
+    conn.commit()
+
+
+def _position(conn, version, step):
+    row = conn.execute('SELECT last_id, done FROM migration_progress WHERE version = ? AND step = ?',
+                       (version, step)).fetchone()
+    return (row[0], bool(row[1])) if row else (0, False)
+
+
+def _record(conn, version, step, last_id=0, done=False):
+    conn.execute('INSERT OR REPLACE INTO migration_progress (version, step, last_id, done) VALUES (?, ?, ?, ?)',
+                 (version, step, last_id, int(done)))
+
+
+class Run:
+    """
+    Step calling a function in one transaction.
+
+    Attributes
+    ----------
+    description : str
+        What the step does.
+    function : Callable[[sqlite3.Connection], None]
+        Applies the change. Must not commit.
+    """
+    def __init__(self, description, function):
+        self.description = description
+        self.function = function
+
+    def apply(self, conn, version, step, progress=None, lock_budget=LOCK_BUDGET):
+        """
+        Applies the step unless it is done already.
+
+        Args:
+            conn (sqlite3.Connection): Connection to the database, with no transaction open.
+            version (int): Version of the migration the step belongs to.
+            step (int): Position of the step in the migration.
+            progress (Callable[[int, int], None] | None): Not used.
+            lock_budget (float | None): Not used.
+        """
+        with _transaction(conn):
+            if _position(conn, version, step)[1]:
+                return
+            self.function(conn)
+            _record(conn, version, step, done=True)
+
+
+class Backfill:
+    """
+    Step filling in columns of existing rows in batches, in the order of their row ids.
+
+    Attributes
+    ----------
+    table : str
+        Table to fill in. Must have an ``id`` primary key.
+    columns : tuple[str]
+        Columns written.
+    reads : tuple[str]
+        Columns read to compute them.
+    compute : Callable
+        Called with the ``reads`` values of a row; returns the ``columns`` values.
+    where : str | None
+        SQL condition selecting the rows to fill in, e.g. ``"email_key IS NULL"``.
+    batch_size : int
+        Rows updated per transaction.
+    """
+    def __init__(self, table, columns, reads, compute, where=None, batch_size=BATCH_SIZE):
+        self.table = table
+        self.columns = tuple(columns)
+        self.reads = tuple(reads)
+        self.compute = compute
+        self.where = where
+        self.batch_size = batch_size
+        self.description = f'fill in {", ".join(self.columns)} of {table}'
+
+    def apply(self, conn, version, step, progress=None, lock_budget=LOCK_BUDGET):
+        """
+        Fills in the remaining rows, one committed batch at a time.
+
+        Args:
+            conn (sqlite3.Connection): Connection to the database, with no transaction open.
+            version (int): Version of the migration the step belongs to.
+            step (int): Position of the step in the migration.
+            progress (Callable[[int, int], None] | None): Called after each batch with the
+                rows filled in so far and the rows there were to fill in; may raise to stop
+                between batches.
+            lock_budget (float | None): Not used; every batch is short.
+        """
+        last_id, done = _position(conn, version, step)
+        if done:
+            return
+        where = f' AND ({self.where})' if self.where else ''
+        select = (f'SELECT id, {", ".join(self.reads)} FROM {self.table} '
+                  f'WHERE id > ?{where} ORDER BY id LIMIT {self.batch_size}')
+        update = f'UPDATE {self.table} SET {", ".join(f"{column} = ?" for column in self.columns)} WHERE id = ?'
+        total = conn.execute(f'SELECT count(*) FROM {self.table} WHERE id > ?{where}', (last_id,)).fetchone()[0]
+        filled = 0
+        while True:
+            with _transaction(conn):
+                last_id, done = _position(conn, version, step)
+                if done:
+                    return
+                rows = conn.execute(select, (last_id,)).fetchall()
+                conn.executemany(update, [(*self.compute(*row[1:]), row[0]) for row in rows])
+                if rows:
+                    last_id = rows[-1][0]
+                _record(conn, version, step, last_id, done=len(rows) < self.batch_size)
+            filled += len(rows)
+            if progress:
+                progress(filled, max(total, filled))
+            if len(rows) < self.batch_size:
+                return
+
+
+class CreateIndex:
+    """
+    Step building an index.
+
+    Attributes
+    ----------
+    name : str
+        Name of the index.
+    table : str
+        Table indexed.
+    columns : str
+        Indexed columns as SQL, e.g. ``"name COLLATE NOCASE"``.
+    where : str | None
+        Condition of a partial index.
+    unique : bool
+        Whether the index is UNIQUE.
+    """
+    def __init__(self, name, table, columns, where=None, unique=False):
+        self.name = name
+        self.table = table
+        self.columns = columns
+        self.where = where
+        self.unique = unique
+        self.description = f'index {table}({columns})'
+
+    def apply(self, conn, version, step, progress=None, lock_budget=LOCK_BUDGET):
+        """
+        Builds the index unless it is done already.
+
+        A build that holds the write lock for longer than ``lock_budget`` is rolled back
+        and retried after a back-off, ``BUILD_ATTEMPTS`` times in all.
+
+        Args:
+            conn (sqlite3.Connection): Connection to the database, with no transaction open.
+            version (int): Version of the migration the step belongs to.
+            step (int): Position of the step in the migration.
+            progress (Callable[[int, int], None] | None): Called with the rows indexed once
+                the index is built.
+            lock_budget (float | None): Seconds the build may hold the write lock; None
+                lets it take as long as it needs, blocking writers meanwhile.
+
+        Raises:
+            LockBudgetExceeded: If no attempt finished within the lock budget.
+        """
+        if _position(conn, version, step)[1]:
+            return
+        where = f' WHERE {self.where}' if self.where else ''
+        # Reads the table into the file system cache before the write lock is taken.
+        rows = conn.execute(f'SELECT count(*) FROM {self.table} NOT INDEXED{where}').fetchone()[0]
+        threads = conn.execute('PRAGMA threads').fetchone()[0]
+        cache_size = conn.execute('PRAGMA cache_size').fetchone()[0]
+        conn.execute(f'PRAGMA threads = {SORT_THREADS}')
+        conn.execute(f'PRAGMA cache_size = {-SORT_CACHE}')
+        try:
+            for attempt in range(BUILD_ATTEMPTS if lock_budget is not None else 1):
+                if attempt:
+                    time.sleep(BACKOFF * 2 ** (attempt - 1))
+                try:
+                    self._build(conn, version, step, where, lock_budget)
+                    break
+                except sqlite3.OperationalError as error:
+                    if error.sqlite_errorcode != sqlite3.SQLITE_INTERRUPT:
+                        raise
+            else:
+                raise LockBudgetExceeded(
+                    f'Building {self.name} holds the write lock for longer than {lock_budget:g} s; '
+                    'build it while nothing else writes with "python schema.py <database> --maintenance"')
+        finally:
+            conn.execute(f'PRAGMA threads = {threads}')
+            conn.execute(f'PRAGMA cache_size = {cache_size}')
+        if progress:
+            progress(rows, rows)
+
+    def _build(self, conn, version, step, where, lock_budget):
+        with _transaction(conn):
+            if _position(conn, version, step)[1]:
+                return
+            if lock_budget is not None:
+                # Interrupts the build, which rolls it back, once the budget is spent.
+                deadline = time.perf_counter() + lock_budget
+                conn.set_progress_handler(lambda: time.perf_counter() > deadline, _CHECK_INTERVAL)
+            try:
+                conn.execute(f'CREATE {"UNIQUE " if self.unique else ""}INDEX IF NOT EXISTS {self.name} '
+                             f'ON {self.table}({self.columns}){where}')
+            finally:
+                conn.set_progress_handler(None, 0)
+            _record(conn, version, step, done=True)
+
+
+def version(conn):
+    """
+    Returns the schema version of a database.
+
+    Args:
+        conn (sqlite3.Connection): Connection to the database.
+
+    Returns:
+        int: Its ``PRAGMA user_version``; 0 for a new database.
+    """
+    return conn.execute('PRAGMA user_version').fetchone()[0]
+
+
+def pending(conn, migrations):
+    """
+    Returns the migrations a database has not seen yet.
+
+    Args:
+        conn (sqlite3.Connection): Connection to the database.
+        migrations (Sequence[Migration]): All migrations, in version order.
+
+    Returns:
+        list[Migration]: The migrations newer than the database, in order.
+    """
+    current = version(conn)
+    return [migration for migration in migrations if migration.version > current]
+
+
+def required(conn, migrations):
+    """
+    Returns the version a database must have before it can be used.
+
+    Args:
+        conn (sqlite3.Connection): Connection to the database.
+        migrations (Sequence[Migration]): All migrations, in version order.
+
+    Returns:
+        int: Version of the last pending migration that is not ``online``, or the
+        current version if there is none.
+    """
+    return max((migration.version for migration in pending(conn, migrations) if not migration.online),
+               default=version(conn))
+
+
+def migrate(conn, migrations, target=None, progress=None, lock_budget=LOCK_BUDGET):
+    """
+    Applies the pending migrations in order, resuming one that was interrupted.
+
+    Args:
+        conn (sqlite3.Connection): Connection to the database, with no transaction open.
+        migrations (Sequence[Migration]): All migrations, in version order.
+        target (int, optional): Stop after this version; defaults to the last migration.
+        progress (Callable[[int, int], None] | None): Called by the steps with units done
+            and their total, e.g. :meth:`jobs.Job.progress`; may raise to stop between
+            batches, and a later call resumes from there.
+        lock_budget (float | None): Seconds an index build may hold the write lock; None
+            for a maintenance window, when blocking writers does not matter.
+
+    Returns:
+        list[Migration]: The migrations applied.
+
+    Raises:
+        LockBudgetExceeded: If an index build does not fit the lock budget.
+    """
+    steps = [migration for migration in pending(conn, migrations) if target is None or migration.version <= target]
+    if not steps:
+        return []
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS migration_progress (
+            version INTEGER NOT NULL,
+            step INTEGER NOT NULL,
+            last_id INTEGER NOT NULL DEFAULT 0,
+            done INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (version, step)
+        ) WITHOUT ROWID
+    """)
+    applied = []
+    for migration in steps:
+        for step, action in enumerate(migration.steps):
+            action.apply(conn, migration.version, step, progress, lock_budget)
+        with _transaction(conn):
+            # Another process may have finished the migration meanwhile.
+            if version(conn) < migration.version:
+                conn.execute(f'PRAGMA user_version = {migration.version}')
+            conn.execute('DELETE FROM migration_progress WHERE version = ?', (migration.version,))
+        applied.append(migration)
+    return applied
+
+
+def status(conn, migrations):
+    """
+    Describes the state of every migration in a database.
+
+    Args:
+        conn (sqlite3.Connection): Connection to the database.
+        migrations (Sequence[Migration]): All migrations, in version order.
+
+    Returns:
+        list[tuple[Migration, str]]: Each migration with ``"applied"``, ``"pending"``, or
+        the step it stopped at.
+    """
+    current = version(conn)
+    started = set()
+    if conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'migration_progress'").fetchone():
+        started = {row[0] for row in conn.execute('SELECT version FROM migration_progress')}
+    states = []
+    for migration in migrations:
+        if migration.version <= current:
+            states.append((migration, 'applied'))
+            continue
+        if migration.version not in started:
+            states.append((migration, 'pending'))
+            continue
+        for step, action in enumerate(migration.steps):
+            last_id, done = _position(conn, migration.version, step)
+            if not done:
+                resume = f', after row id {last_id}' if last_id else ''
+                states.append((migration, f'interrupted at step {step + 1}/{len(migration.steps)}: '
+                                          f'{action.description}{resume}'))
+                break
+        else:
+            states.append((migration, 'interrupted before its version was recorded'))
+    return states
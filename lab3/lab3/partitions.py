@@ -0,0 +1,337 @@
+"""
+Term-based partitioning of course registrations.
+
+Each term's registrations live in their own SQLite file which is attached to
+the application's connection::
+
+    terms/registrations_<term>.db            open terms, attached read-write
+    terms/archive/registrations_<term>.db    archived terms, attached read-only
+
+New registrations go into the current term's file, so current-term queries and
+indexes only touch current-term pages. The ``all_registrations`` temporary view
+combines every attached term (and any rows left in the main ``registrations``
+table, reported with a NULL term) with ``UNION ALL``. Archiving a term is a file move::
+
+    python partitions.py archive terms 2024_spring
+    python partitions.py list terms
+
+Each term file carries its own change log, so it can be synced with changelog.py.
+
+SQLite attaches at most 10 databases per connection by default. Only the open
+terms stay attached; archived terms are attached for as long as a query needs
+the full history (:meth:`TermPartitions.history`, e.g. to check prerequisites)
+and detached again. Attaching more terms than the limit allows fails with a
+:class:`TooManyTerms` error; archived terms then have to be merged.
+"""
+import argparse
+import contextlib
+import os
+import re
+import sqlite3
+import sys
+
+import changelog
+import enrollment
+
+ARCHIVE_DIR = 'archive'
+VIEW = 'all_registrations'
+
+_TERM = re.compile(r'[A-Za-z0-9_]+')
+_TERM_FILE = re.compile(r'registrations_([A-Za-z0-9_]+)\.db')
+
+
+class TooManyTerms(ValueError):
+    """
+    Raised when attaching a term would exceed SQLite's limit of attached databases.
+    """
+
+
+def _check_term(term):
+    if not _TERM.fullmatch(term or ''):
+        raise ValueError(f"Invalid term '{term}': use letters, digits and underscores only")
+    return term
+
+
+def term_file(directory, term, archived=False):
+    """
+    Returns the path of a term's database file.
+
+    Args:
+        directory (str): The terms directory.
+        term (str): Term name, e.g. ``2024_fall``.
+        archived (bool): Whether to return the path inside the archive directory.
+
+    Returns:
+        str: Path of the file.
+    """
+    if archived:
+        directory = os.path.join(directory, ARCHIVE_DIR)
+    return os.path.join(directory, f'registrations_{_check_term(term)}.db')
+
+
+def list_terms(directory, archived=False):
+    """
+    Lists the terms that have a file in the terms directory.
+
+    Args:
+        directory (str): The terms directory.
+        archived (bool): Whether to list the archived terms instead of the open ones.
+
+    Returns:
+        list[str]: Term names, sorted.
+    """
+    folder = os.path.join(directory, ARCHIVE_DIR) if archived else directory
+    names = sorted(os.listdir(folder)) if os.path.isdir(folder) else ()
+    return [match.group(1) for match in map(_TERM_FILE.fullmatch, names) if match]
+
+
+def term_files(directory):
+    """
+    Lists the file of every term, open and archived.
+
+    Args:
+        directory (str): The terms directory.
+
+    Returns:
+        list[tuple[str, str]]: ``(term, path)`` pairs, open terms first.
+    """
+    return [(term, term_file(directory, term, archived))
+            for archived in (False, True) for term in list_terms(directory, archived)]
+
+
+def connect_term(path):
+    """
+    Opens a read-only connection to a term's file, e.g. to export it.
+
+    Args:
+        path (str): Path of the file.
+
+    Returns:
+        sqlite3.Connection: The connection.
+    """
+    return sqlite3.connect(_uri(path, True), uri=True)
+
+
+def _uri(path, read_only):
+    uri = 'file:' + os.path.abspath(path).replace('?', '%3f').replace('#', '%23')
+    return uri + '?mode=ro' if read_only else uri
+
+
+class TermPartitions:
+    """
+    Registrations partitioned into one attached database file per term.
+
+    Attributes
+    ----------
+    conn : sqlite3.Connection
+        Connection the term files are attached to.
+    directory : str
+        Directory holding the term files.
+    current_term : str
+        Term new registrations are written to.
+    terms : dict
+        Maps each attached term to whether it is archived. Archived terms are only
+        attached within :meth:`history`.
+    """
+    def __init__(self, conn, directory, current_term):
+        """
+        Attaches the open terms' files, creating the current term's file if needed.
+
+        Args:
+            conn (sqlite3.Connection): Connection opened with ``uri=True``.
+            directory (str): Directory holding the term files. Created if missing.
+            current_term (str): Term new registrations are written to.
+
+        Raises:
+            ValueError: If the current term is archived.
+            TooManyTerms: If there are more open terms than databases can be attached.
+        """
+        self.conn = conn
+        self.directory = directory
+        self.current_term = _check_term(current_term)
+        self.terms = {}
+        os.makedirs(os.path.join(directory, ARCHIVE_DIR), exist_ok=True)
+        if os.path.exists(term_file(directory, current_term, archived=True)):
+            raise ValueError(f"Term '{current_term}' is archived and cannot be the current term")
+        for term in list_terms(directory):
+            self._attach(term, False)
+        if current_term not in self.terms:
+            self._attach(current_term, False)
+        self.refresh_view()
+
+    @staticmethod
+    def alias(term):
+        """
+        Returns the schema name a term is attached under.
+
+        Args:
+            term (str): Term name.
+
+        Returns:
+            str: The schema name.
+        """
+        return f'term_{_check_term(term)}'
+
+    @property
+    def registrations_table(self):
+        """str: Qualified name of the table new registrations are inserted into."""
+        return f'{self.alias(self.current_term)}.registrations'
+
+    @property
+    def schema(self):
+        """str: Schema name of the current term's file."""
+        return self.alias(self.current_term)
+
+    @property
+    def open_schemas(self):
+        """list[str]: Schema names of the open (writable) terms' files."""
+        return [self.alias(term) for term, archived in sorted(self.terms.items()) if not archived]
+
+    @property
+    def insert_sql(self):
+        """str: Statement inserting a ``(student_id, course_id)`` registration into the current term."""
+        return f'INSERT INTO {self.registrations_table} (student_id, course_id) VALUES (?, ?)'
+
+    def _attach(self, term, archived):
+        alias = self.alias(term)
+        limit = self.conn.getlimit(sqlite3.SQLITE_LIMIT_ATTACHED)
+        if len(self.terms) >= limit:
+            raise TooManyTerms(f"Cannot attach term '{term}': SQLite attaches at most {limit} databases "
+                               f"per connection and {len(self.terms)} terms are attached already. "
+                               "Archive old terms and merge archived ones into fewer files.")
+        self.conn.execute('ATTACH DATABASE ? AS ' + alias,
+                          (_uri(term_file(self.directory, term, archived), archived),))
+        if not archived:
+            self.conn.execute(f"""
+                CREATE TABLE IF NOT EXISTS {alias}.registrations (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    student_id TEXT NOT NULL,
+                    course_id TEXT NOT NULL
+                )
+            """)
+            self.conn.execute(f'CREATE INDEX IF NOT EXISTS {alias}.idx_registrations_course ON registrations(course_id)')
+            self.conn.execute(f'CREATE INDEX IF NOT EXISTS {alias}.idx_registrations_student ON registrations(student_id)')
+            enrollment.install_registrations(self.conn, alias)
+            changelog.install(self.conn, ['registrations'], schema=alias)
+            self.conn.commit()
+        self.terms[term] = archived
+
+    def refresh_view(self):
+        """
+        Rebuilds the ``all_registrations`` view over the main table and every attached term.
+        """
+        selects = ['SELECT NULL AS term, id, student_id, course_id FROM main.registrations']
+        selects += [f"SELECT '{term}', id, student_id, course_id FROM {self.alias(term)}.registrations"
+                    for term in sorted(self.terms)]
+        self.conn.execute(f'DROP VIEW IF EXISTS temp.{VIEW}')
+        self.conn.execute(f'CREATE TEMP VIEW {VIEW} AS ' + ' UNION ALL '.join(selects))
+
+    @contextlib.contextmanager
+    def history(self):
+        """
+        Attaches the archived terms read-only for the duration of a ``with`` block, so
+        the ``all_registrations`` view covers every term, and detaches them afterwards::
+
+            with partitions.history() as view:
+                enrollment.register(conn, student_id, course_id, partitions.schema, view)
+
+        The block must end its transactions, e.g. by committing.
+
+        Yields:
+            str: Name of the view.
+
+        Raises:
+            TooManyTerms: If the open and archived terms together exceed the attach limit.
+        """
+        attached = []
+        try:
+            for term in list_terms(self.directory, archived=True):
+                if term not in self.terms:
+                    self._attach(term, True)
+                    attached.append(term)
+            self.refresh_view()
+            yield VIEW
+        finally:
+            self.conn.execute(f'DROP VIEW IF EXISTS temp.{VIEW}')
+            for term in attached:
+                self.conn.execute(f'DETACH DATABASE {self.alias(term)}')
+                del self.terms[term]
+            self.refresh_view()
+
+    def archive_term(self, term):
+        """
+        Archives a term: detaches its file and moves it into the archive directory.
+
+        Args:
+            term (str): Term to archive. Must not be the current term.
+
+        Raises:
+            ValueError: If the term is the current term, unknown or already archived.
+        """
+        if term == self.current_term:
+            raise ValueError('The current term cannot be archived')
+        if self.terms.get(term) is not False:
+            raise ValueError(f"Term '{term}' is not an open term")
+        self.conn.commit()
+        self.conn.execute(f'DROP VIEW IF EXISTS temp.{VIEW}')
+        self.conn.execute(f'DETACH DATABASE {self.alias(term)}')
+        del self.terms[term]
+        archive_term_file(self.directory, term)
+        self.refresh_view()
+
+
+def archive_term_file(directory, term):
+    """
+    Moves a term's file into the archive directory and marks it read-only.
+
+    The term must not be attached by a running application; use
+    :meth:`TermPartitions.archive_term` from within the application instead.
+
+    Args:
+        directory (str): The terms directory.
+        term (str): Term to archive.
+
+    Returns:
+        str: Path of the archived file.
+    """
+    source = term_file(directory, term)
+    target = term_file(directory, term, archived=True)
+    if not os.path.exists(source):
+        raise ValueError(f"Term '{term}' has no open file in {directory}")
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    os.replace(source, target)
+    os.chmod(target, 0o444)
+    return target
+
+
+def main(argv=None):
+    """
+    Command line entry point for listing and archiving terms.
+
+    Args:
+        argv (list[str] | None): Arguments, defaults to ``sys.argv[1:]``.
+
+    Returns:
+        int: Process exit status.
+    """
+    parser = argparse.ArgumentParser(description='Per-term registration files')
+    commands = parser.add_subparsers(dest='command', required=True)
+    archive_parser = commands.add_parser('archive', help='move a term into the read-only archive')
+    archive_parser.add_argument('directory')
+    archive_parser.add_argument('term')
+    list_parser = commands.add_parser('list', help='list open and archived terms')
+    list_parser.add_argument('directory')
+    args = parser.parse_args(argv)
+
+    if args.command == 'archive':
+        print(archive_term_file(args.directory, args.term))
+    else:
+        for archived, label in ((False, 'open'), (True, 'archived')):
+            for term in list_terms(args.directory, archived):
+                print(f'{term:20} {label}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
+
@@ -0,0 +1,159 @@
+"""
+Result cache for repeated read queries.
+
+Results are keyed by ``(sql, parameters)``, or by a key of the caller's for
+results that do not come from a single query (e.g. the merged searches of
+searchengine.py), and tagged with the versions of the tables they read. A table's version is the sequence number of its
+latest entry in the change log (see :func:`changelog.table_version`), so an
+entry is served only while none of its tables changed, through this
+connection or any other, and a change to one table leaves entries over the
+others alone.
+
+Looking up the versions costs one index seek per table, and even that is
+skipped while ``PRAGMA data_version`` (commits by other connections) and
+``total_changes`` (changes by this connection) both stay the same. Without a
+change log, e.g. on a read-only copy, any commit elsewhere invalidates every
+entry.
+
+Memory is bounded by the total number of cached rows; least recently used
+entries are evicted first and results larger than the bound are not cached.
+"""
+import itertools
+from collections import OrderedDict
+
+import changelog
+
+MAX_ROWS = 50000
+MAX_ENTRIES = 256
+
+
+class QueryCache:
+    """
+    LRU cache of query results on one connection.
+
+    Attributes
+    ----------
+    conn : sqlite3.Connection
+        Connection queries are run on.
+    max_rows : int
+        Maximum number of rows held over all entries.
+    max_entries : int
+        Maximum number of entries.
+    hits : int
+        Number of queries answered from the cache.
+    misses : int
+        Number of queries run on the database.
+    """
+    def __init__(self, conn, max_rows=MAX_ROWS, max_entries=MAX_ENTRIES):
+        """
+        Args:
+            conn (sqlite3.Connection): Connection queries are run on.
+            max_rows (int): Maximum number of rows held over all entries.
+            max_entries (int): Maximum number of entries.
+        """
+        self.conn = conn
+        self.max_rows = max_rows
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._rows = 0
+        self._stamp = None
+        self._versions = {}
+        self._has_log = None
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _table_versions(self, tables):
+        stamp = (self.conn.execute('PRAGMA data_version').fetchone()[0], self.conn.total_changes)
+        if stamp != self._stamp:
+            self._stamp = stamp
+            self._versions = {}
+        if self._has_log is None:
+            self._has_log = self.conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'change_log'").fetchone() is not None
+        versions = []
+        for table in tables:
+            if table not in self._versions:
+                self._versions[table] = changelog.table_version(self.conn, table) if self._has_log else stamp
+            versions.append(self._versions[table])
+        return tuple(versions)
+
+    def lookup(self, key, tables):
+        """
+        Returns the cached result of a key if none of its tables changed since.
+
+        Args:
+            key (Hashable): Identifies the result.
+            tables (Iterable[str]): Every table the result was read from.
+
+        Returns:
+            tuple[list | None, tuple]: The cached rows, or None on a miss, and the table
+            versions to :meth:`store` a new result under. They are read before the
+            result is computed, so a change made meanwhile invalidates it.
+        """
+        versions = self._table_versions(tables)
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] == versions:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1], versions
+        self.misses += 1
+        if entry is not None:
+            self._discard(key)
+        return None, versions
+
+    def store(self, key, versions, rows):
+        """
+        Caches a result, unless it has more than ``max_rows`` rows.
+
+        Args:
+            key (Hashable): Identifies the result.
+            versions (tuple): Table versions returned by :meth:`lookup`.
+            rows (list): The result.
+        """
+        if len(rows) > self.max_rows:
+            return
+        if key in self._entries:
+            self._discard(key)
+        self._entries[key] = (versions, rows)
+        self._rows += len(rows)
+        while self._rows > self.max_rows or len(self._entries) > self.max_entries:
+            self._discard(next(iter(self._entries)))
+
+    def execute(self, sql, parameters=(), tables=()):
+        """
+        Runs a query, or returns its cached result if none of its tables changed since.
+
+        Args:
+            sql (str): The query.
+            parameters (Sequence): Query parameters.
+            tables (Iterable[str]): Every table the query reads.
+
+        Returns:
+            Iterable[tuple]: The result rows. A list when cached; larger results are
+            streamed from the database.
+        """
+        key = (sql, tuple(parameters))
+        rows, versions = self.lookup(key, tables)
+        if rows is not None:
+            return rows
+        cursor = self.conn.execute(sql, parameters)
+        rows = cursor.fetchmany(self.max_rows + 1)
+        if len(rows) > self.max_rows:
+            return itertools.chain(rows, cursor)
+        self.store(key, versions, rows)
+        return rows
+
+    def _discard(self, key):
+        self._rows -= len(self._entries.pop(key)[1])
+
+    def clear(self):
+        """
+        Drops every entry, e.g. after the schema changed.
+        """
+        self._entries.clear()
+        self._rows = 0
+        self._stamp = None
+        self._has_log = None
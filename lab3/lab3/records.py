@@ -0,0 +1,263 @@
+"""
+Compact record types for rows held in memory.
+
+Rows are plain tuples with named fields (``namedtuple``), so a record costs no
+more than the tuple sqlite3 returns and has no per-instance ``__dict__``. Bulk
+datasets that are kept around, e.g. caches or exports of millions of rows, can
+go further with :class:`ColumnStore`, which keeps each column in one typed
+array instead of one Python object per value::
+
+    store = ColumnStore.from_cursor(Student, conn.execute(select_sql('students')))
+    store[10].name
+
+``python bench.py memory --rows 1000000`` compares the bytes per row of both
+with dictionaries.
+"""
+from array import array
+from collections import namedtuple
+
+import statements
+
+Student = namedtuple('Student', 'id name age email student_id')
+Student.__doc__ = """A row of the ``students`` table."""
+
+Instructor = namedtuple('Instructor', 'id name age email instructor_id')
+Instructor.__doc__ = """A row of the ``instructors`` table."""
+
+Course = namedtuple('Course', 'id course_name course_id instructor_id')
+Course.__doc__ = """A row of the ``courses`` table."""
+
+Registration = namedtuple('Registration', 'id student_id course_id')
+Registration.__doc__ = """A row of the ``registrations`` table."""
+
+RECORDS = {
+    'students': Student,
+    'instructors': Instructor,
+    'courses': Course,
+    'registrations': Registration,
+}
+
+# Storage kind of each column, for ColumnStore.
+KINDS = {
+    'id': 'int',
+    'age': 'int',
+}
+
+
+class ListingRow(namedtuple('ListingRow', 'entity_id name type row_id version', defaults=(None,))):
+    """
+    A row of the View All table.
+
+    Attributes
+    ----------
+    entity_id : str
+        Business identifier, shown in the ``ID`` column.
+    name : str
+        Name or course name, shown in the ``Name`` column.
+    type : str
+        Entity type, shown in the ``Type`` column.
+    row_id : int
+        Row id in the entity's table.
+    version : int | None
+        Version of the row when it was read, see concurrency.py.
+    """
+    __slots__ = ()
+
+    @classmethod
+    def from_item(cls, iid, values, version=None):
+        """
+        Rebuilds a row from a Treeview item.
+
+        Args:
+            iid (str): Item id, ``<type>:<row id>`` for rows read from the database.
+            values (tuple): Item values, ``(id, name, type)``.
+            version (int, optional): Version of the row when the item was filled.
+
+        Returns:
+            ListingRow: The row; its ``row_id`` is None for items that were not read from
+            the database, e.g. rows loaded from a CSV file.
+        """
+        entity_id, name, type_value = values
+        prefix, _, row_id = iid.partition(':')
+        return cls(entity_id, name, type_value, int(row_id) if prefix == type_value and row_id.isdigit() else None,
+                   version)
+
+    @property
+    def iid(self):
+        """str: Treeview item id of the row."""
+        return f'{self.type}:{self.row_id}'
+
+    @property
+    def values(self):
+        """tuple: Values shown in the Treeview columns."""
+        return self.entity_id, self.name, self.type
+
+    @property
+    def entity(self):
+        """statements.Entity | None: The entity the row belongs to."""
+        return statements.entity(self.type)
+
+
+def select_sql(table):
+    """
+    Returns the query that reads a table as records of its type.
+
+    Args:
+        table (str): One of ``RECORDS``.
+
+    Returns:
+        str: The SQL text.
+    """
+    return f"SELECT {', '.join(RECORDS[table]._fields)} FROM {table}"
+
+
+class IntColumn:
+    """
+    Nullable 64-bit integer column backed by an ``array``.
+    """
+    __slots__ = ('_values', '_nulls')
+
+    def __init__(self):
+        self._values = array('q')
+        self._nulls = bytearray()
+
+    def append(self, value):
+        """Adds a value, which may be None."""
+        self._nulls.append(value is None)
+        self._values.append(0 if value is None else value)
+
+    def __getitem__(self, index):
+        return None if self._nulls[index] else self._values[index]
+
+    def __len__(self):
+        return len(self._values)
+
+    @property
+    def nbytes(self):
+        """int: Bytes used by the column's buffers."""
+        return self._values.itemsize * len(self._values) + len(self._nulls)
+
+
+class TextColumn:
+    """
+    Nullable text column stored as UTF-8 bytes in one buffer plus an offsets ``array``.
+    """
+    __slots__ = ('_data', '_offsets', '_nulls')
+
+    def __init__(self):
+        self._data = bytearray()
+        self._offsets = array('q', [0])
+        self._nulls = bytearray()
+
+    def append(self, value):
+        """Adds a value, which may be None."""
+        self._nulls.append(value is None)
+        if value is not None:
+            self._data += str(value).encode('utf-8')
+        self._offsets.append(len(self._data))
+
+    def __getitem__(self, index):
+        if self._nulls[index]:
+            return None
+        if index < 0:
+            index += len(self._nulls)
+        return self._data[self._offsets[index]:self._offsets[index + 1]].decode('utf-8')
+
+    def __len__(self):
+        return len(self._nulls)
+
+    @property
+    def nbytes(self):
+        """int: Bytes used by the column's buffers."""
+        return len(self._data) + self._offsets.itemsize * len(self._offsets) + len(self._nulls)
+
+
+class ColumnStore:
+    """
+    Rows of one record type kept column by column in typed buffers.
+
+    Values are materialized only when a row is read, as a record of the store's type.
+
+    Attributes
+    ----------
+    record_type : type
+        Record type the rows are returned as, e.g. :class:`Student`.
+    columns : dict
+        Maps each field to its :class:`IntColumn` or :class:`TextColumn`.
+    """
+    __slots__ = ('record_type', 'columns')
+
+    def __init__(self, record_type):
+        """
+        Creates an empty store.
+
+        Args:
+            record_type (type): A record type of this module.
+        """
+        self.record_type = record_type
+        self.columns = {field: IntColumn() if KINDS.get(field) == 'int' else TextColumn()
+                        for field in record_type._fields}
+
+    @classmethod
+    def from_cursor(cls, record_type, cursor, batch_size=10000):
+        """
+        Fills a store from a cursor whose columns match the record type's fields.
+
+        Args:
+            record_type (type): A record type of this module.
+            cursor (sqlite3.Cursor): Cursor over the rows, e.g. from :func:`select_sql`.
+            batch_size (int): Number of rows fetched at a time.
+
+        Returns:
+            ColumnStore: The filled store.
+        """
+        store = cls(record_type)
+        for rows in iter(lambda: cursor.fetchmany(batch_size), []):
+            store.extend(rows)
+        return store
+
+    def append(self, row):
+        """
+        Adds one row.
+
+        Args:
+            row (tuple): Values in field order.
+        """
+        for column, value in zip(self.columns.values(), row):
+            column.append(value)
+
+    def extend(self, rows):
+        """
+        Adds rows.
+
+        Args:
+            rows (Iterable[tuple]): Rows with values in field order.
+        """
+        for row in rows:
+            self.append(row)
+
+    def column(self, field):
+        """
+        Returns one column.
+
+        Args:
+            field (str): Field name.
+
+        Returns:
+            IntColumn | TextColumn: The column; indexable and sized.
+        """
+        return self.columns[field]
+
+    def __getitem__(self, index):
+        return self.record_type._make(column[index] for column in self.columns.values())
+
+    def __iter__(self):
+        return (self[index] for index in range(len(self)))
+
+    def __len__(self):
+        return len(next(iter(self.columns.values())))
+
+    @property
+    def nbytes(self):
+        """int: Bytes used by all column buffers."""
+        return sum(column.nbytes for column in self.columns.values())
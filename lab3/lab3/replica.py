@@ -0,0 +1,171 @@
+"""
+Read-only reporting replica of the school database.
+
+In ``replica`` mode (``--mode replica``) the application does not read the
+primary database file. It reads a snapshot copy next to it
+(``school.db.replica``), made with the SQLite backup API, and opens it with
+``mode=ro&immutable=1``. SQLite then takes no locks and never checks the
+file for changes, so big searches and exports cannot block clerks writing
+to the primary, and clerks cannot slow them down.
+
+A snapshot is refreshed by copying the primary into a temporary file and
+renaming it over the old one. Connections still open on the old snapshot
+keep reading it until they are reopened, so a reader never sees a
+half-written copy. The snapshot's modification time is set to when the copy
+started: its data is at least that recent, and every process sharing the
+replica shows the same "data as of" time.
+
+Snapshots can also be refreshed headlessly, e.g. from cron::
+
+    python replica.py school.db
+"""
+import argparse
+import datetime
+import os
+import sqlite3
+import sys
+import time
+
+import backup
+import statements
+
+DEFAULT_REFRESH_INTERVAL = 300.0
+SUFFIX = '.replica'
+
+
+def replica_path(database):
+    """
+    Returns the path of the snapshot kept for a primary database.
+
+    Args:
+        database (str): File path or ``file:`` URI of the primary database.
+
+    Returns:
+        str: Path of the snapshot file.
+    """
+    if database.startswith('file:'):
+        database = database[len('file:'):].split('?', 1)[0]
+    return database + SUFFIX
+
+
+def refresh(database, path=None, progress=None):
+    """
+    Copies the primary database into its snapshot.
+
+    The primary is read with the backup API in steps, holding only short read locks,
+    and the new snapshot replaces the old one atomically.
+
+    Args:
+        database (str): File path or ``file:`` URI of the primary database.
+        path (str, optional): Snapshot file, defaults to :func:`replica_path`.
+        progress (Callable[[int, int], None] | None): Called after each step with
+            ``(pages_copied, total_pages)``.
+
+    Returns:
+        float: The "data as of" time of the new snapshot, as a Unix timestamp.
+    """
+    path = path or replica_path(database)
+    uri = database if database.startswith('file:') else f'file:{database}'
+    started = time.time()
+    source = sqlite3.connect(uri + ('&' if '?' in uri else '?') + 'mode=ro', uri=True)
+    try:
+        backup.backup_database(source, path, progress=progress)
+    finally:
+        source.close()
+    os.utime(path, (started, started))
+    return started
+
+
+def as_of(path):
+    """
+    Returns when the data of a snapshot was current.
+
+    Args:
+        path (str): Snapshot file.
+
+    Returns:
+        float | None: Unix timestamp, or None if there is no snapshot yet.
+    """
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return None
+
+
+def is_stale(path, interval=DEFAULT_REFRESH_INTERVAL):
+    """
+    Checks whether a snapshot is missing or older than the refresh interval.
+
+    Args:
+        path (str): Snapshot file.
+        interval (float): Refresh interval in seconds.
+
+    Returns:
+        bool: True if the snapshot should be refreshed.
+    """
+    taken = as_of(path)
+    return taken is None or time.time() - taken >= interval
+
+
+def uri(path):
+    """
+    Returns the URI a snapshot is opened with.
+
+    Args:
+        path (str): Snapshot file.
+
+    Returns:
+        str: A read-only, immutable ``file:`` URI.
+    """
+    return f'file:{path}?mode=ro&immutable=1'
+
+
+def connect(path):
+    """
+    Opens a snapshot read-only, without locking.
+
+    Args:
+        path (str): Snapshot file.
+
+    Returns:
+        sqlite3.Connection: The connection.
+    """
+    return sqlite3.connect(uri(path), uri=True, cached_statements=statements.CACHE_SIZE)
+
+
+def describe(timestamp):
+    """
+    Formats a "data as of" time for display.
+
+    Args:
+        timestamp (float | None): Unix timestamp from :func:`as_of`.
+
+    Returns:
+        str: e.g. ``"Reporting replica, data as of 2024-05-01 14:05:09"``.
+    """
+    if timestamp is None:
+        return 'Reporting replica, no snapshot yet'
+    return f'Reporting replica, data as of {datetime.datetime.fromtimestamp(timestamp):%Y-%m-%d %H:%M:%S}'
+
+
+def main(argv=None):
+    """
+    Command line entry point.
+
+    Args:
+        argv (list[str] | None): Arguments, defaults to ``sys.argv[1:]``.
+
+    Returns:
+        int: Process exit status.
+    """
+    parser = argparse.ArgumentParser(description='Refresh the reporting replica of a database')
+    parser.add_argument('database', help='primary database file')
+    parser.add_argument('--replica', help='snapshot file (default <database>.replica)')
+    args = parser.parse_args(argv)
+    taken = refresh(args.database, args.replica)
+    print(describe(taken))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
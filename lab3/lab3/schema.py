@@ -0,0 +1,162 @@
+"""
+Tables of the school database and the migrations that bring a database to the current schema.
+
+The schema version is ``PRAGMA user_version`` (see migrations.py). Versions 1
+to 9 were created by ``initialize`` in one go before migrations existed; they
+are one migration that brings any older database to version 9. Later changes
+are new entries at the end of ``MIGRATIONS``; never edit one that shipped::
+
+    python schema.py school.db --status
+    python schema.py school.db                  # apply pending migrations
+"""
+import argparse
+import functools
+import sqlite3
+import sys
+
+import changelog
+import compaction
+import concurrency
+import dedup
+import enrollment
+import listing
+import migrations
+
+TABLES = ('students', 'instructors', 'courses', 'registrations')
+
+
+def _create_tables(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS students (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            age INTEGER NOT NULL,
+            email TEXT NOT NULL,
+            student_id TEXT NOT NULL
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS instructors (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            age INTEGER NOT NULL,
+            email TEXT NOT NULL,
+            instructor_id TEXT NOT NULL
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS courses (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            course_name TEXT NOT NULL,
+            course_id TEXT NOT NULL,
+            instructor_id TEXT NOT NULL,
+            FOREIGN KEY(instructor_id) REFERENCES instructors(instructor_id)
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS registrations (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            student_id TEXT NOT NULL,
+            course_id TEXT NOT NULL,
+            FOREIGN KEY(student_id) REFERENCES students(student_id),
+            FOREIGN KEY(course_id) REFERENCES courses(course_id)
+        )
+    """)
+
+
+def _install(conn):
+    concurrency.install(conn)
+    compaction.install(conn)
+    listing.install(conn)
+    enrollment.install(conn)
+    # Last, so the capture triggers' payloads include every column added above.
+    changelog.install(conn, TABLES)
+
+
+MIGRATIONS = (
+    migrations.Migration(9, 'tables, change capture, duplicate keys, listing indexes, registration rules, '
+                            'row versions and soft deletes', (
+        migrations.Run('create the tables', _create_tables),
+        migrations.Run('add the duplicate detection keys', functools.partial(dedup.install, refresh=False)),
+        *(migrations.Backfill(table, ('email_key', 'name_key'), ('name', 'email'), dedup.keys,
+                              where='email_key IS NULL OR name_key IS NULL')
+          for table in dedup.TABLES),
+        migrations.Run('add listing, registration rules, versions, tombstones and change capture', _install),
+    )),
+    # The NOCASE listing indexes cannot serve the exact lookups of edits, deletes and
+    # registrations; courses.course_id already has enrollment's idx_courses_course_id.
+    migrations.Migration(10, 'index exact business id and name lookups', (
+        migrations.CreateIndex('idx_students_live_key', 'students', 'student_id', where='deleted_at IS NULL'),
+        migrations.CreateIndex('idx_instructors_live_key', 'instructors', 'instructor_id', where='deleted_at IS NULL'),
+        migrations.CreateIndex('idx_students_live_exact_name', 'students', 'name', where='deleted_at IS NULL'),
+        migrations.CreateIndex('idx_courses_live_exact_name', 'courses', 'course_name', where='deleted_at IS NULL'),
+    ), online=True),
+)
+
+SCHEMA_VERSION = MIGRATIONS[-1].version
+
+
+def initialize(conn, online=True, progress=None, lock_budget=migrations.LOCK_BUDGET):
+    """
+    Brings a database to the current schema, creating the students, instructors, courses,
+    and registrations tables if they do not already exist.
+
+    Databases whose ``PRAGMA user_version`` is already ``SCHEMA_VERSION`` are left untouched,
+    so opening an up-to-date database costs a single PRAGMA. New databases use
+    incremental auto-vacuum so purged space can be returned to the file system.
+
+    Args:
+        conn (sqlite3.Connection): Connection to the database, with no transaction open.
+        online (bool): Also apply the ``online`` migrations; False leaves them for a
+            later call, e.g. in a background job.
+        progress (Callable[[int, int], None] | None): Passed to :func:`migrations.migrate`.
+        lock_budget (float | None): Passed to :func:`migrations.migrate`.
+
+    Returns:
+        bool: True if the schema was created or updated.
+    """
+    if migrations.version(conn) >= SCHEMA_VERSION:
+        return False
+    # Only takes effect before the first table is created.
+    conn.execute('PRAGMA auto_vacuum = INCREMENTAL')
+    target = None if online else migrations.required(conn, MIGRATIONS)
+    return bool(migrations.migrate(conn, MIGRATIONS, target, progress, lock_budget))
+
+
+def _print_progress(done, total):
+    print(f'\r  {done:,}/{total:,}', end='', flush=True)
+
+
+def main(argv=None):
+    """
+    Command line entry point.
+
+    Args:
+        argv (list[str] | None): Arguments, defaults to ``sys.argv[1:]``.
+
+    Returns:
+        int: Process exit status.
+    """
+    parser = argparse.ArgumentParser(description='Show or apply the schema migrations of the school database')
+    parser.add_argument('database')
+    parser.add_argument('--status', action='store_true', help='only list the migrations and their state')
+    parser.add_argument('--maintenance', action='store_true',
+                        help='build indexes however long they hold the write lock, blocking writers')
+    args = parser.parse_args(argv)
+
+    conn = sqlite3.connect(args.database)
+    try:
+        if not args.status:
+            before = migrations.version(conn)
+            lock_budget = None if args.maintenance else migrations.LOCK_BUDGET
+            if initialize(conn, progress=_print_progress, lock_budget=lock_budget):
+                print(f'\nmigrated from version {before} to {migrations.version(conn)}')
+        for migration, state in migrations.status(conn, MIGRATIONS):
+            print(f'{migration.version:4}  {migration.description}\n      {state}')
+    finally:
+        conn.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
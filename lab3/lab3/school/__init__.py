@@ -0,0 +1,30 @@
+"""
+The School Management System application.
+
+``school.core`` holds the data operations of the handlers and imports no GUI
+code, so headless tools and scripts load it in milliseconds.
+``school.gui`` is the Tk window. It is only imported when the window is
+started, or when one of its names is first looked up on the package::
+
+    python -m school --db school.db         # start the application
+    from school import core                 # data operations only
+    from school import DatabaseApp          # imports Tk
+
+The modules in the directory above (schema, listing, exporter, ...) must be
+importable, e.g. by running from that directory.
+"""
+import time
+
+# Start of the time-to-first-paint measurement of ``--startup-time``.
+STARTED_AT = time.perf_counter()
+
+_GUI_NAMES = ('DatabaseApp', 'JobPanel', 'StatusBar')
+
+__all__ = ['STARTED_AT', *_GUI_NAMES]
+
+
+def __getattr__(name):
+    if name in _GUI_NAMES:
+        from . import gui
+        return getattr(gui, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,40 @@
+"""
+Starts the School Management System: ``python -m school [options]``.
+
+The flags are parsed before the GUI is imported, so ``--help`` and flag
+errors do not wait for Tk.
+"""
+import argparse
+import sys
+
+import dbconfig
+
+
+def main(argv=None):
+    """
+    Command line entry point.
+
+    Args:
+        argv (list[str] | None): Arguments, defaults to ``sys.argv[1:]``.
+
+    Returns:
+        int: Process exit status.
+    """
+    parser = argparse.ArgumentParser(prog='python -m school', description='School Management System')
+    dbconfig.add_arguments(parser)
+    parser.add_argument('--startup-time', action='store_true', help='print the time to first paint and exit')
+    parser.add_argument('--handler-latency', type=int, default=0, metavar='N',
+                        help='time N Add Student calls and exit (use with --mode memory)')
+    parser.add_argument('--memory-profile', metavar='FILE',
+                        help='write allocations, widget counts and top allocation sites of every handler call to FILE')
+    args = parser.parse_args(argv)
+
+    from . import gui
+    app = gui.DatabaseApp(dbconfig.from_args(args), report_startup=args.startup_time,
+                          handler_latency=args.handler_latency, memory_profile=args.memory_profile)
+    app.mainloop()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,168 @@
+"""
+Data operations behind the application's handlers, without any GUI.
+
+Every function takes a connection and plain values, so scripts, tests and
+headless tools add, register and delete records exactly like the window
+does without importing Tk::
+
+    from school import core
+
+    core.add_student(conn, 'Ann Lee', 20, 'ann@example.org', 'S1')
+    conn.commit()
+
+Only the data modules these functions need are imported here; the import is
+timed by ``python bench.py startup``, which also fails if it pulls in
+``tkinter``.
+"""
+import concurrency
+import dedup
+import enrollment
+import records
+import statements
+
+
+def parse_course_inputs(capacity, prerequisites):
+    """
+    Parses the optional fields of the Add Course form.
+
+    Args:
+        capacity (str): Maximum number of students, or blank for no limit.
+        prerequisites (str): Comma separated course IDs, possibly blank.
+
+    Returns:
+        tuple[int | None, list[str]]: The capacity and the prerequisite course IDs.
+
+    Raises:
+        ValueError: If the capacity is not a number.
+    """
+    capacity = capacity.strip()
+    return (int(capacity) if capacity else None,
+            [value.strip() for value in prerequisites.split(',') if value.strip()])
+
+
+def add_student(conn, name, age, email, student_id):
+    """
+    Inserts a student with its duplicate detection keys. Does not commit.
+
+    Args:
+        conn (sqlite3.Connection): Connection to the database.
+        name (str): Full name.
+        age (int): Age in years.
+        email (str): Email address.
+        student_id (str): Business identifier.
+    """
+    conn.execute(statements.sql('students.insert'), (name, age, email, student_id, *dedup.keys(name, email)))
+
+
+def add_instructor(conn, name, age, email, instructor_id):
+    """
+    Inserts an instructor with its duplicate detection keys. Does not commit.
+
+    Args:
+        conn (sqlite3.Connection): Connection to the database.
+        name (str): Full name.
+        age (int): Age in years.
+        email (str): Email address.
+        instructor_id (str): Business identifier.
+    """
+    conn.execute(statements.sql('instructors.insert'), (name, age, email, instructor_id, *dedup.keys(name, email)))
+
+
+def add_course(conn, course_id, course_name, instructor_id, capacity=None, prerequisites=()):
+    """
+    Inserts a course and its prerequisites. Does not commit.
+
+    Args:
+        conn (sqlite3.Connection): Connection to the database.
+        course_id (str): Business identifier.
+        course_name (str): Name of the course.
+        instructor_id (str): Business identifier of the teaching instructor.
+        capacity (int | None): Maximum number of students, or None for no limit.
+        prerequisites (Iterable[str]): Course IDs that must be taken first.
+    """
+    conn.execute(statements.sql('courses.insert'), (course_id, course_name, instructor_id, capacity))
+    enrollment.add_prerequisites(conn, course_id, prerequisites)
+
+
+def dropdown_names(conn):
+    """
+    Returns the names offered in the Register for Course tab.
+
+    Args:
+        conn (sqlite3.Connection): Connection to the database.
+
+    Returns:
+        tuple[list[str], list[str]]: Student names and course names.
+    """
+    return ([row[0] for row in conn.execute(statements.sql('students.names'))],
+            [row[0] for row in conn.execute(statements.sql('courses.names'))])
+
+
+def register(conn, student_name, course_name, schema='main', history='registrations'):
+    """
+    Registers a student for a course, both picked by name. Commits.
+
+    Args:
+        conn (sqlite3.Connection): Connection to the database, with no transaction open.
+        student_name (str): Name of the student.
+        course_name (str): Name of the course.
+        schema (str): Database the registration is written to; the current term's
+            (``partitions.TermPartitions.schema``) when terms are configured.
+        history (str): Table or view holding every registration, used for prerequisites.
+
+    Raises:
+        LookupError: If there is no student or course with that name.
+        enrollment.RegistrationError: If the registration breaks a registration rule.
+    """
+    student = conn.execute(statements.sql('students.id_by_name'), (student_name,)).fetchone()
+    if student is None:
+        raise LookupError(f"No student named '{student_name}'")
+    course = conn.execute(statements.sql('courses.id_by_name'), (course_name,)).fetchone()
+    if course is None:
+        raise LookupError(f"No course named '{course_name}'")
+    enrollment.register(conn, student[0], course[0], schema, history)
+
+
+def resolve(conn, row):
+    """
+    Finds the database row of a View All item that was not read from the database,
+    e.g. one loaded from a CSV file, by its business id.
+
+    Args:
+        conn (sqlite3.Connection): Connection to the database.
+        row (records.ListingRow): The item's row.
+
+    Returns:
+        records.ListingRow: The row with its current row id and version; ``row`` itself
+        if it already has a row id.
+
+    Raises:
+        LookupError: If no live row, or more than one, has the business id.
+    """
+    if row.row_id is not None:
+        return row
+    found = conn.execute(statements.sql(f'{row.entity.table}.by_entity_id'), (row.entity_id,)).fetchall()
+    if not found:
+        raise LookupError(f"There is no {row.type} with the ID '{row.entity_id}' in the database.")
+    if len(found) > 1:
+        raise LookupError(f"Several {row.type}s have the ID '{row.entity_id}'; "
+                          "edit or delete it from the listing instead.")
+    return records.ListingRow._make(found[0])
+
+
+def delete(conn, row):
+    """
+    Marks a student, instructor or course deleted if no one changed it since it was read.
+    Does not commit.
+
+    Only the row itself is deleted, even if other rows share its business id. It stays
+    as a tombstone until the compaction job purges it (see compaction.py).
+
+    Args:
+        conn (sqlite3.Connection): Connection to the database.
+        row (records.ListingRow): The row as shown in the View All table, with its version.
+
+    Raises:
+        concurrency.EditConflict: If the row was changed or deleted since it was read.
+    """
+    concurrency.delete(conn, row)
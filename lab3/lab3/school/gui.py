@@ -0,0 +1,1393 @@
+"""
+The Tk window of the School Management System.
+
+Started with ``python -m school``. Dialog modules and ``csv`` are imported by
+the handlers that use them, so they cost nothing until a dialog is opened.
+The data operations of the handlers are in :mod:`school.core`.
+"""
+import tkinter as tk
+from tkinter import ttk
+from tkinter import messagebox
+import sqlite3
+import sys
+import time
+import collections
+import io
+import itertools
+import os
+import columnar
+import backup
+import dbconfig
+import schema
+import partitions
+import dedup
+import enrollment
+import listing
+import records
+import jobs
+import querycache
+import memprofile
+import replica
+import concurrency
+import compaction
+import migrations
+import exporter
+import searchengine
+
+from . import STARTED_AT, core
+
+# Milliseconds between checks for rows other users changed in the View All table.
+CHANGE_POLL_INTERVAL = 2000
+EXPORT_FILETYPES = [(f'{writer.format.upper()} Files', '*' + writer.suffix) for writer in exporter.WRITERS.values()]
+
+
+class JobPanel(ttk.Frame):
+    """
+    Status strip showing the progress of background jobs.
+
+    Polls the job queue from the Tk loop, runs the callbacks jobs posted and
+    shows the oldest running job with a progress bar, its rate and ETA, and a
+    Cancel button. When idle it shows how the last job ended.
+
+    Attributes
+    ----------
+    jobs : jobs.JobQueue
+        The queue whose jobs are shown.
+    """
+    def __init__(self, master, job_queue, interval=100):
+        """
+        Args:
+            master (tk.Widget): Parent widget.
+            job_queue (jobs.JobQueue): The queue whose jobs are shown.
+            interval (int): Milliseconds between polls.
+        """
+        super().__init__(master)
+        self.jobs = job_queue
+        self.interval = interval
+        self.progress_bar = ttk.Progressbar(self, length=150, maximum=1.0)
+        self.progress_bar.pack(side='left', padx=5, pady=2)
+        self.status_label = tk.Label(self, anchor='w')
+        self.status_label.pack(side='left', fill='x', expand=True)
+        self.cancel_button = tk.Button(self, text='Cancel', command=self.cancel, state='disabled')
+        self.cancel_button.pack(side='right', padx=5)
+        self.after(self.interval, self.poll)
+
+    def current(self):
+        """
+        Returns the job the panel shows.
+
+        Returns:
+            jobs.Job | None: The oldest running job, else the oldest queued job.
+        """
+        active = self.jobs.running or self.jobs.queued
+        return active[0] if active else None
+
+    def cancel(self):
+        """
+        Cancels the job the panel shows.
+        """
+        job = self.current()
+        if job:
+            job.cancel()
+
+    def poll(self):
+        """
+        Runs posted job callbacks and redraws the panel, then schedules the next poll.
+        """
+        try:
+            self.jobs.dispatch()
+        finally:
+            self.show(self.current())
+            self.after(self.interval, self.poll)
+
+    def show(self, job):
+        """
+        Shows a job's progress, or the outcome of the last job when ``job`` is None.
+
+        Args:
+            job (jobs.Job | None): The job to show.
+        """
+        if job is None:
+            last = self.jobs.last_finished
+            self.progress_bar['value'] = 1.0 if last and last.state == jobs.DONE else 0.0
+            self.status_label.config(text=last.describe() if last else '')
+            self.cancel_button.config(state='disabled')
+            return
+        self.progress_bar['value'] = job.fraction or 0.0
+        text = job.describe()
+        waiting = len(self.jobs.queued) - (job.state == jobs.QUEUED)
+        if waiting:
+            text += f' (+{waiting} queued)'
+        self.status_label.config(text=text)
+        self.cancel_button.config(state='disabled' if job.cancelled else 'normal')
+
+
+class StatusBar(ttk.Frame):
+    """
+    In-window notification area replacing per-action popup windows.
+
+    Shows one message at a time and clears it after a delay. The most recent
+    messages are kept in a capped history, listed by the History button. Every
+    notification reuses the same widgets, so nothing accumulates however many
+    are shown.
+
+    Attributes
+    ----------
+    history : collections.deque
+        ``(time, text)`` of the most recent notifications, oldest first.
+    """
+    LEVELS = {'info': '#dff0d8', 'warning': '#fcf8e3', 'error': '#f2dede'}
+
+    def __init__(self, master, dismiss_after=4000, history_size=50):
+        """
+        Args:
+            master (tk.Widget): Parent widget.
+            dismiss_after (int): Milliseconds a notification stays visible.
+            history_size (int): Number of notifications kept in the history.
+        """
+        super().__init__(master)
+        self.dismiss_after = dismiss_after
+        self.history = collections.deque(maxlen=history_size)
+        self._dismiss_id = None
+        self.message_label = tk.Label(self, anchor='w', padx=5)
+        self.message_label.pack(side='left', fill='x', expand=True)
+        self.default_background = self.message_label.cget('background')
+        self.history_button = tk.Menubutton(self, text='History', relief='raised')
+        self.history_menu = tk.Menu(self.history_button, tearoff=False, postcommand=self.fill_history)
+        self.history_button['menu'] = self.history_menu
+        self.history_button.pack(side='right', padx=5)
+
+    def notify(self, text, level='info'):
+        """
+        Shows a message and schedules it to be cleared.
+
+        Args:
+            text (str): The message.
+            level (str): One of ``LEVELS``; selects the background colour.
+        """
+        self.history.append((time.strftime('%H:%M:%S'), str(text)))
+        self.message_label.config(text=text, background=self.LEVELS.get(level, self.default_background))
+        if self._dismiss_id is not None:
+            self.after_cancel(self._dismiss_id)
+        self._dismiss_id = self.after(self.dismiss_after, self.clear)
+
+    def clear(self):
+        """
+        Clears the current message.
+        """
+        self._dismiss_id = None
+        self.message_label.config(text='', background=self.default_background)
+
+    def fill_history(self):
+        """
+        Lists the history, newest first, in the History menu.
+        """
+        self.history_menu.delete(0, 'end')
+        if not self.history:
+            self.history_menu.add_command(label='No notifications', state='disabled')
+        for at, text in reversed(self.history):
+            self.history_menu.add_command(label=f'{at}  {text}')
+
+
+class DatabaseApp(tk.Tk):
+    """
+    A class representing the School Management System application, 
+    built using Tkinter and SQLite3 for database handling.
+
+    Attributes
+    ----------
+    db_config : dbconfig.DatabaseConfig
+        Location and connection mode of the database.
+    tabs : ttk.Notebook
+        Tabbed interface for managing students, instructors, courses, and registration.
+    built_tabs : set of str
+        Widget path names of tabs whose widgets have been created. Tabs are built on first selection.
+    db_connection : sqlite3.Connection
+        The SQLite connection object.
+    partitions : partitions.TermPartitions or None
+        Per-term registration files, when a current term is configured.
+    cursor : sqlite3.Cursor
+        The SQLite cursor object.
+    query_cache : querycache.QueryCache
+        Results of View All pages and searches, reused while the tables are unchanged.
+    search_engine : searchengine.SearchEngine | None
+        Ranked parallel search, started with the first search.
+    jobs : jobs.JobQueue
+        Background jobs for long operations, shown in the job panel.
+    status_bar : StatusBar
+        Notification area for the outcome of actions.
+    memory_profiler : memprofile.MemoryProfiler | None
+        Records memory use around handler calls when profiling is enabled.
+    replica_label : ttk.Label | None
+        Shows how recent the data is in reporting replica mode.
+    """
+    def __init__(self, config=None, report_startup=False, handler_latency=0, memory_profile=None):
+        """
+        Initializes the main window of the School Management System.
+        Sets up the UI tabs and database connection. Only the initially selected
+        tab is built here; the others are built the first time they are selected.
+
+        Args:
+            config (dbconfig.DatabaseConfig, optional): Database location and mode.
+                Defaults to the configuration resolved from flags, environment and config file.
+            report_startup (bool, optional): Print the time to first paint and close the window.
+            handler_latency (int, optional): Time this many Add Student calls, print the
+                latency and close the window.
+            memory_profile (str, optional): File to write a memory profile of every handler call to.
+        """
+        super().__init__()
+        self.memory_profiler = None
+        if memory_profile:
+            self.memory_profiler = memprofile.MemoryProfiler(memory_profile)
+            self.memory_profiler.instrument(self)
+        self.title('School Management System')
+        self.geometry('600x400')
+        self.db_config = config or dbconfig.load()
+        self.db_connection = None
+        self.cursor = None
+        self.query_cache = None
+        self.search_engine = None
+        self.partitions = None
+        self.initialize_database()
+        self.jobs = jobs.JobQueue()
+        self.job_panel = JobPanel(self, self.jobs)
+        self.job_panel.pack(side='bottom', fill='x')
+        self.status_bar = StatusBar(self)
+        self.status_bar.pack(side='bottom', fill='x')
+        self.replica_label = None
+        if self.db_config.mode == 'replica':
+            self.replica_label = ttk.Label(self, anchor='w', padding=(5, 0))
+            self.replica_label.pack(side='bottom', fill='x')
+            self.schedule_replica_refresh()
+        if not self.db_config.is_read_only:
+            self.migrate_database()
+            self.after(compaction.COMPACTION_INTERVAL * 1000, self.compact_database)
+        self.protocol('WM_DELETE_WINDOW', self.on_close)
+        self.tabs = ttk.Notebook(self)
+        self.tabs.pack(expand=1, fill='both')
+    
+        self.add_student_tab = ttk.Frame(self.tabs)
+        self.add_instructor_tab = ttk.Frame(self.tabs)
+        self.add_course_tab = ttk.Frame(self.tabs)
+        self.register_course_tab = ttk.Frame(self.tabs)
+        self.view_all_tab = ttk.Frame(self.tabs)
+        
+        self.tabs.add(self.add_student_tab, text='Add stdnt')
+        self.tabs.add(self.add_instructor_tab, text='Add instrctr')
+        self.tabs.add(self.add_course_tab, text='Add Course')
+        self.tabs.add(self.register_course_tab, text='Register for Course')
+        self.tabs.add(self.view_all_tab, text='View All')
+
+        self.tab_builders = {
+            str(self.add_student_tab): self.create_add_student_widgets,
+            str(self.add_instructor_tab): self.create_add_instructor_widgets,
+            str(self.add_course_tab): self.create_add_course_widgets,
+            str(self.register_course_tab): self.create_register_course_widgets,
+            str(self.view_all_tab): self.create_view_all_widgets,
+        }
+        self.built_tabs = set()
+        self.tabs.bind('<<NotebookTabChanged>>', self.on_tab_changed)
+        self.on_tab_changed()
+
+        if report_startup:
+            self.after_idle(self.report_startup_time)
+        elif handler_latency:
+            self.after_idle(self.report_handler_latency, handler_latency)
+
+    def on_tab_changed(self, event=None):
+        """
+        Builds the widgets of the selected tab the first time it is shown.
+
+        Args:
+            event (Event, optional): The ``<<NotebookTabChanged>>`` event.
+        """
+        tab = self.tabs.select()
+        if tab and tab not in self.built_tabs:
+            self.built_tabs.add(tab)
+            self.tab_builders[tab]()
+
+    def on_close(self):
+        """
+        Closes the application, asking first if background jobs are still running.
+        """
+        if self.jobs.jobs:
+            if not messagebox.askyesno("Jobs Running", "Background jobs are still running. Cancel them and quit?"):
+                return
+            self.jobs.cancel_all()
+        if self.memory_profiler:
+            self.memory_profiler.close()
+        if self.search_engine:
+            self.search_engine.close()
+        self.destroy()
+
+    def is_tab_built(self, tab):
+        """
+        Checks whether a tab's widgets have been created.
+
+        Args:
+            tab (ttk.Frame): The tab frame.
+
+        Returns:
+            bool: True if the tab has been built.
+        """
+        return str(tab) in self.built_tabs
+
+    def report_startup_time(self):
+        """
+        Prints the time from module import to the first idle loop after the window
+        is drawn, then closes the application.
+        """
+        self.update_idletasks()
+        print(f'startup: {(time.perf_counter() - STARTED_AT) * 1000:.1f} ms to first paint', file=sys.stderr)
+        self.destroy()
+
+    def report_handler_latency(self, count):
+        """
+        Adds generated students through the Add Student handler, prints the latency per
+        call including the redraw it causes, then closes the application.
+
+        The students are written to the configured database, so use it with ``--mode memory``.
+
+        Args:
+            count (int): Number of students to add.
+        """
+        self.tabs.select(self.add_student_tab)
+        self.on_tab_changed()
+        latencies = []
+        for i in range(count):
+            self.clear_student_inputs()
+            self.student_name.insert(0, f'Latency Student {i}')
+            self.student_age.insert(0, '20')
+            self.student_email.insert(0, f'latency{i}@{time.time_ns()}.test')
+            self.student_id.insert(0, f'L{i}')
+            start = time.perf_counter()
+            self.add_student()
+            self.update_idletasks()
+            latencies.append((time.perf_counter() - start) * 1000)
+        latencies.sort()
+        print(f'add_student: median {latencies[len(latencies) // 2]:.2f} ms, '
+              f'p95 {latencies[int(len(latencies) * 0.95)]:.2f} ms, max {latencies[-1]:.2f} ms, '
+              f'{len(self.winfo_children())} top-level widgets', file=sys.stderr)
+        self.destroy()
+
+    def schedule_replica_refresh(self):
+        """
+        Shows the "data as of" time of the replica and schedules its next refresh for when
+        it becomes older than the refresh interval.
+        """
+        taken = replica.as_of(self.db_config.replica_path)
+        self.replica_label.config(text=replica.describe(taken))
+        delay = 0 if taken is None else max(taken + self.db_config.refresh_interval - time.time(), 0)
+        self.after(int(delay * 1000), self.refresh_replica)
+
+    def refresh_replica(self):
+        """
+        Copies the primary database into a new replica snapshot in a background job, then
+        reopens the connection on it and refreshes the dropdowns and the listing.
+        """
+        def run(job):
+            return replica.refresh(self.db_config.database, self.db_config.replica_path, progress=job.progress)
+
+        def refreshed(job):
+            if self.db_connection:
+                self.db_connection.close()
+                self.db_connection = None
+            if self.search_engine:
+                self.search_engine.close()
+                self.search_engine = None
+            self.get_db_connection()
+            self.refresh_dropdowns()
+            if self.is_tab_built(self.view_all_tab) and self.listing_active:
+                self.show_page()
+            self.schedule_replica_refresh()
+
+        def failed(job):
+            self.report_job(job)
+            self.after(int(self.db_config.refresh_interval * 1000), self.refresh_replica)
+
+        self.jobs.submit('Refresh replica', run, unit='pages', on_done=refreshed, on_error=failed)
+
+    def compact_database(self):
+        """
+        Purges old tombstones of deleted records and releases the freed pages in a
+        background job, and schedules the next run.
+        """
+        def run(job):
+            conn = self.db_config.connect()
+            try:
+                return compaction.compact(conn, progress=job.progress)
+            finally:
+                conn.close()
+
+        def compacted(job):
+            purged, released = job.result
+            if purged or released:
+                self.status_bar.notify(f'Compaction: purged {purged} deleted records, released {released} pages')
+
+        self.jobs.submit('Compaction', run, unit='rows', on_done=compacted, on_error=self.report_job)
+        self.after(compaction.COMPACTION_INTERVAL * 1000, self.compact_database)
+
+    def get_db_connection(self):
+        """
+        Gets or creates a database connection.
+
+        When a current term is configured, the per-term registration files are
+        attached to a new connection.
+
+        Returns
+        -------
+        sqlite3.Connection
+            The connection object to the SQLite database.
+        """
+        if not self.db_connection:
+            self.db_connection = self.db_config.connect()
+            self.cursor = self.db_connection.cursor()
+            self.query_cache = querycache.QueryCache(self.db_connection)
+            if self.db_config.term and not self.db_config.is_read_only:
+                schema.initialize(self.db_connection, online=False)
+                self.partitions = partitions.TermPartitions(self.db_connection, self.db_config.terms_dir, self.db_config.term)
+        return self.db_connection
+
+    def initialize_database(self):
+        """
+        Initializes the database with the necessary tables if they do not already exist.
+        Creates tables for students, instructors, courses, and registrations.
+        Read-only databases and databases already at ``schema.SCHEMA_VERSION`` are opened as they are.
+        Online migrations are left to :meth:`migrate_database`.
+        """
+        conn = self.get_db_connection()
+        if self.db_config.is_read_only:
+            return
+        schema.initialize(conn, online=False)
+        self.query_cache.clear()
+
+    def migrate_database(self):
+        """
+        Applies the pending online schema migrations, which only speed up queries, in a
+        background job. The database is usable meanwhile; an interrupted migration resumes
+        on the next start.
+        """
+        if not migrations.pending(self.get_db_connection(), schema.MIGRATIONS):
+            return
+
+        def run(job):
+            conn = self.db_config.connect()
+            try:
+                return schema.initialize(conn, progress=job.progress)
+            finally:
+                conn.close()
+
+        def migrated(job):
+            self.status_bar.notify(f'Database schema updated to version {schema.SCHEMA_VERSION}')
+
+        self.jobs.submit('Schema migration', run, unit='rows', on_done=migrated, on_error=self.report_job)
+
+    def create_add_student_widgets(self):
+        """
+        Creates and packs the widgets for the 'Add Student' tab, 
+        including input fields for name, age, email, and student ID.
+        """
+        tk.Label(self.add_student_tab, text="Name:").pack()
+        self.student_name = tk.Entry(self.add_student_tab)
+        self.student_name.pack()
+
+        tk.Label(self.add_student_tab, text="Age:").pack()
+        self.student_age = tk.Entry(self.add_student_tab)
+        self.student_age.pack()
+
+        tk.Label(self.add_student_tab, text="Email:").pack()
+        self.student_email = tk.Entry(self.add_student_tab)
+        self.student_email.pack()
+
+        tk.Label(self.add_student_tab, text="Student ID:").pack()
+        self.student_id = tk.Entry(self.add_student_tab)
+        self.student_id.pack()
+
+        tk.Button(self.add_student_tab, text='Add Student', command=self.add_student).pack()
+
+    def create_add_instructor_widgets(self):
+        """
+        Creates and packs the widgets for the 'Add Instructor' tab, 
+        including input fields for name, age, email, and instructor ID.
+        """
+        tk.Label(self.add_instructor_tab, text='Name:').pack()
+        self.instructor_name = tk.Entry(self.add_instructor_tab)
+        self.instructor_name.pack()
+
+        tk.Label(self.add_instructor_tab, text='Age:').pack()
+        self.instructor_age = tk.Entry(self.add_instructor_tab)
+        self.instructor_age.pack()
+
+        tk.Label(self.add_instructor_tab, text='Email:').pack()
+        self.instructor_email = tk.Entry(self.add_instructor_tab)
+        self.instructor_email.pack()
+
+        tk.Label(self.add_instructor_tab, text='Instructor ID:').pack()
+        self.instructor_id = tk.Entry(self.add_instructor_tab)
+        self.instructor_id.pack()
+
+        tk.Button(self.add_instructor_tab, text='Add Instructor', command=self.add_instructor).pack()
+
+    def create_add_course_widgets(self):
+        """
+        Creates and packs the widgets for the 'Add Course' tab, 
+        including input fields for course ID, course name, instructor ID, capacity and prerequisites.
+        """
+        tk.Label(self.add_course_tab, text='Course ID:').pack()
+        self.course_id = tk.Entry(self.add_course_tab)
+        self.course_id.pack()
+
+        tk.Label(self.add_course_tab, text='Course Name:').pack()
+        self.course_name = tk.Entry(self.add_course_tab)
+        self.course_name.pack()
+
+        tk.Label(self.add_course_tab, text='Instructor ID:').pack()
+        self.instructor_id_course = tk.Entry(self.add_course_tab)
+        self.instructor_id_course.pack()
+
+        tk.Label(self.add_course_tab, text='Capacity (blank for unlimited):').pack()
+        self.course_capacity = tk.Entry(self.add_course_tab)
+        self.course_capacity.pack()
+
+        tk.Label(self.add_course_tab, text='Prerequisite course IDs (comma separated):').pack()
+        self.course_prerequisites = tk.Entry(self.add_course_tab)
+        self.course_prerequisites.pack()
+
+        tk.Button(self.add_course_tab, text='Add Course', command=self.add_course).pack()
+
+    def create_register_course_widgets(self):
+        """
+        Creates and packs the widgets for the 'Register for Course' tab, 
+        including dropdowns for selecting a student and a course.
+        """
+        tk.Label(self.register_course_tab, text='Select Student:').pack()
+        self.student_dropdown = ttk.Combobox(self.register_course_tab)
+        self.student_dropdown.pack()
+
+        tk.Label(self.register_course_tab, text='Select Course:').pack()
+        self.course_dropdown = ttk.Combobox(self.register_course_tab)
+        self.course_dropdown.pack()
+
+        tk.Button(self.register_course_tab, text='Register', command=self.register_course).pack()
+        self.refresh_dropdowns()
+
+    def create_view_all_widgets(self):
+        """
+        Creates and packs the widgets for the 'View All' tab, 
+        including a table to display all students, instructors, and courses.
+        Clicking a column heading sorts by that column; the entries above the
+        table filter each column by prefix.
+        """
+        self.sort_column = 'Name'
+        self.sort_descending = False
+        self.page_starts = [None]
+        self.has_next_page = False
+        self.listing_active = False
+        # Version of every row in the table when it was read, checked when it is edited.
+        self.row_versions = {}
+        self.change_poller = None
+
+        filter_frame = tk.Frame(self.view_all_tab)
+        filter_frame.pack(fill='x')
+        self.filter_entries = {}
+        for column in listing.COLUMNS:
+            tk.Label(filter_frame, text=f'{column}:').pack(side='left')
+            entry = tk.Entry(filter_frame, width=12)
+            entry.pack(side='left')
+            entry.bind('<Return>', self.apply_filters)
+            self.filter_entries[column] = entry
+        tk.Button(filter_frame, text='Filter', command=self.apply_filters).pack(side='left')
+
+        self.view_all_table = ttk.Treeview(self.view_all_tab, columns=listing.COLUMNS, show='headings')
+        for column in listing.COLUMNS:
+            self.view_all_table.heading(column, text=column, command=lambda column=column: self.sort_by(column))
+        self.view_all_table.pack(expand=1, fill='both')
+
+        page_frame = tk.Frame(self.view_all_tab)
+        page_frame.pack()
+        tk.Button(page_frame, text='< Prev', command=self.previous_page).pack(side='left')
+        self.page_label = tk.Label(page_frame, text='')
+        self.page_label.pack(side='left', padx=10)
+        tk.Button(page_frame, text='Next >', command=self.next_page).pack(side='left')
+
+        # Bind double-click event to the edit function
+        self.view_all_table.bind('<Double-1>', self.edit)
+
+        tk.Button(self.view_all_tab, text='Refresh', command=self.refresh_view_all).pack()
+        tk.Button(self.view_all_tab, text='Export...', command=self.export_view).pack()
+        tk.Button(self.view_all_tab, text='Export Tables', command=self.export_tables).pack()
+        tk.Button(self.view_all_tab, text='Load', command=self.load).pack()
+        tk.Button(self.view_all_tab, text='Export Snapshot', command=self.export_snapshot).pack()
+        tk.Button(self.view_all_tab, text='Load Snapshot', command=self.load_snapshot).pack()
+        tk.Button(self.view_all_tab, text='Backup', command=self.backup_database).pack()
+        tk.Button(self.view_all_tab, text='Restore', command=self.restore_database).pack()
+        self.search_entry = tk.Entry(self.view_all_tab)
+        self.search_entry.pack(pady=5)
+        tk.Button(self.view_all_tab, text='Search', command=self.search).pack()
+        tk.Button(self.view_all_tab, text='Delete', command=self.delete).pack(pady=5)
+        self.after(CHANGE_POLL_INTERVAL, self.poll_changes)
+
+    def sort_by(self, column):
+        """
+        Sorts the listing by a column, toggling the direction when it is already sorted by it.
+
+        Args:
+            column (str): The column heading that was clicked.
+        """
+        if column == self.sort_column:
+            self.sort_descending = not self.sort_descending
+        else:
+            self.sort_column = column
+            self.sort_descending = False
+        self.page_starts = [None]
+        self.show_page()
+
+    def apply_filters(self, event=None):
+        """
+        Applies the column filters and shows the first page.
+
+        Args:
+            event (Event, optional): The key event when triggered from a filter entry.
+        """
+        self.page_starts = [None]
+        self.show_page()
+
+    def next_page(self):
+        """
+        Shows the next page of the listing.
+        """
+        children = self.view_all_table.get_children()
+        if not self.listing_active or not self.has_next_page or not children:
+            return
+        last = records.ListingRow.from_item(children[-1], self.view_all_table.item(children[-1], 'values'))
+        self.page_starts.append(listing.sort_key(last, self.sort_column))
+        self.show_page()
+
+    def previous_page(self):
+        """
+        Shows the previous page of the listing.
+        """
+        if not self.listing_active or len(self.page_starts) < 2:
+            return
+        self.page_starts.pop()
+        self.show_page()
+
+    def show_page(self):
+        """
+        Shows one page of students, instructors, and courses.
+
+        Sorting, filtering and paging are done by the database using the listing
+        indexes, so only the rows of the page are fetched. Pages are answered from the
+        query cache while the tables are unchanged. Displays an error message if the
+        query fails.
+        """
+        filters = {column: entry.get().strip() for column, entry in self.filter_entries.items()}
+        try:
+            conn = self.get_db_connection()
+            rows = list(listing.rows(conn, self.sort_column, self.sort_descending, filters,
+                                     after=self.page_starts[-1], limit=listing.PAGE_SIZE + 1,
+                                     cache=self.query_cache))
+        except Exception as e:
+            messagebox.showerror('Error refreshing data', e)
+            return
+        self.has_next_page = len(rows) > listing.PAGE_SIZE
+        self.view_all_table.delete(*self.view_all_table.get_children())
+        self.row_versions = {}
+        for row in rows[:listing.PAGE_SIZE]:
+            self.view_all_table.insert("", "end", iid=row.iid, values=row.values)
+            self.row_versions[row.iid] = row.version
+        self.listing_active = True
+
+        arrow = ' \u25bc' if self.sort_descending else ' \u25b2'
+        for column in listing.COLUMNS:
+            self.view_all_table.heading(column, text=column + (arrow if column == self.sort_column else ''))
+        self.page_label.config(text=f'Page {len(self.page_starts)}')
+
+    def refresh_dropdowns(self):
+        """
+        Refreshes the student and course dropdown lists in the 'Register for Course' tab.
+        Does nothing until the tab has been built; building it loads the lists.
+        """
+        if not self.is_tab_built(self.register_course_tab):
+            return
+        students, courses = core.dropdown_names(self.get_db_connection())
+        self.student_dropdown['values'] = students
+        self.course_dropdown['values'] = courses
+
+    def add_student(self):
+        """
+        Adds a new student to the database.
+
+        Retrieves the student's name, age, email, and student ID from the input fields,
+        checks for duplicates, inserts them into the `students` table, and refreshes the
+        dropdowns. Shows a notification in the status bar upon completion or an error message if the
+        insertion fails.
+
+        Raises:
+            Exception: If there's an error while adding the student to the database.
+        """
+        name=self.student_name.get()
+        age=int(self.student_age.get())
+        email=self.student_email.get()
+        student_id=self.student_id.get()
+        try:
+            conn=self.get_db_connection()
+            if not self.confirm_not_duplicate('students', 'student', name, email):
+                return
+            core.add_student(conn, name, age, email, student_id)
+            conn.commit()
+            self.refresh_dropdowns()
+            self.status_bar.notify("Student added")
+            self.clear_student_inputs()
+        except Exception as e:
+            messagebox.showinfo('Error adding student', e)
+    
+    def add_instructor(self):
+        """
+        Adds a new instructor to the database.
+
+        Retrieves the instructor's name, age, email, and instructor ID from the input fields,
+        checks for duplicates, inserts them into the `instructors` table, and refreshes the
+        dropdowns. Shows a notification in the status bar upon completion or an error message if the
+        insertion fails.
+
+        Raises:
+            Exception: If there's an error while adding the instructor to the database.
+        """
+        name=self.instructor_name.get()
+        age=int(self.instructor_age.get())
+        email=self.instructor_email.get()
+        instructor_id=self.instructor_id.get()
+        try:
+            conn=self.get_db_connection()
+            if not self.confirm_not_duplicate('instructors', 'instructor', name, email):
+                return
+            core.add_instructor(conn, name, age, email, instructor_id)
+            conn.commit()
+            self.refresh_dropdowns()
+            self.status_bar.notify("Instructor added")
+            self.clear_instructor_inputs()
+        except Exception as e:
+            messagebox.showinfo('Error adding instructor', e)
+
+    def confirm_not_duplicate(self, table, label, name, email):
+        """
+        Checks a new student or instructor against existing rows before it is added.
+
+        An entry with an email that is already registered is rejected. If people with
+        similar sounding names exist, the user is asked whether to add the entry anyway.
+
+        Args:
+            table (str): Table the entry is added to, `students` or `instructors`.
+            label (str): Name of the record type shown in messages.
+            name (str): Name being entered.
+            email (str): Email being entered.
+
+        Returns:
+            bool: True if the entry should be added.
+        """
+        exact, similar = dedup.check(self.get_db_connection(), table, name, email)
+        if exact:
+            messagebox.showerror('Duplicate ' + label, f"A {label} with the email '{exact[2]}' already exists: {exact[1]}")
+            return False
+        if similar:
+            matches = '\n'.join(f'{row[1]} <{row[2]}>' for row in similar[:5])
+            return messagebox.askyesno('Possible duplicate', f"Similar {label}s already exist:\n{matches}\n\nAdd '{name}' anyway?")
+        return True
+
+    def add_course(self):
+        """
+        Adds a new course to the database.
+
+        Retrieves the course ID, course name, instructor ID, optional capacity and
+        prerequisites from the input fields, inserts them into the `courses` and
+        `prerequisites` tables, and refreshes the dropdowns. Shows a
+        notification in the status bar upon completion or an error message if the insertion fails.
+
+        Raises:
+            Exception: If there's an error while adding the course to the database.
+        """
+        course_id=self.course_id.get()
+        course_name=self.course_name.get()
+        instructor_id=self.instructor_id_course.get()
+        try:
+            capacity, prerequisites = core.parse_course_inputs(self.course_capacity.get(), self.course_prerequisites.get())
+            conn=self.get_db_connection()
+            core.add_course(conn, course_id, course_name, instructor_id, capacity, prerequisites)
+            conn.commit()
+            self.refresh_dropdowns()
+            self.status_bar.notify("Course added")
+            self.clear_course_inputs()
+        except Exception as e:
+            self.get_db_connection().rollback()
+            messagebox.showinfo('Error adding course', e)
+    
+    def register_course(self):
+        """
+        Registers a student for a course.
+
+        Retrieves the selected student and course, fetches the corresponding student ID
+        and course ID from the database, and registers the student in the `registrations`
+        table, or in the current term's file when terms are configured. The database refuses
+        duplicate registrations, full courses and missing prerequisites (see `enrollment`).
+        Shows a notification in the status bar upon completion or an error message if the
+        registration fails.
+
+        Raises:
+            Exception: If there's an error while registering the course in the database.
+        """
+        student_name=self.student_dropdown.get()
+        course_name=self.course_dropdown.get()
+        try:
+            conn=self.get_db_connection()
+            if self.partitions:
+                with self.partitions.history() as history:
+                    core.register(conn, student_name, course_name, self.partitions.schema, history)
+            else:
+                core.register(conn, student_name, course_name)
+            self.status_bar.notify("Course registered")
+        except enrollment.RegistrationError as e:
+            messagebox.showerror('Registration refused', e)
+        except Exception as e:
+            messagebox.showinfo('Error registering course', e)
+    
+    def refresh_view_all(self):
+        """
+        Refreshes the displayed list of students, instructors, and courses.
+
+        Clears the current view and shows the first page of records from the `students`,
+        `instructors`, and `courses` tables with the current sort order and filters.
+        Shows a notification in the status bar upon completion or an error message if the operation fails.
+
+        Raises:
+            Exception: If there's an error while refreshing the data from the database.
+        """
+        self.page_starts = [None]
+        self.show_page()
+        if self.listing_active:
+            self.status_bar.notify("Data refreshed")
+    
+    def export_view(self):
+        """
+        Exports the currently displayed data to a file.
+
+        Opens a file dialog to choose the file; its extension picks the format (CSV, JSON
+        Lines, SQL dump or columnar, see exporter.py). The contents of the table are written
+        in a background job, shown in the job panel. When the table shows the listing, every
+        page of it is streamed from the database in the current sort order and filters. The
+        file is written under a temporary name and only replaces the target once complete,
+        so a cancelled or failed export leaves nothing behind. If the export fails, an error
+        message is displayed.
+
+        Raises:
+            Exception: If there's an error while exporting the data.
+        """
+        try:
+            from tkinter import filedialog
+            filename = filedialog.asksaveasfilename(defaultextension='.csv', filetypes=EXPORT_FILETYPES)
+            if not filename:
+                return
+            writer_class = exporter.writer_for(filename)
+            if self.listing_active:
+                filters = {column: entry.get().strip() for column, entry in self.filter_entries.items()}
+                sort, descending = self.sort_column, self.sort_descending
+                table_rows = None
+                total = listing.count(self.get_db_connection(), filters)
+            else:
+                table_rows = [self.view_all_table.item(row, 'values') for row in self.view_all_table.get_children()]
+                total = len(table_rows)
+
+            def export(job):
+                conn = self.db_config.connect() if table_rows is None else None
+                try:
+                    if conn is None:
+                        source = iter(table_rows)
+                    else:
+                        source = (row.values for row in listing.rows(conn, sort, descending, filters, limit=None))
+                    batches = iter(lambda: list(itertools.islice(source, exporter.BATCH_SIZE)), [])
+                    return exporter.write(writer_class, filename, 'view_all',
+                                          [(column, 'utf8') for column in listing.COLUMNS], batches,
+                                          progress=lambda rows, size: job.progress(rows))
+                finally:
+                    if conn is not None:
+                        conn.close()
+
+            self.jobs.submit('Export', export, total=total, on_done=self.report_export, on_error=self.report_job)
+        except Exception as e:
+            messagebox.showerror("Error exporting data", e)
+
+    def export_tables(self):
+        """
+        Exports every table to its own file in a chosen directory.
+
+        Asks for the directory and the format, then exports the tables in parallel in a
+        background job, shown in the job panel with the bytes written per second.
+        Deleted records are left out. Displays an error message if the export fails.
+        """
+        try:
+            from tkinter import filedialog, simpledialog
+            directory = filedialog.askdirectory()
+            if not directory:
+                return
+            file_format = simpledialog.askstring("Export Tables", f"Format ({', '.join(exporter.WRITERS)}):",
+                                                 initialvalue='csv')
+            if not file_format:
+                return
+            if file_format not in exporter.WRITERS:
+                raise ValueError(f"Unknown format '{file_format}'")
+
+            def export(job):
+                return exporter.export_tables(self.db_config.connect, directory, format=file_format,
+                                              progress=job.progress,
+                                              terms_dir=self.db_config.terms_dir if self.db_config.term else None)
+
+            self.jobs.submit('Export tables', export, unit='bytes', on_done=self.report_export,
+                             on_error=self.report_job)
+        except Exception as e:
+            messagebox.showerror("Error exporting tables", e)
+
+    def report_export(self, job):
+        """
+        Reports the rows, size and bytes per second of a finished export in the status bar.
+
+        Args:
+            job (jobs.Job): The finished export job; its result is an ``ExportResult`` or a list of them.
+        """
+        results = job.result if isinstance(job.result, list) else [job.result]
+        self.status_bar.notify('Exported ' + '; '.join(result.describe() for result in results))
+
+    def load(self):
+        """
+        Loads data from a CSV file into the application.
+
+        Opens a file dialog to select a CSV file and reads it in a background job, shown in
+        the job panel. Rows are added to the table view in batches as they are read. Loading
+        stops if the table is switched back to the listing. Displays an error message if
+        the operation fails.
+
+        Raises:
+            Exception: If there's an error while loading data from the CSV file.
+        """
+        try:
+            # Open a file dialog to select the CSV file
+            from tkinter import filedialog
+            filename = filedialog.askopenfilename(defaultextension='.csv', filetypes=[("CSV Files", "*.csv")])
+            if not filename:
+                return
+            # Clear existing data in the table
+            for item in self.view_all_table.get_children():
+                self.view_all_table.delete(item)
+            self.row_versions = {}
+            self.listing_active = False
+            # Loaded rows get ids of their own; records.ListingRow.from_item gives them no row id.
+            numbers = itertools.count(1)
+
+            def insert_rows(job, batch):
+                if self.listing_active:
+                    job.cancel()
+                    return
+                for row in batch:
+                    self.view_all_table.insert("", "end", iid=f'csv:{next(numbers)}', values=row)
+
+            def read(job):
+                import csv
+                with open(filename, 'rb') as raw:
+                    reader = csv.reader(io.TextIOWrapper(raw, newline=''))
+                    header = next(reader, None)  # Skip the header row
+                    batch = []
+                    for row in reader:
+                        if len(row) == 3:  # Ensure that each row has 3 columns
+                            batch.append(row)
+                        if len(batch) == 1000:
+                            job.post(insert_rows, job, batch)
+                            batch = []
+                            job.progress(raw.tell())
+                    job.post(insert_rows, job, batch)
+                    job.progress(raw.tell())
+
+            self.jobs.submit('Load CSV', read, total=os.path.getsize(filename), unit='bytes',
+                             on_done=self.report_job, on_error=self.report_job)
+        except Exception as e:
+            messagebox.showerror("Error loading data", e)
+
+    def report_job(self, job):
+        """
+        Reports how a background job ended: an error message if it failed, a
+        notification in the status bar otherwise.
+
+        Args:
+            job (jobs.Job): The finished job.
+        """
+        if job.state == jobs.FAILED:
+            messagebox.showerror(f"Error: {job.name}", job.error)
+        else:
+            self.status_bar.notify(job.describe(), 'info' if job.state == jobs.DONE else 'warning')
+
+    def export_snapshot(self):
+        """
+        Exports students, instructors, courses, and registrations to a columnar snapshot.
+
+        Opens a directory dialog and writes one typed, compressed file per table, and per
+        term file when terms are configured, using Parquet when pyarrow is installed or
+        the built-in columnar format otherwise.
+        Shows a notification in the status bar upon completion or an error message if the export fails.
+
+        Raises:
+            Exception: If there's an error while exporting the snapshot.
+        """
+        try:
+            from tkinter import filedialog
+            directory = filedialog.askdirectory(title='Choose snapshot directory')
+            if not directory:
+                return
+            conn = self.get_db_connection()
+            counts = columnar.export_tables(conn, directory,
+                                            terms_dir=self.db_config.terms_dir if self.db_config.term else None)
+            self.status_bar.notify(f"Snapshot exported ({sum(counts.values())} rows)")
+        except Exception as e:
+            messagebox.showerror("Error exporting snapshot", e)
+
+    def load_snapshot(self):
+        """
+        Loads a columnar snapshot into the database.
+
+        Opens a directory dialog, imports every table file found in it in batches, recomputes
+        the enrollment counters in the same transaction, and refreshes the dropdowns and the
+        table view. Shows a notification in the status bar upon
+        completion or an error message if the import fails.
+
+        Raises:
+            Exception: If there's an error while loading the snapshot.
+        """
+        try:
+            from tkinter import filedialog
+            directory = filedialog.askdirectory(title='Choose snapshot directory', mustexist=True)
+            if not directory:
+                return
+            conn = self.get_db_connection()
+            terms = [term for term, archived in self.partitions.terms.items() if not archived] if self.partitions else ()
+            counts = columnar.import_tables(conn, directory, terms=terms)
+            for table in dedup.TABLES:
+                dedup.refresh_keys(conn, table)
+            enrollment.recount(conn)
+            for term_schema in self.partitions.open_schemas if self.partitions else ():
+                enrollment.recount(conn, term_schema)
+            conn.commit()
+            self.refresh_dropdowns()
+            self.status_bar.notify(f"Snapshot loaded ({sum(counts.values())} rows)")
+        except Exception as e:
+            self.get_db_connection().rollback()
+            messagebox.showerror("Error loading snapshot", e)
+
+    def backup_database(self):
+        """
+        Creates an online backup of the database while the application stays usable.
+
+        Opens a file dialog to choose the backup file and copies the database page by page
+        with the SQLite backup API (gzip compressed when the name ends in ``.gz``) in a
+        background job, shown in the job panel. Displays an error message if the backup fails.
+
+        Raises:
+            Exception: If there's an error while backing up the database.
+        """
+        try:
+            from tkinter import filedialog
+            filename = filedialog.asksaveasfilename(defaultextension='.db', filetypes=[("SQLite Backup", "*.db"), ("Compressed Backup", "*.gz")])
+            if not filename:
+                return
+
+            def run(job):
+                conn = self.db_config.connect()
+                try:
+                    return backup.backup_database(conn, filename, compress=filename.endswith('.gz'), progress=job.progress)
+                finally:
+                    conn.close()
+
+            self.jobs.submit('Backup', run, unit='pages', on_done=self.report_job, on_error=self.report_job)
+        except Exception as e:
+            messagebox.showerror("Error backing up database", e)
+
+    def restore_database(self):
+        """
+        Restores the database from a backup file.
+
+        Confirms with the user, then replaces the contents of the open database with the
+        selected backup through the SQLite backup API in a background job, shown in the job
+        panel, and refreshes the dropdowns and the listing once done. A cancelled restore
+        leaves the database unchanged. Displays an error message if the restore fails.
+
+        Raises:
+            Exception: If there's an error while restoring the database.
+        """
+        try:
+            from tkinter import filedialog
+            filename = filedialog.askopenfilename(filetypes=[("SQLite Backup", "*.db"), ("Compressed Backup", "*.gz")])
+            if not filename:
+                return
+            if not messagebox.askyesno("Confirm Restore", "Replace all current data with the selected backup?"):
+                return
+
+            def run(job):
+                conn = self.db_config.connect()
+                try:
+                    return backup.restore_database(filename, conn, progress=job.progress)
+                finally:
+                    conn.close()
+
+            def restored(job):
+                self.refresh_dropdowns()
+                if self.is_tab_built(self.view_all_tab) and self.listing_active:
+                    self.show_page()
+                self.report_job(job)
+
+            self.jobs.submit('Restore', run, unit='pages', on_done=restored, on_error=self.report_job)
+        except Exception as e:
+            messagebox.showerror("Error restoring database", e)
+
+    def search(self):
+        """
+        Searches for students, instructors, or courses by name or course name.
+
+        Retrieves the search term from the input field, searches students, instructors and
+        courses in parallel and streams the best ``searchengine.LIMIT`` matches into the table
+        view: exact names first, then names starting with the term, then names containing it.
+        Repeating a search while the tables are unchanged is answered from ``query_cache``.
+        If the search fails, an error message is displayed.
+
+        Raises:
+            Exception: If there's an error while searching the database.
+        """
+        search_term = self.search_entry.get().strip()
+        
+        if not search_term:
+            messagebox.showwarning("Input Error", "Please enter a search term.")
+            return
+        
+        # Clear existing data in the table
+        for item in self.view_all_table.get_children():
+            self.view_all_table.delete(item)
+        self.row_versions = {}
+        self.listing_active = False
+
+        try:
+            if self.search_engine is None:
+                self.search_engine = searchengine.SearchEngine(self.db_config.connect)
+            for row in self.search_engine.search(search_term, cache=self.query_cache):
+                self.view_all_table.insert("", "end", iid=row.iid, values=row.values)
+                self.row_versions[row.iid] = row.version
+        
+        except Exception as e:
+            messagebox.showerror("Error", f"An error occurred: {e}")
+
+    def edit(self,event):
+        """
+        Allows editing a selected record in the table view.
+
+        Retrieves the selected record, shows an input dialog to enter the new value, and updates
+        the record both in the database and the table view. If the update fails, an error message
+        is displayed.
+
+        Args:
+            event (Event): The event triggered by selecting a record in the table.
+
+        Raises:
+            Exception: If there's an error while editing the record.
+        """
+        item = self.view_all_table.selection()
+        if not item:
+            return
+        
+        column = self.view_all_table.identify_column(event.x)
+        column_id = column.split('#')[1]
+        column_index = int(column_id) - 1
+        
+        # Get the current value of the cell
+        current_value = self.view_all_table.item(item[0], 'values')[column_index]
+        
+        # Show an input dialog to get the new value
+        from tkinter import simpledialog
+        new_value = simpledialog.askstring("Edit Value", f"Edit value for '{self.view_all_table.heading(column_id, 'text')}'", initialvalue=current_value)
+        
+        if new_value is not None:
+            self.update_record(item[0], column_index, new_value)
+    
+    def update_record(self, item_id, column_index, new_value):
+        """
+        Updates a record in the database and table view.
+
+        Identifies the table (students, instructors, or courses) based on the type of record,
+        updates the corresponding record in the database, and reflects the change in the table view.
+        The update only applies if the record still has the version it was shown with; if
+        another user changed it meanwhile, the user is asked whether to overwrite their
+        change, and if it was deleted the row is removed. Rows loaded from a CSV file are
+        looked up by their ID. Displays an error message if the update fails.
+
+        Args:
+            item_id (str): The ID of the item to be updated.
+            column_index (int): The index of the column to be updated.
+            new_value (str): The new value to be set.
+
+        Raises:
+            Exception: If there's an error while updating the record.
+        """
+        values = self.view_all_table.item(item_id, 'values')
+        row = records.ListingRow.from_item(item_id, values, self.row_versions.get(item_id))
+        
+        # Determine which table to update
+        entity = row.entity
+        if entity is None:
+            messagebox.showerror("Error", "Unknown type")
+            return
+        
+        # Update the database
+        conn = self.get_db_connection()
+        try:
+            row = core.resolve(conn, row)
+            try:
+                row = concurrency.update_name(conn, row, new_value)
+            except concurrency.EditConflict as conflict:
+                conn.rollback()
+                if conflict.current is None:
+                    messagebox.showerror("Edit Conflict", f"{conflict} Your change was not saved.")
+                    self.view_all_table.delete(item_id)
+                    self.row_versions.pop(item_id, None)
+                    return
+                self.show_row(conflict.current, item_id)
+                if not messagebox.askyesno("Edit Conflict", f"{conflict}\n\nOverwrite it with '{new_value}'?"):
+                    return
+                row = concurrency.update_name(conn, conflict.current, new_value)
+            conn.commit()
+            
+            # Update the Treeview
+            self.show_row(row, item_id)
+            
+        except Exception as e:
+            messagebox.showerror("Error", f"An error occurred: {e}")
+
+    def show_row(self, row, iid=None):
+        """
+        Updates a row of the table view and the version it was read with.
+
+        Args:
+            row (records.ListingRow): The row as it is in the database.
+            iid (str, optional): Item showing the row; defaults to ``row.iid``.
+        """
+        iid = iid or row.iid
+        self.view_all_table.item(iid, values=row.values)
+        self.row_versions[iid] = row.version
+
+    def poll_changes(self):
+        """
+        Updates the rows of the table view that other users changed or deleted since the
+        last poll, and schedules the next poll.
+
+        Only the change log entries since the last poll are read, and only rows shown in
+        the table are reloaded, so an idle database costs one index seek per poll. A poll
+        that fails, e.g. because the database is locked, is retried at the next one;
+        polling only stops on databases without a change log.
+        """
+        polling = True
+        try:
+            conn = self.get_db_connection()
+            if self.change_poller is None:
+                self.change_poller = concurrency.ChangePoller(conn)
+            changed, _ = self.change_poller.poll(conn, self.row_versions)
+            for iid, row in changed.items():
+                if row is None:
+                    self.view_all_table.delete(iid)
+                    self.row_versions.pop(iid, None)
+                else:
+                    self.show_row(row)
+        except sqlite3.Error as e:
+            # A database without a change log, e.g. an old read-only copy, is not polled.
+            # Other errors, e.g. a locked database, are retried at the next poll.
+            polling = 'no such table' not in str(e)
+        finally:
+            if polling:
+                self.after(CHANGE_POLL_INTERVAL, self.poll_changes)
+    
+    def delete(self):
+        """
+        Deletes a selected record from the database and table view.
+
+        Confirms the deletion with the user, identifies the type of record (student, instructor, or course),
+        marks it deleted in the corresponding table in the database, and removes it from the table view.
+        As with edits, the delete only applies if the record still has the version it was
+        shown with; if another user changed it meanwhile, the user is asked again. Rows
+        loaded from a CSV file are looked up by their ID. The row is purged later by the compaction job. Displays an error message if the deletion fails.
+
+        Raises:
+            Exception: If there's an error while deleting the record from the database.
+        """
+        selected_item = self.view_all_table.selection()
+    
+        if not selected_item:
+            messagebox.showwarning("Selection Error", "Please select a record to delete.")
+            return
+        
+        item_id = selected_item[0]
+        row = records.ListingRow.from_item(item_id, self.view_all_table.item(item_id, 'values'),
+                                           self.row_versions.get(item_id))
+        
+        # Confirm deletion
+        confirm = messagebox.askyesno("Confirm Deletion", f"Are you sure you want to delete the {row.type} '{row.name}'?")
+        if not confirm:
+            return
+        
+        # Determine which table to delete from
+        entity = row.entity
+        if entity is None:
+            messagebox.showerror("Error", "Unknown type")
+            return
+        
+        # Delete from the database
+        conn = self.get_db_connection()
+        try:
+            row = core.resolve(conn, row)
+            try:
+                core.delete(conn, row)
+            except concurrency.EditConflict as conflict:
+                conn.rollback()
+                if conflict.current is not None:
+                    self.show_row(conflict.current, item_id)
+                    if not messagebox.askyesno("Edit Conflict", f"{conflict}\n\nDelete it anyway?"):
+                        return
+                    core.delete(conn, conflict.current)
+                else:
+                    messagebox.showinfo("Edit Conflict", str(conflict))
+            conn.commit()
+            
+            # Remove from the Treeview
+            self.view_all_table.delete(item_id)
+            self.row_versions.pop(item_id, None)
+        
+        except Exception as e:
+            messagebox.showerror("Error", f"An error occurred: {e}")
+
+    def clear_instructor_inputs(self):
+        """
+        Clears the input fields for adding a new instructor.
+        """
+        self.instructor_name.delete(0, tk.END)
+        self.instructor_email.delete(0, tk.END)
+        self.instructor_age.delete(0, tk.END)
+        self.instructor_id.delete(0, tk.END)
+    
+    def clear_student_inputs(self):
+        """
+        Clears the input fields for adding a new student.
+        """
+        self.student_name.delete(0, tk.END)
+        self.student_email.delete(0, tk.END)
+        self.student_age.delete(0, tk.END)
+        self.student_id.delete(0, tk.END)
+
+    def clear_course_inputs(self):
+        """
+        Clears the input fields for adding a new course.
+        """
+        self.course_id.delete(0, tk.END)
+        self.course_name.delete(0, tk.END)
+        self.instructor_id_course.delete(0, tk.END)
+        self.course_capacity.delete(0, tk.END)
+        self.course_prerequisites.delete(0, tk.END)
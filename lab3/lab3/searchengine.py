@@ -0,0 +1,221 @@
+"""
+Parallel, ranked search over students, instructors and courses.
+
+Each entity table is searched by its own worker thread on its own read
+connection, so the three tables are read at the same time. Matches are
+ranked by quality:
+
+1. exact: the name equals the term (ignoring ASCII case);
+2. prefix: the name starts with the term;
+3. substring: the term appears anywhere else in the name.
+
+Every tier is a separate query per table: exact and prefix matches are index
+seeks on the listing's ``NOCASE`` name indexes and return at once, only the
+substring tier has to scan. Each query returns at most the requested number
+of rows, already in order, and the workers' results for a tier are merged
+with a heap into one stream ordered by name, type and row id. The stream
+stops at the requested number of rows (the global top-K); queries still
+running for later tiers are interrupted, so a broad term never pays for a
+full scan once enough better matches were found.
+
+Given a :class:`querycache.QueryCache`, a search that ran to completion is
+cached under its term and limit, tagged with the versions of the three
+tables, and repeating it while none of them changed reads no table::
+
+    engine = SearchEngine(config.connect)
+    for row in engine.search('ann', limit=200, cache=query_cache):
+        ...
+    engine.close()
+"""
+import heapq
+import queue
+import threading
+
+import listing
+import records
+import statements
+
+EXACT = 0
+PREFIX = 1
+SUBSTRING = 2
+TIERS = (EXACT, PREFIX, SUBSTRING)
+LIMIT = 200
+# Larger than any character, for prefix range upper bounds.
+_MAX_CHAR = '\U0010ffff'
+
+
+def _escape_like(term):
+    return term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+def tier_query(entity, tier, term, limit):
+    """
+    Builds the query of one entity and ranking tier.
+
+    Args:
+        entity (statements.Entity): The entity searched.
+        tier (int): ``EXACT``, ``PREFIX`` or ``SUBSTRING``.
+        term (str): Search term.
+        limit (int): Maximum number of rows.
+
+    Returns:
+        tuple[str, list]: SQL and parameters; rows are ``(id, name, type, rowid, version)``
+        ordered by name (``NOCASE``) and row id.
+    """
+    name = f'{entity.name_field} COLLATE NOCASE'
+    upper = term + _MAX_CHAR
+    if tier == EXACT:
+        where, params = f'{name} = ?', [term]
+    elif tier == PREFIX:
+        where, params = f'{name} > ? AND {name} < ?', [term, upper]
+    else:
+        where = f"{entity.name_field} LIKE ? ESCAPE '\\' AND NOT ({name} >= ? AND {name} < ?)"
+        params = [f'%{_escape_like(term)}%', term, upper]
+    sql = (f"SELECT {entity.id_field}, {entity.name_field}, '{entity.type}', id, version FROM {entity.table} "
+           f'WHERE deleted_at IS NULL AND {where} ORDER BY {name}, id LIMIT ?')
+    return sql, params + [limit]
+
+
+def _merge_key(row):
+    return listing.nocase(row.name), row.type, row.row_id
+
+
+class _Worker:
+    """Thread searching one entity table on its own connection."""
+    def __init__(self, entity, connect):
+        self.entity = entity
+        self.connect = connect
+        self.tasks = queue.Queue()
+        self.conn = None
+        self.current = None
+        self.lock = threading.Lock()
+        self.thread = threading.Thread(target=self._run, name=f'search-{entity.table}', daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        try:
+            conn = self.connect()
+        except Exception as e:
+            conn, error = None, e
+        with self.lock:
+            self.conn = conn
+        while True:
+            task = self.tasks.get()
+            if task is None:
+                break
+            search, tier, term, limit, results = task
+            if conn is None:
+                results.put((tier, error))
+                continue
+            with self.lock:
+                if search.cancelled.is_set():
+                    continue
+                self.current = search
+            try:
+                rows = conn.execute(*tier_query(self.entity, tier, term, limit)).fetchall()
+                results.put((tier, [records.ListingRow._make(row) for row in rows]))
+            except Exception as e:
+                results.put((tier, e))
+            finally:
+                with self.lock:
+                    self.current = None
+        if conn is not None:
+            conn.close()
+
+    def interrupt(self, search):
+        # Only interrupts the query if it still belongs to the cancelled search.
+        with self.lock:
+            if self.current is search and self.conn is not None:
+                self.conn.interrupt()
+
+
+class _Search:
+    def __init__(self):
+        self.cancelled = threading.Event()
+
+
+class SearchEngine:
+    """
+    Runs ranked searches with one worker thread and read connection per entity table.
+
+    Attributes
+    ----------
+    limit : int
+        Default maximum number of results of a search.
+    """
+    def __init__(self, connect, limit=LIMIT):
+        """
+        Starts the workers. Each opens its connection on its own thread.
+
+        Args:
+            connect (Callable[[], sqlite3.Connection]): Opens a new connection to the database.
+            limit (int): Default maximum number of results of a search.
+        """
+        self.limit = limit
+        self._workers = [_Worker(entity, connect) for entity in statements.ENTITIES.values()]
+
+    def search(self, term, limit=None, cache=None):
+        """
+        Searches the names of students, instructors and courses.
+
+        Args:
+            term (str): Search term, matched ignoring ASCII case.
+            limit (int, optional): Maximum number of results; defaults to ``self.limit``.
+            cache (querycache.QueryCache | None): Cache to answer repeated searches from.
+
+        Yields:
+            records.ListingRow: Matches, exact matches first, then prefix, then substring
+            matches, each tier ordered by name, type and row id.
+
+        Raises:
+            sqlite3.Error: If a query fails.
+        """
+        remaining = self.limit if limit is None else limit
+        if remaining <= 0:
+            return
+        key = ('searchengine', term, remaining)
+        if cache is not None:
+            rows, versions = cache.lookup(key, listing.TABLES)
+            if rows is not None:
+                yield from rows
+                return
+        found = []
+        yield from self._search(term, remaining, found)
+        # Only a search that was not abandoned part way is complete.
+        if cache is not None:
+            cache.store(key, versions, found)
+
+    def _search(self, term, remaining, found):
+        search = _Search()
+        results = queue.Queue()
+        # Every tier is queued at once, so later tiers run while earlier ones are merged.
+        for tier in TIERS:
+            for worker in self._workers:
+                worker.tasks.put((search, tier, term, remaining, results))
+        arrived = {tier: [] for tier in TIERS}
+        try:
+            for tier in TIERS:
+                while len(arrived[tier]) < len(self._workers):
+                    done_tier, rows = results.get()
+                    if isinstance(rows, Exception):
+                        raise rows
+                    arrived[done_tier].append(rows)
+                for row in heapq.merge(*arrived.pop(tier), key=_merge_key):
+                    found.append(row)
+                    yield row
+                    remaining -= 1
+                    if not remaining:
+                        return
+        finally:
+            search.cancelled.set()
+            for worker in self._workers:
+                worker.interrupt(search)
+
+    def close(self):
+        """
+        Stops the workers, which close their connections.
+        """
+        for worker in self._workers:
+            worker.tasks.put(None)
+        for worker in self._workers:
+            worker.thread.join()
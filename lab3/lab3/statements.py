@@ -0,0 +1,102 @@
+"""
+Registry of the named SQL statements used by the application.
+
+Every statement is built once at import time from the ``ENTITIES`` table, so
+handlers execute the exact same string on every call and sqlite3's per
+connection statement cache (sized by ``CACHE_SIZE``) reuses the compiled
+statement instead of parsing SQL again. Table and column names only ever come
+from this module, never from user input.
+"""
+from collections import namedtuple
+
+Entity = namedtuple('Entity', 'type table id_field name_field')
+Entity.__doc__ = """
+A record type shown in the View All table.
+
+Attributes
+----------
+type : str
+    Display name used in the ``Type`` column.
+table : str
+    Database table.
+id_field : str
+    Business identifier column shown in the ``ID`` column.
+name_field : str
+    Column shown in the ``Name`` column.
+"""
+
+ENTITIES = {
+    'Student': Entity('Student', 'students', 'student_id', 'name'),
+    'Instructor': Entity('Instructor', 'instructors', 'instructor_id', 'name'),
+    'Course': Entity('Course', 'courses', 'course_id', 'course_name'),
+}
+
+STATEMENTS = {}
+
+
+def _register(name, sql):
+    STATEMENTS[name] = ' '.join(sql.split())
+
+
+for _entity in ENTITIES.values():
+    # Deleted rows are tombstones (see compaction.py) that every statement skips.
+    # Keyed on the row id and version like update_name_versioned; business ids may repeat.
+    _register(f'{_entity.table}.delete',
+              f"UPDATE {_entity.table} SET deleted_at = CAST(strftime('%s', 'now') AS INTEGER), version = version + 1 "
+              f'WHERE id = ? AND version = ? AND deleted_at IS NULL')
+    _register(f'{_entity.table}.names',
+              f'SELECT {_entity.name_field} FROM {_entity.table} WHERE deleted_at IS NULL')
+    # The version column is added by concurrency.install.
+    _register(f'{_entity.table}.update_name_versioned',
+              f'UPDATE {_entity.table} SET {_entity.name_field} = ?, version = version + 1 '
+              f'WHERE id = ? AND version = ? AND deleted_at IS NULL')
+    _register(f'{_entity.table}.by_entity_id',
+              f"SELECT {_entity.id_field}, {_entity.name_field}, '{_entity.type}', id, version "
+              f'FROM {_entity.table} WHERE {_entity.id_field} = ? AND deleted_at IS NULL LIMIT 2')
+    _register(f'{_entity.table}.current',
+              f"SELECT {_entity.id_field}, {_entity.name_field}, '{_entity.type}', id, version "
+              f'FROM {_entity.table} WHERE id = ? AND deleted_at IS NULL')
+del _entity
+
+_register('students.insert',
+          'INSERT INTO students (name, age, email, student_id, email_key, name_key) VALUES (?, ?, ?, ?, ?, ?)')
+_register('instructors.insert',
+          'INSERT INTO instructors (name, age, email, instructor_id, email_key, name_key) VALUES (?, ?, ?, ?, ?, ?)')
+_register('courses.insert',
+          'INSERT INTO courses (course_id, course_name, instructor_id, capacity) VALUES (?, ?, ?, ?)')
+_register('students.id_by_name', 'SELECT student_id FROM students WHERE name = ? AND deleted_at IS NULL')
+_register('courses.id_by_name', 'SELECT course_id FROM courses WHERE course_name = ? AND deleted_at IS NULL')
+_register('registrations.insert', 'INSERT INTO registrations (student_id, course_id) VALUES (?, ?)')
+_register('change_log.since', 'SELECT seq, table_name, op, row_id FROM change_log WHERE seq > ? ORDER BY seq')
+
+# Room for every registered statement plus ad hoc queries (PRAGMAs, DDL).
+CACHE_SIZE = len(STATEMENTS) + 32
+
+
+def sql(name):
+    """
+    Returns the SQL text of a registered statement.
+
+    Args:
+        name (str): Statement name, ``<table>.<operation>``.
+
+    Returns:
+        str: The SQL text.
+
+    Raises:
+        KeyError: If no statement with that name is registered.
+    """
+    return STATEMENTS[name]
+
+
+def entity(type_value):
+    """
+    Looks up the entity shown with a given ``Type`` value.
+
+    Args:
+        type_value (str): Value of the ``Type`` column, e.g. ``"Student"``.
+
+    Returns:
+        Entity | None: The entity, or None for an unknown type.
+    """
+    return ENTITIES.get(type_value)
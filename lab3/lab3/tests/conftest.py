@@ -0,0 +1,49 @@
+"""
+Fixtures shared by the tests. Run from the directory holding the modules::
+
+    python -m pytest -q tests
+"""
+import os
+import sqlite3
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import dbconfig  # noqa: E402
+import loadtest  # noqa: E402
+import schema  # noqa: E402
+from school import core  # noqa: E402
+
+
+@pytest.fixture
+def conn(tmp_path):
+    """sqlite3.Connection: A database at the current schema version in a temporary directory."""
+    connection = sqlite3.connect(tmp_path / 'school.db')
+    schema.initialize(connection)
+    yield connection
+    connection.close()
+
+
+@pytest.fixture
+def school(conn):
+    """sqlite3.Connection: The database with one instructor, student and course (``I1``, ``S1``, ``C1``)."""
+    core.add_instructor(conn, 'Ada Byron', 40, 'ada@example.org', 'I1')
+    core.add_student(conn, 'Ann Lee', 20, 'ann@example.org', 'S1')
+    core.add_course(conn, 'C1', 'Algebra', 'I1')
+    conn.commit()
+    return conn
+
+
+@pytest.fixture
+def app(school, tmp_path):
+    """
+    tuple: A headless ``DatabaseApp`` on the ``school`` database (see loadtest.py) and the
+    stub recording its dialogs. Calls scheduled with ``after`` are collected in ``app.scheduled``.
+    """
+    window, dialogs = loadtest.headless_app(loadtest.load_app_module(), dbconfig.DatabaseConfig(str(tmp_path / 'school.db')))
+    window.scheduled = []
+    window.after = lambda delay, callback: window.scheduled.append(callback)
+    yield window, dialogs
+    window.db_connection.close()
@@ -0,0 +1,94 @@
+import sqlite3
+
+import pytest
+
+import backup
+
+
+@pytest.fixture
+def database(tmp_path):
+    conn = sqlite3.connect(tmp_path / 'school.db')
+    conn.execute('CREATE TABLE students (id INTEGER PRIMARY KEY, name TEXT)')
+    conn.executemany('INSERT INTO students (name) VALUES (?)', [(f'Student {n}',) for n in range(500)])
+    conn.commit()
+    yield conn
+    conn.close()
+
+
+def _names(conn):
+    return [name for (name,) in conn.execute('SELECT name FROM students ORDER BY id')]
+
+
+@pytest.mark.parametrize('compress', (False, True))
+def test_backup_then_restore_brings_back_the_rows(database, tmp_path, compress):
+    path = str(tmp_path / 'school-backup.db')
+    expected = _names(database)
+    steps = []
+
+    total = backup.backup_database(database, path, pages=1, compress=compress,
+                                   progress=lambda *step: steps.append(step))
+    database.execute('DELETE FROM students')
+    database.commit()
+    backup.restore_database(path, database, pages=1)
+
+    assert _names(database) == expected
+    assert steps[-1] == (total, total)
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['school-backup.db', 'school.db']
+
+
+@pytest.mark.parametrize('compress', (False, True))
+def test_a_backup_in_a_directory_with_uri_characters_restores(database, tmp_path, compress):
+    directory = tmp_path / 'odd ?#% name'
+    directory.mkdir()
+    path = str(directory / 'school-backup.db')
+    expected = _names(database)
+
+    backup.backup_database(database, path, compress=compress)
+    database.execute('DELETE FROM students')
+    database.commit()
+    backup.restore_database(path, database)
+
+    assert _names(database) == expected
+    assert sorted(p.name for p in directory.iterdir()) == ['school-backup.db']
+
+
+def test_restore_does_not_write_to_the_backup(database, tmp_path):
+    path = str(tmp_path / 'school-backup.db')
+    backup.backup_database(database, path)
+    database.execute("INSERT INTO students (name) VALUES ('Late')")
+    database.commit()
+
+    backup.restore_database(path, str(tmp_path / 'restored.db'))
+
+    with sqlite3.connect(path) as copy:
+        assert 'Late' not in _names(copy)
+
+
+def test_a_failed_compressed_backup_keeps_the_previous_one(database, tmp_path, monkeypatch):
+    path = str(tmp_path / 'school-backup.db.gz')
+    backup.backup_database(database, path, compress=True)
+    with open(path, 'rb') as file:
+        previous = file.read()
+
+    def fail(source, target, *args):
+        target.write(source.read(100))
+        raise OSError('disk full')
+
+    monkeypatch.setattr(backup.shutil, 'copyfileobj', fail)
+    with pytest.raises(OSError):
+        backup.backup_database(database, path, compress=True)
+
+    with open(path, 'rb') as file:
+        assert file.read() == previous
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['school-backup.db.gz', 'school.db']
+
+
+def test_command_line_backup_and_restore(database, tmp_path):
+    source = str(tmp_path / 'school.db')
+    path = str(tmp_path / 'school-backup.db.gz')
+
+    assert backup.main(['backup', source, path, '--compress']) == 0
+    assert backup.main(['restore', path, str(tmp_path / 'restored.db')]) == 0
+
+    with sqlite3.connect(tmp_path / 'restored.db') as copy:
+        assert _names(copy) == _names(database)
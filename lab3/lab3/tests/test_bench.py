@@ -0,0 +1,99 @@
+import json
+
+import pytest
+
+import bench
+
+
+def _run(**operations):
+    return {'rows': 100, 'operations': {name: {'plan': plan, 'median_ms': ms} for name, (plan, ms) in operations.items()}}
+
+
+SEEK = ['SEARCH students USING INDEX idx_students_email_key (email_key=?)']
+SCAN = ['SCAN students']
+
+
+def test_a_run_matches_itself():
+    run = bench.bench_plans(100, repeat=1)
+
+    lines, failed = bench.compare_plans(run, run)
+
+    assert not failed
+    assert len(lines) == len(run['operations']) == len(bench.plan_operations(100))
+
+
+def test_the_search_tiers_are_tracked():
+    plans = {name: result['plan'] for name, result in bench.bench_plans(100, repeat=1)['operations'].items()}
+
+    for table in ('students', 'instructors', 'courses'):
+        for tier in ('exact', 'prefix'):
+            assert all(step.startswith(f'SEARCH {table} USING INDEX') for step in plans[f'search.{table}.{tier}'])
+        assert f'search.{table}.substring' in plans
+
+
+def test_a_new_scan_fails():
+    lines, failed = bench.compare_plans(_run(lookup=(SEEK, 0.02)), _run(lookup=(SCAN, 0.02)))
+
+    assert failed
+    assert 'students degraded to SCAN students' in lines[0]
+    assert '      +SCAN students' in lines
+
+
+@pytest.mark.parametrize('plan, problem', (
+    (['SCAN students USING COVERING INDEX idx_students_email_key'], 'students degraded to SCAN students USING'),
+    (['SEARCH students USING INDEX idx_students_name_key (name_key=?)'],
+     'students uses idx_students_name_key instead of idx_students_email_key'),
+    (['SEARCH students USING INDEX idx_students_email_key (email_key=?)', 'SCAN courses'], 'now scans courses'),
+))
+def test_a_worse_table_access_fails(plan, problem):
+    lines, failed = bench.compare_plans(_run(lookup=(SEEK, 0.02)), _run(lookup=(plan, 0.02)))
+
+    assert failed
+    assert problem in lines[0]
+
+
+def test_a_better_table_access_passes():
+    lines, failed = bench.compare_plans(_run(lookup=(SCAN, 0.02)), _run(lookup=(SEEK, 0.02)))
+
+    assert not failed
+
+
+def test_slowdowns_fail_only_above_the_threshold_and_the_noise():
+    baseline = _run(fast=(SEEK, 0.01), slow=(SEEK, 4.0))
+
+    assert not bench.compare_plans(baseline, _run(fast=(SEEK, 0.5), slow=(SEEK, 5.5)))[1]
+    lines, failed = bench.compare_plans(baseline, _run(fast=(SEEK, 0.01), slow=(SEEK, 8.0)))
+    assert failed
+    assert lines[1].startswith('FAIL  slow') and lines[1].endswith('2.0x slower')
+    assert bench.compare_plans(baseline, _run(fast=(SEEK, 0.5), slow=(SEEK, 4.0)), noise_ms=0.05)[1]
+
+
+def test_added_and_removed_statements_are_reported():
+    lines, failed = bench.compare_plans(_run(old=(SEEK, 0.1)), _run(new=(SEEK, 0.1)))
+
+    assert not failed
+    assert lines[0].startswith('new   new') and lines[1] == 'gone  old'
+
+
+
+def test_the_statement_benchmark_times_the_handler_paths():
+    results = bench.bench_statements(20)
+
+    assert sorted(results) == ['delete.registry', 'delete.uncached', 'rename.registry', 'rename.uncached']
+    assert all(rate > 0 for rate in results.values())
+
+
+def test_the_plan_gate_fails_without_a_baseline(tmp_path):
+    baseline = str(tmp_path / 'baseline.json')
+    options = ['plans', '--baseline', baseline, '--rows', '100', '--repeat', '1']
+
+    assert bench.main(options) == 1
+    assert bench.main(options + ['--update']) == 0
+    assert bench.main(options) == 0
+
+
+def test_the_committed_baseline_tracks_every_operation():
+    with open(bench.BASELINE) as file:
+        baseline = json.load(file)
+
+    assert [name for name, *_ in bench.plan_operations(baseline['rows'])] == list(baseline['operations'])
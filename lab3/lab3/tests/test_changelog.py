@@ -0,0 +1,71 @@
+import sqlite3
+
+import pytest
+
+import changelog
+import schema
+from school import core
+
+
+@pytest.fixture
+def copies(tmp_path):
+    a = sqlite3.connect(tmp_path / 'a.db')
+    b = sqlite3.connect(tmp_path / 'b.db')
+    for conn in (a, b):
+        schema.initialize(conn)
+    yield a, b
+    a.close()
+    b.close()
+
+
+def _students(conn):
+    return conn.execute('SELECT * FROM students ORDER BY id').fetchall()
+
+
+def test_changes_made_on_one_copy_are_replayed_on_the_other(copies):
+    a, b = copies
+    core.add_student(a, 'Ann Lee', 20, 'ann@example.org', 'S1')
+    core.add_student(a, 'Bob Stone', 21, 'bob@example.org', 'S2')
+    a.commit()
+    a.execute("UPDATE students SET name = 'Ann Smith' WHERE student_id = 'S1'")
+    a.execute("DELETE FROM students WHERE student_id = 'S2'")
+    a.commit()
+
+    assert changelog.sync(a, b, batch_size=2) == 4
+    assert _students(b) == _students(a)
+    assert changelog.sync(a, b) == 0
+
+
+def test_replayed_changes_are_not_shipped_back(copies):
+    a, b = copies
+    core.add_student(a, 'Ann Lee', 20, 'ann@example.org', 'S1')
+    a.commit()
+    changelog.sync(a, b)
+    logged = changelog.last_sequence(a)
+
+    origins = b.execute('SELECT DISTINCT origin FROM change_log').fetchall()
+    assert origins == [(changelog.node_id(a),)]
+    assert changelog.sync(b, a) == 0
+    assert changelog.last_sequence(a) == logged
+
+
+def test_local_changes_after_a_sync_carry_the_local_origin(copies):
+    a, b = copies
+    core.add_student(a, 'Ann Lee', 20, 'ann@example.org', 'S1')
+    a.commit()
+    changelog.sync(a, b)
+
+    b.execute("UPDATE students SET name = 'Ann Smith' WHERE student_id = 'S1'")
+    b.commit()
+
+    assert b.execute('SELECT apply_origin FROM cdc_state').fetchone()[0] is None
+    assert changelog.sync(b, a) == 1
+    assert _students(a) == _students(b)
+    assert changelog.sync(a, b) == 0
+
+
+def test_a_database_cannot_sync_with_itself(copies):
+    a, _ = copies
+
+    with pytest.raises(ValueError):
+        changelog.sync(a, a)
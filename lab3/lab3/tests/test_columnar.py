@@ -0,0 +1,45 @@
+import sqlite3
+
+import pytest
+
+import columnar
+
+ROWS = [
+    (1, 'Ann Lee', 20, 3.5),
+    (2, None, None, None),
+    (3, '', -(2 ** 40), 0.25),
+    (4, 'Zoë Ångström ✓', 2 ** 62, -1e300),
+]
+
+
+@pytest.fixture
+def source():
+    conn = sqlite3.connect(':memory:')
+    conn.execute('CREATE TABLE people (id INTEGER PRIMARY KEY, name TEXT, points INTEGER, score REAL)')
+    conn.executemany('INSERT INTO people VALUES (?, ?, ?, ?)', ROWS)
+    return conn
+
+
+def test_scol_round_trip_keeps_values_and_nulls(source, tmp_path):
+    counts = columnar.export_tables(source, str(tmp_path), tables=['people'], batch_size=3, use_parquet=False)
+    target = sqlite3.connect(':memory:')
+    target.execute('CREATE TABLE people (id INTEGER PRIMARY KEY, name TEXT, points INTEGER, score REAL)')
+
+    assert counts == {'people': 4}
+    assert columnar.import_tables(target, str(tmp_path), tables=['people'], batch_size=2) == {'people': 4}
+    assert target.execute('SELECT * FROM people ORDER BY id').fetchall() == ROWS
+
+
+def test_scol_offsets_are_four_byte_little_endian():
+    encoded = columnar._encode_column(['ab', None, 'c'], 'utf8')
+
+    assert encoded == b'\x00\x01\x00' + bytes([0, 0, 0, 0, 2, 0, 0, 0, 2, 0, 0, 0, 3, 0, 0, 0]) + b'abc'
+    assert columnar._decode_column(encoded, 0, 3, 'utf8') == (['ab', None, 'c'], len(encoded))
+
+
+def test_reading_a_file_that_is_not_a_snapshot_fails(tmp_path):
+    path = tmp_path / 'people.scol'
+    path.write_bytes(b'not a snapshot')
+
+    with pytest.raises(ValueError):
+        columnar._read_scol(str(path))
@@ -0,0 +1,68 @@
+import pytest
+
+import compaction
+import concurrency
+import listing
+from school import core
+
+
+def _rows(conn):
+    return list(listing.rows(conn, limit=None))
+
+
+def test_delete_leaves_a_tombstone_until_it_is_purged(school):
+    row = next(row for row in _rows(school) if row.entity_id == 'S1')
+    core.delete(school, row)
+    school.commit()
+
+    assert row not in _rows(school)
+    assert compaction.status(school)['tombstones']['students'] == 1
+    assert compaction.purge(school) == 0
+
+    assert compaction.compact(school, retention=-1)[0] == 1
+    assert compaction.status(school)['tombstones']['students'] == 0
+    assert school.execute("SELECT count(*) FROM students WHERE student_id = 'S1'").fetchone()[0] == 0
+
+
+def test_delete_with_a_stale_version_conflicts(school):
+    row = next(row for row in _rows(school) if row.entity_id == 'S1')
+    concurrency.update_name(school, row, 'Ann Smith')
+
+    with pytest.raises(concurrency.EditConflict) as conflict:
+        core.delete(school, row)
+
+    assert conflict.value.current.name == 'Ann Smith'
+    assert compaction.status(school)['tombstones']['students'] == 0
+
+
+def test_delete_removes_only_that_row(school):
+    core.add_student(school, 'Bob Stone', 21, 'bob@example.org', 'S1')
+    first, second = sorted((row for row in _rows(school) if row.entity_id == 'S1'), key=lambda row: row.row_id)
+
+    core.delete(school, first)
+
+    assert [row for row in _rows(school) if row.entity_id == 'S1'] == [second]
+
+
+def test_deleting_twice_reports_the_row_as_deleted(school):
+    row = next(row for row in _rows(school) if row.entity_id == 'C1')
+    core.delete(school, row)
+
+    with pytest.raises(concurrency.EditConflict) as conflict:
+        core.delete(school, row)
+
+    assert conflict.value.current is None
+
+
+def test_purge_in_batches(school):
+    for n in range(25):
+        core.add_student(school, f'Student {n}', 20, f's{n}@example.org', f'T{n}')
+    school.commit()
+    for row in _rows(school):
+        if row.entity_id.startswith('T'):
+            core.delete(school, row)
+    school.commit()
+    batches = []
+
+    assert compaction.purge(school, retention=-1, batch_size=10, progress=batches.append) == 25
+    assert batches[:3] == [10, 20, 25]
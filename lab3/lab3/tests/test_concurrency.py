@@ -0,0 +1,54 @@
+import pytest
+
+import concurrency
+import dedup
+import listing
+from school import core
+
+
+def _student(conn, student_id='S1'):
+    return next(row for row in listing.rows(conn, limit=None) if row.entity_id == student_id)
+
+
+def test_update_name_increments_the_version(school):
+    row = _student(school)
+
+    updated = concurrency.update_name(school, row, 'Ann Smith')
+
+    assert updated.version == row.version + 1
+    assert concurrency.current_row(school, row.entity, row.row_id) == updated
+
+
+def test_stale_version_raises_with_the_current_row(school):
+    row = _student(school)
+    concurrency.update_name(school, row, 'Ann Smith')
+
+    with pytest.raises(concurrency.EditConflict) as conflict:
+        concurrency.update_name(school, row, 'Ann Jones')
+
+    assert conflict.value.current.name == 'Ann Smith'
+    assert _student(school).name == 'Ann Smith'
+
+
+def test_update_of_a_deleted_row_conflicts(school):
+    row = _student(school)
+    core.delete(school, row)
+
+    with pytest.raises(concurrency.EditConflict) as conflict:
+        concurrency.update_name(school, row, 'Ann Smith')
+
+    assert conflict.value.current is None
+
+
+def test_name_key_follows_the_edited_row_only(school):
+    # A second row with the same business id must keep its own name key.
+    core.add_student(school, 'Bob Stone', 21, 'bob@example.org', 'S1')
+    school.commit()
+    first, second = sorted((row for row in listing.rows(school, limit=None) if row.entity_id == 'S1'),
+                           key=lambda row: row.row_id)
+
+    concurrency.update_name(school, first, 'Carl Young')
+
+    keys = dict(school.execute('SELECT id, name_key FROM students'))
+    assert keys[first.row_id] == dedup.name_key('Carl Young')
+    assert keys[second.row_id] == dedup.name_key('Bob Stone')
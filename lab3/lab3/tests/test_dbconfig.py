@@ -0,0 +1,88 @@
+import argparse
+import sqlite3
+
+import pytest
+
+import dbconfig
+
+
+def _write_probe(config):
+    conn = config.connect()
+    try:
+        conn.execute('CREATE TABLE probe (x)')
+    finally:
+        conn.close()
+
+
+@pytest.mark.parametrize('name', ('school.db', 'odd ?name#1%.db'))
+def test_paths_are_escaped(tmp_path, name):
+    config = dbconfig.DatabaseConfig(str(tmp_path / name))
+
+    _write_probe(config)
+
+    assert (tmp_path / name).exists()
+
+
+@pytest.mark.parametrize('uri', ('file:{}', 'file:{}?cache=private', 'file:{}?mode=rw'))
+def test_read_only_applies_to_file_uris(tmp_path, uri):
+    path = tmp_path / 'school.db'
+    sqlite3.connect(path).close()
+    config = dbconfig.DatabaseConfig(uri.format(path), read_only=True)
+
+    assert config.uri().endswith('mode=ro')
+    assert config.is_read_only
+    with pytest.raises(sqlite3.OperationalError, match='readonly'):
+        _write_probe(config)
+
+
+def test_read_only_path(tmp_path):
+    path = tmp_path / 'school.db'
+    sqlite3.connect(path).close()
+
+    with pytest.raises(sqlite3.OperationalError, match='readonly'):
+        _write_probe(dbconfig.DatabaseConfig(str(path), read_only=True))
+
+
+def test_memory_databases_are_shared_between_connections():
+    config = dbconfig.DatabaseConfig('test-shared', mode='memory')
+    first = config.connect()
+    first.execute('CREATE TABLE probe (x)')
+    second = config.connect()
+
+    assert second.execute("SELECT count(*) FROM sqlite_master WHERE name = 'probe'").fetchone()[0] == 1
+    first.close()
+    second.close()
+
+
+def test_preload_copies_the_file_into_memory(tmp_path):
+    path = tmp_path / 'school.db'
+    with sqlite3.connect(path) as conn:
+        conn.execute('CREATE TABLE probe (x)')
+    config = dbconfig.DatabaseConfig(str(path), mode='preload')
+    first = config.connect()
+    first.execute('INSERT INTO probe VALUES (1)')
+    first.commit()
+    second = config.connect()
+
+    assert second.execute('SELECT count(*) FROM probe').fetchone()[0] == 1
+    first.close()
+    second.close()
+    with sqlite3.connect(path) as conn:
+        assert conn.execute('SELECT count(*) FROM probe').fetchone()[0] == 0
+
+
+def test_flags_override_the_environment_and_the_config_file(tmp_path):
+    ini = tmp_path / 'school.ini'
+    ini.write_text('[database]\npath = from-file.db\nmode = preload\nterm = 2024_fall\n')
+    parser = argparse.ArgumentParser()
+    dbconfig.add_arguments(parser)
+    args = parser.parse_args(['--config', str(ini), '--mode', 'file'])
+
+    config = dbconfig.from_args(args, environ={'SCHOOL_DB': 'from-env.db'})
+
+    assert (config.database, config.mode, config.term) == ('from-env.db', 'file', '2024_fall')
+
+
+def test_unknown_modes_are_refused():
+    with pytest.raises(ValueError):
+        dbconfig.DatabaseConfig(mode='disk')
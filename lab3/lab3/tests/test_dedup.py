@@ -0,0 +1,70 @@
+import pytest
+
+import dedup
+from school import core
+
+
+def _id(conn, student_id):
+    return conn.execute('SELECT id FROM students WHERE student_id = ?', (student_id,)).fetchone()[0]
+
+
+@pytest.mark.parametrize('a, b', (
+    ('Smith John', 'Jon Smyth'),
+    ('José Ñúñez', 'jose nunez'),
+    ('Ann  Lee', 'ann lee.'),
+))
+def test_name_keys_ignore_order_spelling_and_accents(a, b):
+    assert dedup.name_key(a) == dedup.name_key(b)
+
+
+def test_soundex_codes():
+    assert [dedup.soundex(word) for word in ('robert', 'rupert', 'ashcraft', 'tymczak', '42')] == [
+        'R163', 'R163', 'A261', 'T522', '']
+
+
+def test_check_finds_the_same_email_and_similar_names(school):
+    core.add_student(school, 'Anne Lee', 21, 'anne@example.org', 'S2')
+    core.add_student(school, 'Bob Stone', 22, 'bob@example.org', 'S3')
+    school.commit()
+
+    exact, similar = dedup.check(school, 'students', 'Bob Stone', ' ANN@example.org ')
+    assert exact == (_id(school, 'S1'), 'Ann Lee', 'ann@example.org')
+    assert similar == [(_id(school, 'S3'), 'Bob Stone', 'bob@example.org')]
+
+    exact, similar = dedup.check(school, 'students', 'Ann Lea', 'new@example.org')
+    assert exact is None
+    assert [row[1] for row in similar] == ['Anne Lee', 'Ann Lee']
+
+
+def test_check_ignores_deleted_rows(school):
+    school.execute("UPDATE students SET deleted_at = 1 WHERE student_id = 'S1'")
+
+    assert dedup.check(school, 'students', 'Ann Lee', 'ann@example.org') == (None, [])
+
+
+def test_find_duplicates_reports_each_pair_once(school):
+    core.add_student(school, 'Lee Ann', 21, 'other@example.org', 'S2')
+    core.add_student(school, 'Zed Quinn', 22, 'Ann@Example.org', 'S3')
+    core.add_student(school, 'Bob Stone', 23, 'bob@example.org', 'S4')
+    # Imported rows have no keys until the batch job fills them in.
+    school.execute("INSERT INTO students (name, age, email, student_id) "
+                   "VALUES ('Bobb Stone', 24, 'bobb@example.org', 'S5')")
+    school.commit()
+    s1, s2, s3, s4, s5 = (_id(school, f'S{n}') for n in range(1, 6))
+
+    pairs = {(a, b): (reason, round(score, 2)) for a, b, reason, score in dedup.find_duplicates(school, 'students')}
+
+    assert set(pairs) == {(s1, s2), (s1, s3), (s4, s5)}
+    assert pairs[(s1, s2)] == ('name', 1.0)
+    assert pairs[(s1, s3)] == ('email', 1.0)
+    assert pairs[(s4, s5)][0] == 'name'
+
+
+def test_find_duplicates_only_compares_within_the_window(school):
+    for n in range(2, 5):
+        core.add_student(school, 'Ann Lee', 20, f'ann{n}@example.org', f'S{n}')
+    school.commit()
+
+    pairs = [(a, b) for a, b, _, _ in dedup.find_duplicates(school, 'students', window=1)]
+
+    assert len(pairs) == 3
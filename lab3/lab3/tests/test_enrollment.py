@@ -0,0 +1,121 @@
+import sqlite3
+import threading
+
+import pytest
+
+import changelog
+import enrollment
+import schema
+from school import core
+
+
+def _enrolled(conn, course_id='C1'):
+    row = conn.execute('SELECT enrolled FROM course_enrollment WHERE course_id = ?', (course_id,)).fetchone()
+    return row[0] if row else 0
+
+
+@pytest.fixture
+def capped(school):
+    core.add_course(school, 'C2', 'Geometry', 'I1', capacity=2)
+    for n in range(2, 6):
+        core.add_student(school, f'Student {n}', 20, f's{n}@example.org', f'S{n}')
+    school.commit()
+    return school
+
+
+def test_a_full_course_refuses_registrations(capped):
+    enrollment.register(capped, 'S2', 'C2')
+    enrollment.register(capped, 'S3', 'C2')
+
+    with pytest.raises(enrollment.CourseFull):
+        enrollment.register(capped, 'S4', 'C2')
+
+    assert _enrolled(capped, 'C2') == 2
+    assert capped.execute("SELECT count(*) FROM registrations WHERE course_id = 'C2'").fetchone()[0] == 2
+
+
+def test_a_course_without_capacity_is_unlimited(capped):
+    for n in range(2, 6):
+        enrollment.register(capped, f'S{n}', 'C1')
+
+    assert _enrolled(capped) == 4
+
+
+def test_a_refused_duplicate_takes_no_seat(capped):
+    enrollment.register(capped, 'S2', 'C2')
+
+    with pytest.raises(enrollment.AlreadyRegistered):
+        enrollment.register(capped, 'S2', 'C2')
+
+    assert _enrolled(capped, 'C2') == 1
+
+
+def test_the_capacity_of_a_deleted_course_is_ignored(capped):
+    capped.execute("UPDATE courses SET deleted_at = 0 WHERE course_id = 'C2'")
+    core.add_course(capped, 'C2', 'Geometry II', 'I1', capacity=3)
+    capped.commit()
+
+    for n in range(2, 5):
+        enrollment.register(capped, f'S{n}', 'C2')
+    with pytest.raises(enrollment.CourseFull):
+        enrollment.register(capped, 'S5', 'C2')
+
+
+def test_missing_prerequisites_are_listed(capped):
+    core.add_course(capped, 'C3', 'Calculus', 'I1', prerequisites=['C1', 'C2'])
+    capped.commit()
+    enrollment.register(capped, 'S2', 'C1')
+
+    with pytest.raises(enrollment.MissingPrerequisites) as refused:
+        enrollment.register(capped, 'S2', 'C3')
+
+    assert refused.value.missing == ['C2']
+
+
+def test_a_deleted_course_is_not_a_prerequisite(capped):
+    capped.execute("UPDATE courses SET deleted_at = 0 WHERE course_id = 'C2'")
+
+    with pytest.raises(ValueError, match='C2'):
+        enrollment.add_prerequisites(capped, 'C1', ['C2'])
+    with pytest.raises(ValueError, match='C9'):
+        enrollment.add_prerequisites(capped, 'C1', ['C9'])
+
+    assert capped.execute('SELECT count(*) FROM prerequisites').fetchone()[0] == 0
+
+
+def test_concurrent_registrations_never_pass_the_capacity(capped, tmp_path):
+    capped.execute('PRAGMA journal_mode = WAL')
+    outcomes = []
+
+    def clerk(student_id):
+        conn = sqlite3.connect(tmp_path / 'school.db', timeout=30)
+        try:
+            enrollment.register(conn, student_id, 'C2')
+            outcomes.append('registered')
+        except enrollment.CourseFull:
+            outcomes.append('full')
+        finally:
+            conn.close()
+
+    threads = [threading.Thread(target=clerk, args=(f'S{n}',)) for n in range(1, 6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(outcomes) == ['full'] * 3 + ['registered'] * 2
+    assert _enrolled(capped, 'C2') == 2
+
+
+def test_sync_recounts_the_enrollment(capped, tmp_path):
+    enrollment.register(capped, 'S2', 'C2')
+    copy = sqlite3.connect(tmp_path / 'copy.db')
+    schema.initialize(copy)
+
+    changelog.sync(capped, copy)
+
+    assert _enrolled(copy, 'C2') == 1
+    enrollment.register(copy, 'S3', 'C2')
+    with pytest.raises(enrollment.CourseFull):
+        enrollment.register(copy, 'S4', 'C2')
+    copy.close()
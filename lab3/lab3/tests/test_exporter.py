@@ -0,0 +1,131 @@
+import csv
+import json
+import os
+import sqlite3
+
+import pytest
+
+import columnar
+import exporter
+from school import core
+
+
+@pytest.fixture
+def people(school):
+    core.add_student(school, "Bob O'Neil", 25, 'bob@example.org', 'S2')
+    core.add_student(school, 'Anna Bell', 30, 'anna@example.org', 'S3')
+    school.execute("UPDATE students SET deleted_at = 1 WHERE student_id = 'S3'")
+    school.commit()
+    return school
+
+
+def _export(conn, tmp_path, format, **options):
+    path = str(tmp_path / ('students' + exporter.WRITERS[format].suffix))
+    result = exporter.export_table(conn, 'students', path, format, **options)
+    return result, path
+
+
+@pytest.mark.parametrize('text, parsed', (
+    ('age>=21', ('age', '>=', 21)),
+    ('age<=21', ('age', '<=', 21)),
+    ('age<21', ('age', '<', 21)),
+    ('age > 2.5', ('age', '>', 2.5)),
+    ('name!=Ann', ('name', '!=', 'Ann')),
+    ('name~An', ('name', '~', 'An')),
+    ('name=a<b', ('name', '=', 'a<b')),
+    ('name<a=b', ('name', '<', 'a=b')),
+))
+def test_parse_filter_uses_the_first_operator_in_the_text(text, parsed):
+    assert exporter.parse_filter(text) == parsed
+
+
+@pytest.mark.parametrize('text', ('age', '>=21', ''))
+def test_parse_filter_refuses_text_without_a_column_and_operator(text):
+    with pytest.raises(ValueError):
+        exporter.parse_filter(text)
+
+
+def test_csv_has_a_header_and_skips_deleted_rows(people, tmp_path):
+    result, path = _export(people, tmp_path, 'csv', columns=['name', 'age'])
+
+    with open(path, newline='', encoding='utf-8') as file:
+        assert list(csv.reader(file)) == [['name', 'age'], ['Ann Lee', '20'], ["Bob O'Neil", '25']]
+    assert result.rows == 2
+    assert result.bytes == os.path.getsize(path)
+
+
+def test_jsonl_writes_one_object_per_row(people, tmp_path):
+    _, path = _export(people, tmp_path, 'jsonl', columns=['student_id', 'age'], include_deleted=True)
+
+    with open(path, encoding='utf-8') as file:
+        assert [json.loads(line) for line in file] == [
+            {'student_id': 'S1', 'age': 20}, {'student_id': 'S2', 'age': 25}, {'student_id': 'S3', 'age': 30}]
+
+
+def test_sql_dump_loads_into_an_empty_table(people, tmp_path):
+    _, path = _export(people, tmp_path, 'sql', columns=['id', 'name', 'age'], batch_size=1)
+    copy = sqlite3.connect(':memory:')
+    copy.execute('CREATE TABLE students (id INTEGER PRIMARY KEY, name TEXT, age INTEGER)')
+
+    with open(path, encoding='utf-8') as file:
+        copy.executescript(file.read())
+
+    assert copy.execute('SELECT id, name, age FROM students').fetchall() == people.execute(
+        'SELECT id, name, age FROM students WHERE deleted_at IS NULL').fetchall()
+
+
+def test_scol_export_imports_back(people, tmp_path):
+    _, path = _export(people, tmp_path, 'scol', columns=['id', 'name', 'age'])
+    copy = sqlite3.connect(':memory:')
+    copy.execute('CREATE TABLE students (id INTEGER PRIMARY KEY, name TEXT, age INTEGER)')
+
+    assert columnar.import_tables(copy, str(tmp_path), tables=['students']) == {'students': 2}
+    assert copy.execute('SELECT name, age FROM students ORDER BY id').fetchall() == [
+        ('Ann Lee', 20), ("Bob O'Neil", 25)]
+
+
+@pytest.mark.parametrize('filters, names', (
+    ([('age', '>=', 25)], ["Bob O'Neil"]),
+    ([('name', '~', 'ann')], ['Ann Lee']),
+    ([('name', '~', '%')], []),
+    ([('age', '<', 30), ('name', '!=', 'Ann Lee')], ["Bob O'Neil"]),
+))
+def test_filters_select_the_rows(people, filters, names):
+    _, sql, parameters = exporter.select(people, 'students', ['name'], filters)
+
+    assert [row[0] for row in people.execute(sql, parameters)] == names
+
+
+def test_unknown_columns_and_operators_are_refused(people):
+    with pytest.raises(ValueError):
+        exporter.select(people, 'students', ['nickname'])
+    with pytest.raises(ValueError):
+        exporter.select(people, 'students', None, [('age', '<>', 1)])
+
+
+def test_a_failed_export_leaves_no_file(people, tmp_path):
+    def stop(rows, size):
+        raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        exporter.export_table(people, 'students', str(tmp_path / 'students.csv'), progress=stop)
+
+    assert os.listdir(tmp_path) == ['school.db']
+
+
+def test_export_tables_writes_one_file_per_table(people, tmp_path):
+    path = str(tmp_path / 'school.db')
+    totals = []
+
+    results = exporter.export_tables(lambda: sqlite3.connect(path), str(tmp_path / 'out'), format='jsonl',
+                                     progress=totals.append)
+
+    assert [result.table for result in results] == ['students', 'instructors', 'courses', 'registrations']
+    assert sorted(os.listdir(tmp_path / 'out')) == sorted(f'{result.table}.jsonl' for result in results)
+    assert totals[-1] == sum(result.bytes for result in results)
+
+
+def test_writer_for_picks_the_format_by_suffix():
+    assert exporter.writer_for('out/students.JSONL') is exporter.JsonLinesWriter
+    with pytest.raises(ValueError):
+        exporter.writer_for('students.xlsx')
@@ -0,0 +1,53 @@
+import sqlite3
+
+import concurrency
+import listing
+
+
+def test_change_polling_survives_a_locked_database(app, monkeypatch):
+    window, _ = app
+
+    def locked(self, conn, shown):
+        raise sqlite3.OperationalError('database is locked')
+
+    monkeypatch.setattr(concurrency.ChangePoller, 'poll', locked)
+    window.poll_changes()
+
+    assert window.scheduled == [window.poll_changes]
+
+
+def test_change_polling_stops_without_a_change_log(app):
+    window, _ = app
+    window.db_connection.execute('DROP TABLE change_log')
+
+    window.poll_changes()
+
+    assert window.scheduled == []
+
+
+def test_change_polling_shows_other_users_renames(app, school):
+    window, _ = app
+    row = next(row for row in listing.rows(school, limit=None) if row.entity_id == 'S1')
+    window.search_entry.set('Ann Lee')
+    window.search()
+    window.poll_changes()
+
+    concurrency.update_name(school, row, 'Ann Smith')
+    school.commit()
+    window.poll_changes()
+
+    assert window.view_all_table.item(row.iid, 'values')[1] == 'Ann Smith'
+    assert len(window.scheduled) == 2
+
+
+def test_change_polling_removes_rows_deleted_elsewhere(app, school):
+    window, _ = app
+    window.search_entry.set('Ann Lee')
+    window.search()
+    window.poll_changes()
+
+    school.execute("DELETE FROM students WHERE student_id = 'S1'")
+    school.commit()
+    window.poll_changes()
+
+    assert not window.view_all_table.get_children()
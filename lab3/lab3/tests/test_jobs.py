@@ -0,0 +1,83 @@
+import threading
+import time
+
+import pytest
+
+import jobs
+
+
+def _wait(queue, timeout=5):
+    """Dispatches callbacks on this thread until no job is left."""
+    deadline = time.monotonic() + timeout
+    while queue.jobs:
+        if time.monotonic() > deadline:
+            raise AssertionError('jobs did not finish')
+        queue.dispatch()
+        time.sleep(0.001)
+
+
+def test_callbacks_run_on_the_dispatching_thread():
+    queue = jobs.JobQueue()
+    threads = []
+
+    def record(*args):
+        threads.append(threading.current_thread())
+
+    def count(job):
+        for done in range(1, 4):
+            job.progress(done, total=3)
+            job.post(record)
+        return 'counted'
+
+    job = queue.submit('Count', count, on_done=record)
+    _wait(queue)
+
+    assert (job.state, job.result, job.fraction) == (jobs.DONE, 'counted', 1.0)
+    assert threads == [threading.current_thread()] * 4
+    assert job.describe().startswith('Count: 3/3 rows in ')
+    assert queue.last_finished is job
+
+
+def test_a_failed_job_reports_its_error():
+    queue = jobs.JobQueue()
+    failed = []
+
+    def fail(job):
+        raise OSError('disk full')
+
+    job = queue.submit('Backup', fail, on_error=failed.append)
+    _wait(queue)
+
+    assert failed == [job]
+    assert job.describe() == 'Backup: failed (disk full)'
+
+
+def test_cancelling_stops_the_running_job_and_skips_the_queued_ones():
+    queue = jobs.JobQueue()
+    started = threading.Event()
+    ran = []
+
+    def forever(job):
+        started.set()
+        while True:
+            job.progress(job.done + 1)
+            time.sleep(0.001)
+
+    running = queue.submit('Load', forever)
+    waiting = queue.submit('Export', ran.append)
+    assert started.wait(5)
+    assert queue.running == [running] and queue.queued == [waiting]
+
+    queue.cancel_all()
+    _wait(queue)
+
+    assert (running.state, waiting.state) == (jobs.CANCELLED, jobs.CANCELLED)
+    assert ran == []
+
+
+@pytest.mark.parametrize('done, total, expected', ((0, None, None), (5, 10, 0.5), (20, 10, 1.0)))
+def test_fraction(done, total, expected):
+    job = jobs.Job(jobs.JobQueue(), 'Export', None, total=total)
+    job.done = done
+
+    assert job.fraction == expected
@@ -0,0 +1,91 @@
+import pytest
+
+import listing
+import records
+from school import core
+
+
+@pytest.fixture
+def listed(school):
+    # Shared names and IDs across and within types, so pages end inside runs of ties.
+    for n in range(30):
+        core.add_student(school, f'Name {n % 7}', 20, f's{n}@example.org', f'X{n % 5}')
+        core.add_instructor(school, f'name {n % 4}', 40, f'i{n}@example.org', f'x{n % 3}')
+    school.commit()
+    return school
+
+
+def _pages(conn, sort, descending, filters=None, limit=7):
+    shown = []
+    after = None
+    while True:
+        page = list(listing.rows(conn, sort, descending, filters, after, limit))
+        shown += page
+        if len(page) < limit:
+            return shown
+        after = listing.sort_key(page[-1], sort)
+
+
+@pytest.mark.parametrize('sort', listing.COLUMNS)
+@pytest.mark.parametrize('descending', (False, True))
+def test_keyset_pages_cover_every_row_once_in_order(listed, sort, descending):
+    everything = list(listing.rows(listed, sort, descending, limit=None))
+
+    assert _pages(listed, sort, descending) == everything
+    keys = [listing.sort_key(row, sort) for row in everything]
+    assert keys == sorted(keys, reverse=descending)
+    assert len(everything) == len(set(everything)) == listing.count(listed) == 63
+
+
+def test_keyset_pages_with_a_prefix_filter(listed):
+    everything = list(listing.rows(listed, 'ID', False, {'ID': 'x'}, limit=None))
+
+    assert _pages(listed, 'ID', False, {'ID': 'x'}) == everything
+    assert {row[0][0] for row in everything} == {'X', 'x'}
+
+
+def test_the_type_filter_selects_entities(listed):
+    assert [row[:3] for row in listing.rows(listed, filters={'Type': 'co'})] == [('C1', 'Algebra', 'Course')]
+    with pytest.raises(ValueError):
+        listing.rows(listed, 'Age')
+
+
+@pytest.mark.parametrize('sort', ('ID', 'Name'))
+def test_a_page_merges_the_arms_in_index_order(listed, sort):
+    sql, params = listing.query(sort, after=('name 1', 'Instructor', 3))
+    plan = [row[3] for row in listed.execute('EXPLAIN QUERY PLAN ' + sql, params)]
+
+    # Only ties of the sort value are sorted (the "right part" of the ORDER BY).
+    assert 'USE TEMP B-TREE FOR ORDER BY' not in plan
+    assert 'MERGE (UNION ALL)' in plan
+    assert len([step for step in plan if step.startswith('SEARCH') and 'USING INDEX' in step]) == 3
+
+
+def test_the_entities_view_carries_the_type(listed):
+    counts = listed.execute('SELECT type, count(*) FROM entities GROUP BY type ORDER BY type').fetchall()
+
+    assert counts == [('Course', 1), ('Instructor', 31), ('Student', 31)]
+
+
+def test_deleted_rows_leave_the_pages(listed):
+    row = next(listing.rows(listed, 'Name', False, limit=1))
+    core.delete(listed, row)
+
+    assert row not in _pages(listed, 'Name', False)
+    assert listing.count(listed) == 62
+
+
+def test_rows_loaded_from_a_file_are_resolved_by_business_id(school):
+    loaded = records.ListingRow.from_item('csv:0', ('S1', 'Ann Lee', 'Student'))
+    assert loaded.row_id is None
+
+    row = core.resolve(school, loaded)
+
+    assert row == next(listing.rows(school, filters={'Type': 'Student'}))
+
+
+def test_resolving_an_ambiguous_business_id_fails(school):
+    core.add_student(school, 'Bob Stone', 21, 'bob@example.org', 'S1')
+
+    with pytest.raises(LookupError):
+        core.resolve(school, records.ListingRow.from_item('csv:0', ('S1', 'Bob Stone', 'Student')))
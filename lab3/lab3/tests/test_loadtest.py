@@ -0,0 +1,36 @@
+import io
+
+import bench
+import loadtest
+
+
+def test_the_handlers_run_without_a_display(app):
+    window, dialogs = app
+    for entry, value in (('student_name', 'Bob Stone'), ('student_age', '21'),
+                         ('student_email', 'bob@example.org'), ('student_id', 'S2')):
+        getattr(window, entry).set(value)
+    window.add_student()
+    window.student_dropdown.set('Bob Stone')
+    window.course_dropdown.set('Algebra')
+    window.register_course()
+    window.search_entry.set('Stone')
+    window.search()
+
+    assert dialogs.take() == []
+    table = window.view_all_table
+    assert [tuple(table.item(item, 'values')) for item in table.get_children()] == [('S2', 'Bob Stone', 'Student')]
+    assert window.db_connection.execute('SELECT student_id, course_id FROM registrations').fetchall() == [('S2', 'C1')]
+
+
+def test_parallel_clerks_are_never_locked_out(school, tmp_path):
+    school.execute('PRAGMA journal_mode = WAL')
+    bench.populate(school, 200)
+    school.commit()
+
+    samples, elapsed = loadtest.run(str(tmp_path / 'school.db'), clerks=2, operations=15)
+    out = io.StringIO()
+    loadtest.report(samples, elapsed, out)
+
+    assert {operation for operation, _, _, _ in samples} <= set(loadtest.OPERATIONS)
+    assert not any(locked for _, _, locked, _ in samples)
+    assert f'database is locked: 0 of {len(samples)} calls' in out.getvalue()
@@ -0,0 +1,45 @@
+import io
+import tracemalloc
+
+import pytest
+
+import memprofile
+
+
+@pytest.fixture
+def profiler(tmp_path):
+    profiler = memprofile.MemoryProfiler(str(tmp_path / 'profile.jsonl'))
+    yield profiler
+    if tracemalloc.is_tracing():
+        profiler.close()
+
+
+def test_one_record_per_outer_handler_call(profiler):
+    kept = []
+    inner = profiler.wrap('refresh_view_all', lambda: kept.append(bytearray(10 ** 6)), None)
+    outer = profiler.wrap('search', lambda: inner(), None)
+
+    outer()
+    outer()
+    profiler.close()
+
+    calls = memprofile.read(profiler.path)
+    assert [call['handler'] for call in calls] == ['search', 'search']
+    assert all(call['retained'] >= 10 ** 6 for call in calls)
+    summary = memprofile.summarize(calls)['search']
+    assert summary['calls'] == 2 and summary['retained'] >= 2 * 10 ** 6
+    assert not tracemalloc.is_tracing()
+
+
+def test_report_compares_two_profiles(profiler, tmp_path):
+    profiler.wrap('search', lambda: None, None)()
+    profiler.close()
+    later = memprofile.MemoryProfiler(str(tmp_path / 'later.jsonl'))
+    later.wrap('delete', lambda: None, None)()
+    later.close()
+    out = io.StringIO()
+
+    memprofile.report(profiler.path, later.path, out=out)
+
+    assert f'search             only in {profiler.path}' in out.getvalue()
+    assert f'delete             only in {later.path}' in out.getvalue()
@@ -0,0 +1,88 @@
+import sqlite3
+
+import pytest
+
+import migrations
+
+
+class Stop(Exception):
+    pass
+
+
+@pytest.fixture
+def items(tmp_path):
+    conn = sqlite3.connect(tmp_path / 'items.db')
+    conn.execute('CREATE TABLE items (id INTEGER PRIMARY KEY, value INTEGER NOT NULL, doubled INTEGER)')
+    conn.executemany('INSERT INTO items (value) VALUES (?)', ((n,) for n in range(95)))
+    conn.commit()
+    yield conn
+    conn.close()
+
+
+def _backfill(computed, batch_size=10):
+    def double(value):
+        computed.append(value)
+        return (value * 2,)
+
+    return [migrations.Migration(1, 'double the values', (
+        migrations.Backfill('items', ('doubled',), ('value',), double, 'doubled IS NULL', batch_size),))]
+
+
+def test_an_interrupted_backfill_resumes_where_it_stopped(items):
+    computed = []
+    steps = _backfill(computed)
+
+    def stop_after_three_batches(done, total):
+        if done == 30:
+            raise Stop
+
+    with pytest.raises(Stop):
+        migrations.migrate(items, steps, progress=stop_after_three_batches)
+
+    assert migrations.version(items) == 0
+    assert migrations.status(items, steps)[0][1] == 'interrupted at step 1/1: fill in doubled of items, after row id 30'
+    assert items.execute('SELECT count(*) FROM items WHERE doubled IS NOT NULL').fetchone()[0] == 30
+
+    assert migrations.migrate(items, steps) == steps
+    assert migrations.version(items) == 1
+    assert sorted(computed) == list(range(95))
+    assert items.execute('SELECT count(*) FROM items WHERE doubled = 2 * value').fetchone()[0] == 95
+    assert migrations.status(items, steps)[0][1] == 'applied'
+
+
+def test_a_backfill_reports_its_progress(items):
+    reported = []
+
+    migrations.migrate(items, _backfill([], batch_size=40), progress=lambda done, total: reported.append((done, total)))
+
+    assert reported == [(40, 95), (80, 95), (95, 95)]
+
+
+def test_only_offline_migrations_are_required(items):
+    steps = _backfill([]) + [migrations.Migration(2, 'index the values', (
+        migrations.CreateIndex('idx_items_value', 'items', 'value'),), online=True)]
+
+    assert migrations.required(items, steps) == 1
+    migrations.migrate(items, steps, target=migrations.required(items, steps))
+    assert [migration.version for migration in migrations.pending(items, steps)] == [2]
+
+    migrations.migrate(items, steps)
+    assert items.execute("SELECT 1 FROM sqlite_master WHERE name = 'idx_items_value'").fetchone()
+
+
+def test_an_index_build_over_its_lock_budget_is_rolled_back(items, monkeypatch):
+    monkeypatch.setattr(migrations, 'BACKOFF', 0)
+    items.executemany('INSERT INTO items (value) VALUES (?)', ((n,) for n in range(200000)))
+    items.commit()
+    steps = [migrations.Migration(1, 'index the values', (
+        migrations.CreateIndex('idx_items_value', 'items', 'value'),), online=True)]
+
+    with pytest.raises(migrations.LockBudgetExceeded):
+        migrations.migrate(items, steps, lock_budget=0)
+
+    assert not items.in_transaction
+    assert not items.execute("SELECT 1 FROM sqlite_master WHERE name = 'idx_items_value'").fetchone()
+    assert migrations.version(items) == 0
+
+    migrations.migrate(items, steps, lock_budget=None)
+    assert migrations.version(items) == 1
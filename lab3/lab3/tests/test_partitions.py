@@ -0,0 +1,104 @@
+import os
+import sqlite3
+
+import pytest
+
+import columnar
+import exporter
+import partitions
+from school import core
+
+
+@pytest.fixture
+def terms(school, tmp_path):
+    directory = str(tmp_path / 'terms')
+    core.add_course(school, 'C2', 'Geometry', 'I1', prerequisites=['C1'])
+    school.commit()
+    spring = partitions.TermPartitions(school, directory, '2024_spring')
+    core.register(school, 'Ann Lee', 'Algebra', spring.schema, partitions.VIEW)
+    return directory
+
+
+def _reopen(conn, directory, term):
+    # A new term starts with a new connection, as when the application is restarted.
+    for name in [row[1] for row in conn.execute('PRAGMA database_list')][2:]:
+        conn.execute(f'DETACH DATABASE {name}')
+    return partitions.TermPartitions(conn, directory, term)
+
+
+def test_registrations_go_to_the_current_term(school, terms):
+    assert os.path.exists(partitions.term_file(terms, '2024_spring'))
+    assert school.execute('SELECT term, student_id, course_id FROM all_registrations').fetchall() == [
+        ('2024_spring', 'S1', 'C1')]
+    assert school.execute('SELECT count(*) FROM main.registrations').fetchone()[0] == 0
+
+
+def test_an_archived_term_is_read_back_through_the_history(school, terms):
+    partitions.archive_term_file(terms, '2024_spring')
+    fall = _reopen(school, terms, '2024_fall')
+
+    assert fall.terms == {'2024_fall': False}
+    assert partitions.list_terms(terms, archived=True) == ['2024_spring']
+    with fall.history() as view:
+        assert school.execute(f'SELECT term, course_id FROM {view}').fetchall() == [('2024_spring', 'C1')]
+        core.register(school, 'Ann Lee', 'Geometry', fall.schema, view)
+    assert fall.terms == {'2024_fall': False}
+    assert school.execute('SELECT term, course_id FROM all_registrations').fetchall() == [('2024_fall', 'C2')]
+
+
+def test_archived_terms_are_read_only(school, terms):
+    partitions.archive_term_file(terms, '2024_spring')
+    fall = _reopen(school, terms, '2024_fall')
+
+    with fall.history():
+        with pytest.raises(sqlite3.OperationalError, match='readonly'):
+            school.execute("INSERT INTO term_2024_spring.registrations (student_id, course_id) VALUES ('S1', 'C2')")
+
+
+def test_archiving_an_open_term_detaches_it(school, terms):
+    fall = _reopen(school, terms, '2024_fall')
+    assert fall.open_schemas == ['term_2024_fall', 'term_2024_spring']
+
+    fall.archive_term('2024_spring')
+
+    assert fall.open_schemas == ['term_2024_fall']
+    assert os.path.exists(partitions.term_file(terms, '2024_spring', archived=True))
+    with pytest.raises(ValueError):
+        fall.archive_term('2024_fall')
+
+
+def test_an_archived_term_cannot_be_current(school, terms):
+    partitions.archive_term_file(terms, '2024_spring')
+
+    with pytest.raises(ValueError):
+        _reopen(school, terms, '2024_spring')
+
+
+def test_too_many_terms_fail_clearly(school, terms):
+    fall = _reopen(school, terms, '2024_fall')
+    for n in range(12):
+        open(partitions.term_file(terms, f'old_{n}', archived=True), 'wb').close()
+
+    with pytest.raises(partitions.TooManyTerms, match='at most'):
+        with fall.history():
+            pass
+    assert fall.terms == {'2024_fall': False, '2024_spring': False}
+
+
+def test_exports_include_every_term(school, terms, tmp_path):
+    partitions.archive_term_file(terms, '2024_spring')
+    _reopen(school, terms, '2024_fall')
+    path = str(tmp_path / 'school.db')
+
+    results = exporter.export_tables(lambda: sqlite3.connect(path), str(tmp_path / 'out'), terms_dir=terms)
+    counts = columnar.export_tables(school, str(tmp_path / 'snapshot'), terms_dir=terms, use_parquet=False)
+
+    assert {result.table: result.rows for result in results}['registrations_2024_spring'] == 1
+    assert counts['registrations_2024_spring'] == 1
+    assert counts['registrations_2024_fall'] == 0
+
+
+@pytest.mark.parametrize('term', ('2024 fall', '../x', ''))
+def test_term_names_are_checked(tmp_path, term):
+    with pytest.raises(ValueError):
+        partitions.term_file(str(tmp_path), term)
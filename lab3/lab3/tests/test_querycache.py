@@ -0,0 +1,98 @@
+import sqlite3
+
+import pytest
+
+import querycache
+from school import core
+
+NAMES = 'SELECT name FROM students WHERE deleted_at IS NULL ORDER BY id'
+COURSES = 'SELECT course_name FROM courses ORDER BY id'
+
+
+@pytest.fixture
+def cache(school):
+    return querycache.QueryCache(school)
+
+
+def _names(cache):
+    return [row[0] for row in cache.execute(NAMES, (), ('students',))]
+
+
+def test_a_repeated_query_is_answered_from_the_cache(cache):
+    assert _names(cache) == _names(cache) == ['Ann Lee']
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+@pytest.mark.parametrize('change', (
+    "INSERT INTO students (name, age, email, student_id) VALUES ('Bob Stone', 21, 'bob@example.org', 'S2')",
+    "UPDATE students SET name = 'Ann Smith'",
+    'UPDATE students SET deleted_at = 1',
+    'DELETE FROM students',
+))
+def test_changes_through_the_same_connection_invalidate(cache, school, change):
+    before = _names(cache)
+
+    school.execute(change)
+
+    assert _names(cache) != before
+    assert cache.hits == 0
+
+
+def test_commits_through_another_connection_invalidate(cache, tmp_path):
+    _names(cache)
+    other = sqlite3.connect(tmp_path / 'school.db')
+    core.add_student(other, 'Bob Stone', 21, 'bob@example.org', 'S2')
+    other.commit()
+    other.close()
+
+    assert _names(cache) == ['Ann Lee', 'Bob Stone']
+    assert cache.hits == 0
+
+
+def test_a_change_to_another_table_keeps_the_entry(cache, school):
+    _names(cache)
+
+    school.execute("INSERT INTO courses (course_id, course_name, instructor_id) VALUES ('C2', 'Geometry', 'I1')")
+
+    assert _names(cache) == ['Ann Lee']
+    assert cache.hits == 1
+
+
+def test_without_a_change_log_any_commit_invalidates(tmp_path):
+    # E.g. a read-only copy: the versions fall back to the commit counters.
+    path = tmp_path / 'plain.db'
+    conn = sqlite3.connect(path)
+    conn.execute('CREATE TABLE courses (id INTEGER PRIMARY KEY, course_name TEXT)')
+    conn.execute('CREATE TABLE students (id INTEGER PRIMARY KEY, name TEXT)')
+    conn.commit()
+    cache = querycache.QueryCache(conn)
+    cache.execute(COURSES, (), ('courses',))
+    other = sqlite3.connect(path)
+    other.execute("INSERT INTO students (name) VALUES ('Ann Lee')")
+    other.commit()
+    other.close()
+
+    cache.execute(COURSES, (), ('courses',))
+
+    assert cache.hits == 0
+    conn.close()
+
+
+def test_results_over_the_row_bound_are_streamed_not_cached(school):
+    cache = querycache.QueryCache(school, max_rows=1)
+    core.add_student(school, 'Bob Stone', 21, 'bob@example.org', 'S2')
+
+    assert [row[0] for row in cache.execute(NAMES, (), ('students',))] == ['Ann Lee', 'Bob Stone']
+    assert len(cache) == 0
+
+
+def test_the_least_recently_used_entries_are_evicted(school):
+    cache = querycache.QueryCache(school, max_entries=2)
+    queries = [(NAMES, ()), (COURSES, ()), ('SELECT name FROM instructors', ())]
+    for sql, parameters in queries:
+        cache.execute(sql, parameters, ('students', 'courses', 'instructors'))
+
+    cache.execute(*queries[0], ('students', 'courses', 'instructors'))
+
+    assert len(cache) == 2
+    assert cache.misses == 4
@@ -0,0 +1,35 @@
+import pytest
+
+import listing
+import records
+
+
+def test_listing_rows_round_trip_through_treeview_items(school):
+    row = next(listing.rows(school, filters={'Type': 'Student'}))
+
+    assert isinstance(row, records.ListingRow)
+    assert row.iid == f'Student:{row.row_id}'
+    assert records.ListingRow.from_item(row.iid, row.values, row.version) == row
+    assert row.entity.table == 'students'
+
+
+@pytest.mark.parametrize('batch_size', (1, 2, 100))
+def test_a_column_store_returns_the_rows_it_was_filled_with(school, batch_size):
+    school.execute("INSERT INTO students (name, age, email, student_id) VALUES ('Zoë Ångström', 30, '', 'S2')")
+    rows = school.execute(records.select_sql('students')).fetchall()
+
+    store = records.ColumnStore.from_cursor(records.Student, school.execute(records.select_sql('students')),
+                                            batch_size=batch_size)
+
+    assert list(store) == rows
+    assert store[1].name == 'Zoë Ångström'
+    assert list(store.column('age')) == [20, 30]
+    assert len(store) == 2
+
+
+def test_columns_keep_nulls():
+    store = records.ColumnStore(records.Registration)
+    store.extend([(1, 'S1', None), (None, None, 'C1')])
+
+    assert list(store) == [(1, 'S1', None), (None, None, 'C1')]
+    assert store.nbytes > 0
@@ -0,0 +1,51 @@
+import os
+import sqlite3
+
+import pytest
+
+import dbconfig
+import replica
+
+
+def _names(conn):
+    return [name for (name,) in conn.execute('SELECT name FROM students ORDER BY id')]
+
+
+def test_the_replica_shows_the_primary_as_of_its_last_refresh(school, tmp_path):
+    config = dbconfig.DatabaseConfig(str(tmp_path / 'school.db'), mode='replica', refresh_interval=3600)
+    first = config.connect()
+    school.execute("UPDATE students SET name = 'Ann Smith'")
+    school.commit()
+
+    second = config.connect()
+
+    assert _names(first) == _names(second) == ['Ann Lee']
+    assert config.is_read_only
+    with pytest.raises(sqlite3.OperationalError, match='readonly'):
+        second.execute('DELETE FROM students')
+    first.close()
+    second.close()
+
+
+def test_a_stale_replica_is_refreshed_on_connect(school, tmp_path):
+    config = dbconfig.DatabaseConfig(str(tmp_path / 'school.db'), mode='replica', refresh_interval=60)
+    config.connect().close()
+    school.execute("UPDATE students SET name = 'Ann Smith'")
+    school.commit()
+    os.utime(config.replica_path, (0, 0))
+
+    assert replica.is_stale(config.replica_path, 60)
+    conn = config.connect()
+
+    assert _names(conn) == ['Ann Smith']
+    assert not replica.is_stale(config.replica_path, 60)
+    assert replica.describe(replica.as_of(config.replica_path)).startswith('Reporting replica, data as of ')
+    conn.close()
+
+
+def test_there_is_no_snapshot_before_the_first_refresh(tmp_path):
+    path = replica.replica_path(f'file:{tmp_path}/school.db?mode=ro')
+
+    assert path == f'{tmp_path}/school.db.replica'
+    assert replica.as_of(path) is None
+    assert replica.describe(None) == 'Reporting replica, no snapshot yet'
@@ -0,0 +1,14 @@
+import sqlite3
+
+import schema
+
+
+def test_initialize_creates_the_tables_once(tmp_path):
+    conn = sqlite3.connect(tmp_path / 'school.db')
+
+    assert schema.initialize(conn)
+    assert conn.execute('PRAGMA user_version').fetchone()[0] == schema.SCHEMA_VERSION
+    conn.execute('DROP TABLE registrations')
+
+    assert not schema.initialize(conn)
+    assert not conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'registrations'").fetchone()
@@ -0,0 +1,23 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _imports(code):
+    """Runs code in a fresh interpreter and returns the modules it imported."""
+    result = subprocess.run([sys.executable, '-c', code + '\nimport sys\nprint(" ".join(sys.modules))'],
+                            cwd=ROOT, capture_output=True, text=True, check=True)
+    return set(result.stdout.split())
+
+
+@pytest.mark.parametrize('code', ('import school', 'from school import core'))
+def test_importing_the_package_does_not_import_tk(code):
+    modules = _imports(code)
+
+    assert 'school' in modules
+    assert not {'tkinter', 'school.gui'} & modules
+
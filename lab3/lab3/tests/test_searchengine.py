@@ -0,0 +1,114 @@
+import sqlite3
+import threading
+
+import pytest
+
+import listing
+import querycache
+import searchengine
+from school import core
+
+
+@pytest.fixture
+def named(conn, tmp_path):
+    core.add_instructor(conn, 'ANN', 40, 'ann.i@example.org', 'I1')
+    core.add_instructor(conn, 'Hanna Ray', 41, 'hanna@example.org', 'I2')
+    for n, name in enumerate(('Joanne Park', 'Ann', 'Anne Lee', 'ann', 'Bob Stone', 'Annika Berg')):
+        core.add_student(conn, name, 20, f's{n}@example.org', f'S{n}')
+    core.add_course(conn, 'C1', 'Annals of Rome', 'I1')
+    core.add_course(conn, 'C2', 'Scanning', 'I1')
+    conn.commit()
+    return conn
+
+
+@pytest.fixture
+def opened(tmp_path):
+    connections = []
+    lock = threading.Lock()
+
+    def connect():
+        connection = sqlite3.connect(tmp_path / 'school.db', check_same_thread=False)
+        with lock:
+            connections.append(connection)
+        return connection
+
+    engine = searchengine.SearchEngine(connect)
+    yield engine, connections
+    engine.close()
+
+
+def _names(rows):
+    return [(row.name, row.type) for row in rows]
+
+
+def test_exact_matches_come_before_prefix_before_substring(named, opened):
+    engine, _ = opened
+
+    assert _names(engine.search('ann')) == [
+        ('ANN', 'Instructor'), ('Ann', 'Student'), ('ann', 'Student'),
+        ('Annals of Rome', 'Course'), ('Anne Lee', 'Student'), ('Annika Berg', 'Student'),
+        ('Hanna Ray', 'Instructor'), ('Joanne Park', 'Student'), ('Scanning', 'Course'),
+    ]
+
+
+def test_a_tier_is_merged_by_name_type_and_row_id(named, opened):
+    engine, _ = opened
+
+    rows = list(engine.search('an'))
+
+    for tier in (rows[:3], rows[3:]):
+        assert tier == sorted(tier, key=lambda row: (listing.nocase(row.name), row.type, row.row_id))
+    assert {row.type for row in rows} == {'Student', 'Instructor', 'Course'}
+
+
+def test_only_the_top_k_are_returned(named, opened):
+    engine, _ = opened
+
+    assert _names(engine.search('ann', limit=4)) == _names(engine.search('ann'))[:4]
+    assert _names(engine.search('ann', limit=2)) == [('ANN', 'Instructor'), ('Ann', 'Student')]
+    assert list(engine.search('ann', limit=0)) == []
+
+
+def test_deleted_rows_are_not_found(named, opened):
+    engine, _ = opened
+    row = next(row for row in engine.search('bob'))
+    core.delete(named, row)
+    named.commit()
+
+    assert list(engine.search('bob')) == []
+
+
+def test_close_closes_the_worker_connections(named, opened):
+    engine, connections = opened
+    list(engine.search('ann'))
+
+    engine.close()
+
+    assert len(connections) == 3
+    for connection in connections:
+        with pytest.raises(sqlite3.ProgrammingError):
+            connection.execute('SELECT 1')
+
+
+def test_repeated_searches_are_cached_until_a_table_changes(named, opened):
+    engine, _ = opened
+    cache = querycache.QueryCache(named)
+    first = list(engine.search('ann', cache=cache))
+
+    assert list(engine.search('ann', cache=cache)) == first
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    core.add_course(named, 'C3', 'Annual Review', 'I1')
+    named.commit()
+    assert ('Annual Review', 'Course') in _names(engine.search('ann', cache=cache))
+    assert cache.misses == 2
+
+
+def test_an_abandoned_search_is_not_cached(named, opened):
+    engine, _ = opened
+    cache = querycache.QueryCache(named)
+    search = engine.search('ann', cache=cache)
+    next(search)
+    search.close()
+
+    assert len(cache) == 0
@@ -0,0 +1,35 @@
+import pytest
+
+import statements
+
+
+@pytest.mark.parametrize('name', sorted(statements.STATEMENTS))
+def test_every_statement_compiles_against_the_schema(conn, name):
+    sql = statements.sql(name)
+
+    conn.execute('EXPLAIN ' + sql, (None,) * sql.count('?'))
+
+
+def test_statements_are_normalized_once():
+    assert all(sql == ' '.join(sql.split()) for sql in statements.STATEMENTS.values())
+    assert statements.CACHE_SIZE > len(statements.STATEMENTS)
+
+
+def test_entities_map_the_type_column():
+    assert statements.entity('Course') == ('Course', 'courses', 'course_id', 'course_name')
+    assert statements.entity('Janitor') is None
+    with pytest.raises(KeyError):
+        statements.sql('janitors.list')
+
+
+def test_entity_statements_round_trip(school):
+    school.execute(statements.sql('students.update_name_versioned'),
+                   ('Ann Smith', *school.execute('SELECT id, version FROM students').fetchone()))
+
+    assert school.execute(statements.sql('students.names')).fetchall() == [('Ann Smith',)]
+    assert school.execute(statements.sql('courses.id_by_name'), ('Algebra',)).fetchone() == ('C1',)
+
+    school.execute(statements.sql('instructors.delete'), school.execute('SELECT id, version FROM instructors').fetchone())
+
+    assert school.execute('SELECT count(*) FROM instructors WHERE deleted_at IS NULL').fetchone()[0] == 0
+    assert school.execute(statements.sql('instructors.names')).fetchall() == []